@@ -0,0 +1,155 @@
+"""
+HTTP client for the Kivy mobile app
+
+Every call runs on a small thread pool, never on the Kivy UI thread, and its
+result is handed back to the UI through ``Clock.schedule_once``:
+
+    app.api.get('/student/attendance/history', on_result=show_history, cache=True)
+
+One ``requests.Session`` is shared by all calls. It keeps connections alive
+(no TCP/TLS handshake per request), carries the web demo's login cookie, and
+sends the API's bearer token once login has set it. Connection failures are
+retried with backoff for every method. Timeouts and 5xx responses are only
+retried for GET, because repeating a POST could mark attendance twice.
+
+GET responses can be cached: a fresh entry is served without touching the
+network, and a stale one is revalidated with If-None-Match. Any successful
+write clears the cache.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from kivy.clock import Clock
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (5, 15)
+
+class ResponseCache:
+    """Recent GET results by path, with their ETag"""
+    def __init__(self, ttl=30, max_entries=64):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """(data, etag, fresh) for path, or None"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return None
+            data, etag, stored_at = entry
+            return data, etag, time.monotonic() - stored_at < self.ttl
+
+    def put(self, path, data, etag):
+        with self._lock:
+            self._entries[path] = (data, etag, time.monotonic())
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class ApiClient:
+    """Pooled, keep-alive API session that reports back on the UI thread"""
+    def __init__(self, base_url, timeout=DEFAULT_TIMEOUT, retries=3, workers=4, cache_ttl=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cache = ResponseCache(ttl=cache_ttl)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+
+    def set_token(self, token):
+        """Send the API's JWT with every request (None removes it)"""
+        if token:
+            self.session.headers['Authorization'] = f'Bearer {token}'
+        else:
+            self.session.headers.pop('Authorization', None)
+
+    def reset(self):
+        """Forget the login and everything cached for it"""
+        self.set_token(None)
+        self.session.cookies.clear()
+        self.cache.clear()
+
+    def request(self, method, path, json=None, cache=False):
+        """Blocking request; returns (status, data). Call from a worker thread."""
+        cached = self.cache.get(path) if cache and method == 'GET' else None
+        if cached and cached[2]:
+            return 200, cached[0]
+
+        headers = {}
+        if cached and cached[1]:
+            headers['If-None-Match'] = cached[1]
+
+        response = self.session.request(
+            method, self.base_url + path, json=json, headers=headers, timeout=self.timeout
+        )
+        if response.status_code == 304 and cached:
+            self.cache.put(path, cached[0], cached[1])
+            return 200, cached[0]
+
+        try:
+            data = response.json()
+        except ValueError:
+            data = {'msg': response.text or response.reason}
+
+        if response.ok:
+            if cache and method == 'GET':
+                self.cache.put(path, data, response.headers.get('ETag'))
+            elif method != 'GET':
+                # A write may change anything cached
+                self.cache.clear()
+        return response.status_code, data
+
+    def call(self, method, path, on_result=None, on_error=None, json=None, cache=False):
+        """Run a request in the background; callbacks run on the Kivy UI thread.
+
+        on_result(status, data) gets every HTTP response, errors included;
+        on_error(message) gets connection failures and timeouts.
+        """
+        def done(future):
+            try:
+                status, data = future.result()
+            except Exception as e:
+                if on_error:
+                    message = f'Connection error: {e}'
+                    Clock.schedule_once(lambda dt: on_error(message))
+                return
+            if on_result:
+                Clock.schedule_once(lambda dt: on_result(status, data))
+
+        future = self._executor.submit(self.request, method, path, json, cache)
+        future.add_done_callback(done)
+        return future
+
+    def get(self, path, on_result=None, on_error=None, cache=False):
+        return self.call('GET', path, on_result, on_error, cache=cache)
+
+    def post(self, path, json=None, on_result=None, on_error=None):
+        return self.call('POST', path, on_result, on_error, json=json)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
@@ -5,23 +5,46 @@ from app.models.models import db
 from app.controllers.auth_controller import auth_bp
 from app.controllers.attendance_controller import attendance_bp
 from app.controllers.admin_controller import admin_bp
+from app.commands import register_commands
+from app.utils.stats import init_stats
+from app.utils.database import init_database
+from app.repositories import init_repository
+from app.utils.metrics import init_metrics
+from app.utils.profiler import init_profiler
+from app.utils.sql_diagnostics import init_sql_diagnostics
+from app.utils.tracing import init_tracing
+from app.utils.json_provider import init_json
+from app.utils.compression import init_compression
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    init_json(app)
+    # Registered before the other after_request hooks so it runs last
+    init_compression(app)
     
     # Initialize extensions
-    db.init_app(app)
+    init_database(app, db)
     jwt = JWTManager(app)
+    init_stats(app)
+    init_repository(app)
+    init_metrics(app)
+    init_profiler(app)
+    init_sql_diagnostics(app)
+    init_tracing(app)
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(attendance_bp, url_prefix='/api/attendance')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     
-    # Create tables
-    with app.app_context():
-        db.create_all()
+    # Register CLI commands
+    register_commands(app)
+    
+    # Schema creation is a deploy step (flask init-db), not part of every boot
+    if app.config['AUTO_CREATE_TABLES']:
+        with app.app_context():
+            db.create_all()
     
     @app.route('/')
     def index():
@@ -0,0 +1,43 @@
+"""
+Async (ASGI) variant of the JSON API
+
+Serves the same /api/auth, /api/attendance and /api/admin routes as
+create_app() on Quart with async database access, so a single worker keeps
+serving other requests while one waits on the database. Run it with:
+
+    uvicorn asgi:app --workers 4
+
+CSV import/export and the live attendance feed, with its stream-token
+route, remain on the Flask app. Responses are written by the same
+FastJSONProvider, so datetimes have the same ISO 8601 format.
+"""
+
+import os
+from quart import Quart
+from config.config import Config
+from app.utils.json_provider import init_json
+from app.asgi.database import db
+from app.asgi.auth_controller import auth_bp
+from app.asgi.attendance_controller import attendance_bp
+from app.asgi.admin_controller import admin_bp
+
+INSTANCE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'instance'))
+
+def create_asgi_app():
+    app = Quart(__name__, instance_path=INSTANCE_PATH)
+    app.config.from_object(Config)
+    init_json(app)
+
+    # Initialize the async engine
+    db.init_app(app, app.instance_path)
+
+    # Register blueprints
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(attendance_bp, url_prefix='/api/attendance')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+
+    @app.route('/')
+    async def index():
+        return {'message': 'QR Code Attendance System API'}
+
+    return app
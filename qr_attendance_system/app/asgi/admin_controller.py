@@ -0,0 +1,213 @@
+from quart import Blueprint, request, jsonify
+from sqlalchemy import select, delete
+from app.models.models import User, Student, Faculty, Course, Enrollment, CourseAttendanceSummary, CourseSessionCount
+from app.utils.stats import counts_query, recent_enrollments_query, format_recent_enrollments
+from app.utils.database import pool_status
+from app.asgi.database import db
+from app.asgi.security import role_required
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/admin/users', methods=['GET'])
+@role_required('admin')
+async def get_all_users():
+    """Get all users in the system"""
+    try:
+        async with db.session() as session:
+            # Role-specific profiles in the same query instead of one per user
+            rows = (await session.execute(
+                select(User, Student, Faculty)
+                .outerjoin(Student, Student.user_id == User.id)
+                .outerjoin(Faculty, Faculty.user_id == User.id)
+            )).all()
+
+        user_data = []
+        for user, student, faculty in rows:
+            user_info = {
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'role': user.role,
+                'created_at': user.created_at
+            }
+
+            # Add role-specific information
+            if user.role == 'student' and student:
+                user_info['student_id'] = student.student_id
+                user_info['full_name'] = student.full_name
+                user_info['department'] = student.department
+            elif user.role == 'faculty' and faculty:
+                user_info['faculty_id'] = faculty.faculty_id
+                user_info['full_name'] = faculty.full_name
+                user_info['department'] = faculty.department
+
+            user_data.append(user_info)
+
+        return jsonify({
+            'total_users': len(user_data),
+            'users': user_data
+        }), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to retrieve users', 'error': str(e)}), 500
+
+@admin_bp.route('/admin/student/<int:student_id>', methods=['DELETE'])
+@role_required('admin')
+async def delete_student(student_id):
+    """Delete a student and associated user"""
+    try:
+        async with db.session() as session:
+            student = await session.get(Student, student_id)
+            if not student:
+                return jsonify({'msg': 'Student not found'}), 404
+
+            user = await session.get(User, student.user_id)
+
+            await session.execute(delete(CourseAttendanceSummary).where(CourseAttendanceSummary.student_id == student.id))
+            await session.delete(student)
+            if user:
+                await session.delete(user)
+
+            await session.commit()
+
+        return jsonify({'msg': 'Student deleted successfully'}), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to delete student', 'error': str(e)}), 500
+
+@admin_bp.route('/admin/faculty/<int:faculty_id>', methods=['DELETE'])
+@role_required('admin')
+async def delete_faculty(faculty_id):
+    """Delete a faculty member and associated user"""
+    try:
+        async with db.session() as session:
+            faculty = await session.get(Faculty, faculty_id)
+            if not faculty:
+                return jsonify({'msg': 'Faculty not found'}), 404
+
+            user = await session.get(User, faculty.user_id)
+
+            await session.delete(faculty)
+            if user:
+                await session.delete(user)
+
+            await session.commit()
+
+        return jsonify({'msg': 'Faculty deleted successfully'}), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to delete faculty', 'error': str(e)}), 500
+
+@admin_bp.route('/admin/course', methods=['POST'])
+@role_required('admin')
+async def create_course():
+    """Create a new course"""
+    try:
+        data = await request.get_json()
+
+        async with db.session() as session:
+            # Check if course code already exists
+            existing = (await session.execute(
+                select(Course.id).where(Course.course_code == data['course_code'])
+            )).first()
+            if existing:
+                return jsonify({'msg': 'Course code already exists'}), 400
+
+            course = Course(
+                course_code=data['course_code'],
+                course_name=data['course_name'],
+                department=data.get('department'),
+                semester=data.get('semester'),
+                faculty_id=data.get('faculty_id')
+            )
+            session.add(course)
+            await session.commit()
+
+        return jsonify({
+            'msg': 'Course created successfully',
+            'course_id': course.id
+        }), 201
+    except Exception as e:
+        return jsonify({'msg': 'Failed to create course', 'error': str(e)}), 500
+
+@admin_bp.route('/admin/course/<int:course_id>', methods=['DELETE'])
+@role_required('admin')
+async def delete_course(course_id):
+    """Delete a course"""
+    try:
+        async with db.session() as session:
+            course = await session.get(Course, course_id)
+            if not course:
+                return jsonify({'msg': 'Course not found'}), 404
+
+            await session.execute(delete(CourseAttendanceSummary).where(CourseAttendanceSummary.course_id == course.id))
+            await session.execute(delete(CourseSessionCount).where(CourseSessionCount.course_id == course.id))
+            await session.delete(course)
+            await session.commit()
+
+        return jsonify({'msg': 'Course deleted successfully'}), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to delete course', 'error': str(e)}), 500
+
+@admin_bp.route('/admin/enrollment', methods=['POST'])
+@role_required('admin')
+async def create_enrollment():
+    """Enroll a student in a course"""
+    try:
+        data = await request.get_json()
+        student_id = data.get('student_id')
+        course_id = data.get('course_id')
+
+        async with db.session() as session:
+            # Check if enrollment already exists
+            existing = (await session.execute(
+                select(Enrollment.id).where(Enrollment.student_id == student_id, Enrollment.course_id == course_id)
+            )).first()
+            if existing:
+                return jsonify({'msg': 'Student already enrolled in this course'}), 400
+
+            # Check if student and course exist
+            if not await session.get(Student, student_id):
+                return jsonify({'msg': 'Student not found'}), 404
+
+            if not await session.get(Course, course_id):
+                return jsonify({'msg': 'Course not found'}), 404
+
+            enrollment = Enrollment(student_id=student_id, course_id=course_id)
+            session.add(enrollment)
+            await session.commit()
+
+        return jsonify({
+            'msg': 'Student enrolled successfully',
+            'enrollment_id': enrollment.id
+        }), 201
+    except Exception as e:
+        return jsonify({'msg': 'Failed to enroll student', 'error': str(e)}), 500
+
+@admin_bp.route('/admin/dashboard', methods=['GET'])
+@role_required('admin')
+async def admin_dashboard():
+    """Get admin dashboard statistics"""
+    try:
+        async with db.session() as session:
+            # All counters in a single SELECT
+            counts = (await session.execute(counts_query())).mappings().one()
+            rows = (await session.execute(recent_enrollments_query(limit=5))).all()
+
+        return jsonify({
+            'statistics': {
+                'total_students': counts['total_students'],
+                'total_faculties': counts['total_faculties'],
+                'total_courses': counts['total_courses'],
+                'total_sessions': counts['total_sessions']
+            },
+            'recent_enrollments': format_recent_enrollments(rows)
+        }), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to retrieve dashboard data', 'error': str(e)}), 500
+
+@admin_bp.route('/admin/db/pool', methods=['GET'])
+@role_required('admin')
+async def database_pool():
+    """Get connection pool occupancy and checkout wait statistics"""
+    try:
+        return jsonify(pool_status(db.engine.sync_engine)), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to retrieve pool statistics', 'error': str(e)}), 500
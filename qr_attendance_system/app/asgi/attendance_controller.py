@@ -0,0 +1,338 @@
+import asyncio
+from datetime import datetime, timedelta
+from quart import Blueprint, request, jsonify, current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from app.models.models import Session, Attendance, Student, Course, Enrollment, Faculty, CourseSessionCount
+from app.utils.helpers import generate_time_bound_qr
+from app.utils.offline_scans import MAX_BATCH_SIZE, validate_scans
+from app.utils.summary import (
+    session_count_upsert, attendance_summary_upsert,
+    course_report_query, build_course_report, student_summary_query, build_student_summary
+)
+from app.asgi.database import db
+from app.asgi.security import get_jwt, get_jwt_identity, role_required
+
+attendance_bp = Blueprint('attendance', __name__)
+
+async def _upsert(session, update_stmt, insert_stmt):
+    """Async counterpart of app.utils.summary._upsert"""
+    if (await session.execute(update_stmt)).rowcount:
+        return
+
+    try:
+        async with session.begin_nested():
+            await session.execute(insert_stmt)
+    except IntegrityError:
+        await session.execute(update_stmt)
+
+@attendance_bp.route('/faculty/session/create', methods=['POST'])
+@role_required('faculty')
+async def create_session():
+    """Create a new attendance session with QR code"""
+    try:
+        faculty_id = get_jwt().get('user_id')
+        data = await request.get_json()
+        course_id = data.get('course_id')
+
+        if not course_id:
+            return jsonify({'msg': 'Course ID is required'}), 400
+
+        # QR rendering is CPU bound; keep it off the event loop
+        qr_data = await asyncio.to_thread(generate_time_bound_qr, course_id, faculty_id)
+
+        async with db.session() as session:
+            attendance_session = Session(
+                course_id=course_id,
+                faculty_id=faculty_id,
+                qr_code_token=qr_data['token'],
+                qr_expiration=qr_data['expiration']
+            )
+            session.add(attendance_session)
+            await _upsert(session, *session_count_upsert(course_id))
+            await session.commit()
+
+        return jsonify({
+            'msg': 'Session created successfully',
+            'session_id': attendance_session.id,
+            'qr_code': qr_data['qr_code'],
+            'expiration': qr_data['expiration']
+        }), 201
+    except Exception as e:
+        return jsonify({'msg': 'Failed to create session', 'error': str(e)}), 500
+
+@attendance_bp.route('/student/attendance/mark', methods=['POST'])
+@role_required('student')
+async def mark_attendance():
+    """Mark attendance using QR code token"""
+    try:
+        data = await request.get_json()
+        qr_token = data.get('qr_token')
+
+        if not qr_token:
+            return jsonify({'msg': 'QR token is required'}), 400
+
+        async with db.session() as session:
+            # Session and course in one round trip
+            row = (await session.execute(
+                select(Session, Course.course_name)
+                .outerjoin(Course, Course.id == Session.course_id)
+                .where(Session.qr_code_token == qr_token)
+            )).first()
+
+            if not row:
+                return jsonify({'msg': 'Invalid QR code'}), 400
+
+            attendance_session, course_name = row
+            if not attendance_session.is_active or attendance_session.qr_expiration < datetime.utcnow():
+                return jsonify({'msg': 'QR code has expired'}), 400
+
+            # Student profile and enrollment in one round trip
+            row = (await session.execute(
+                select(Student, Enrollment.id)
+                .outerjoin(Enrollment, (Enrollment.student_id == Student.id) & (Enrollment.course_id == attendance_session.course_id))
+                .where(Student.user_id == get_jwt_identity())
+            )).first()
+
+            if not row:
+                return jsonify({'msg': 'Student profile not found'}), 404
+
+            student, enrollment_id = row
+            if not enrollment_id:
+                return jsonify({'msg': 'You are not enrolled in this course'}), 403
+
+            # The unique (session_id, student_id) constraint is the duplicate check
+            marked_at = datetime.utcnow()
+            try:
+                session.add(Attendance(session_id=attendance_session.id, student_id=student.id, marked_at=marked_at))
+                await session.flush()
+            except IntegrityError:
+                await session.rollback()
+                return jsonify({'msg': 'Attendance already marked for this session'}), 400
+
+            await _upsert(session, *attendance_summary_upsert(attendance_session.course_id, student.id, marked_at))
+            await session.commit()
+
+        return jsonify({
+            'msg': 'Attendance marked successfully',
+            'course': course_name or 'Unknown',
+            'session_date': attendance_session.session_date
+        }), 201
+    except Exception as e:
+        return jsonify({'msg': 'Failed to mark attendance', 'error': str(e)}), 500
+
+class _BatchSessions:
+    """The sessions of one scan batch, looked up by token for validate_scans"""
+    def __init__(self, sessions):
+        self.sessions = {
+            session.qr_code_token: {
+                'id': session.id,
+                'course_id': session.course_id,
+                'session_date': session.session_date,
+                'qr_expiration': session.qr_expiration
+            }
+            for session in sessions
+        }
+
+    def get_session_by_token(self, token):
+        return self.sessions.get(token)
+
+@attendance_bp.route('/student/attendance/mark/batch', methods=['POST'])
+@role_required('student')
+async def mark_attendance_batch():
+    """Mark attendance for scans the mobile app queued while offline"""
+    try:
+        data = await request.get_json() or {}
+        scans = data.get('scans')
+
+        if not isinstance(scans, list) or not scans:
+            return jsonify({'msg': 'scans must be a non-empty list'}), 400
+        if len(scans) > MAX_BATCH_SIZE:
+            return jsonify({'msg': f'At most {MAX_BATCH_SIZE} scans per batch'}), 413
+
+        async with db.session() as session:
+            student = (await session.execute(
+                select(Student).where(Student.user_id == get_jwt_identity())
+            )).scalar()
+
+            if not student:
+                return jsonify({'msg': 'Student profile not found'}), 404
+
+            # Every session of the batch in one round trip
+            tokens = {scan.get('qr_token') for scan in scans if isinstance(scan, dict) and scan.get('qr_token')}
+            sessions = (await session.execute(select(Session).where(Session.qr_code_token.in_(tokens)))).scalars()
+
+            # Check every scan against its session's window at capture time
+            accepted, results = validate_scans(
+                _BatchSessions(sessions), scans, data.get('sent_at'), datetime.utcnow(),
+                max_delay=timedelta(seconds=current_app.config['OFFLINE_SCAN_MAX_DELAY']),
+                max_skew=timedelta(seconds=current_app.config['OFFLINE_SCAN_MAX_CLOCK_SKEW'])
+            )
+
+            # Enrollments and earlier marks for the whole batch in two round trips
+            course_ids = {attendance_session['course_id'] for _, attendance_session, _ in accepted}
+            session_ids = {attendance_session['id'] for _, attendance_session, _ in accepted}
+            enrolled = set((await session.execute(
+                select(Enrollment.course_id)
+                .where(Enrollment.student_id == student.id, Enrollment.course_id.in_(course_ids))
+            )).scalars())
+            already_marked = set((await session.execute(
+                select(Attendance.session_id)
+                .where(Attendance.student_id == student.id, Attendance.session_id.in_(session_ids))
+            )).scalars())
+
+            marked = 0
+            for index, attendance_session, marked_at in accepted:
+                result = results[index]
+                if attendance_session['course_id'] not in enrolled:
+                    result.update(status='not_enrolled', msg='You are not enrolled in this course')
+                    continue
+                if attendance_session['id'] in already_marked:
+                    result.update(status='already_marked', msg='Attendance already marked for this session')
+                    continue
+
+                # A concurrent mark can still win the race; the savepoint
+                # keeps the rest of the batch when it does
+                try:
+                    async with session.begin_nested():
+                        session.add(Attendance(session_id=attendance_session['id'], student_id=student.id, marked_at=marked_at))
+                except IntegrityError:
+                    result.update(status='already_marked', msg='Attendance already marked for this session')
+                    continue
+
+                already_marked.add(attendance_session['id'])
+                await _upsert(session, *attendance_summary_upsert(attendance_session['course_id'], student.id, marked_at))
+                result.update(status='marked', session_id=attendance_session['id'], marked_at=marked_at)
+                marked += 1
+            await session.commit()
+
+        return jsonify({'marked': marked, 'results': results}), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to mark attendance', 'error': str(e)}), 500
+
+@attendance_bp.route('/faculty/session/<int:session_id>/attendances', methods=['GET'])
+@role_required('faculty')
+async def get_session_attendances(session_id):
+    """Get all attendances for a specific session"""
+    try:
+        faculty_id = get_jwt().get('user_id')
+
+        async with db.session() as session:
+            row = (await session.execute(
+                select(Session.id, Course.course_name)
+                .outerjoin(Course, Course.id == Session.course_id)
+                .where(Session.id == session_id, Session.faculty_id == faculty_id)
+            )).first()
+
+            if not row:
+                return jsonify({'msg': 'Session not found or unauthorized'}), 404
+
+            rows = (await session.execute(
+                select(Student.student_id, Student.full_name, Attendance.marked_at)
+                .join(Student, Student.id == Attendance.student_id)
+                .where(Attendance.session_id == session_id)
+            )).all()
+
+        attendance_data = [
+            {'student_id': student_id, 'student_name': full_name, 'marked_at': marked_at}
+            for student_id, full_name, marked_at in rows
+        ]
+
+        return jsonify({
+            'session_id': session_id,
+            'course': row.course_name or 'Unknown',
+            'total_attendances': len(attendance_data),
+            'attendances': attendance_data
+        }), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to retrieve attendances', 'error': str(e)}), 500
+
+@attendance_bp.route('/student/attendance/history', methods=['GET'])
+@role_required('student')
+async def get_student_attendance_history():
+    """Get attendance history for the logged-in student"""
+    try:
+        async with db.session() as session:
+            student = (await session.execute(
+                select(Student).where(Student.user_id == get_jwt_identity())
+            )).scalar_one_or_none()
+
+            if not student:
+                return jsonify({'msg': 'Student profile not found'}), 404
+
+            rows = (await session.execute(
+                select(Course.course_name, Course.course_code, Session.session_date, Attendance.marked_at)
+                .join(Session, Session.id == Attendance.session_id)
+                .outerjoin(Course, Course.id == Session.course_id)
+                .where(Attendance.student_id == student.id)
+            )).all()
+
+        attendance_data = [
+            {
+                'course': course_name or 'Unknown',
+                'course_code': course_code or 'Unknown',
+                'session_date': session_date,
+                'marked_at': marked_at
+            }
+            for course_name, course_code, session_date, marked_at in rows
+        ]
+
+        return jsonify({
+            'student_name': student.full_name,
+            'total_attendances': len(attendance_data),
+            'attendance_history': attendance_data
+        }), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to retrieve attendance history', 'error': str(e)}), 500
+
+@attendance_bp.route('/faculty/attendance/report', methods=['GET'])
+@role_required('faculty')
+async def get_attendance_report():
+    """Get per-student attendance for one of the faculty's courses"""
+    try:
+        course_id = request.args.get('course_id', type=int)
+
+        if not course_id:
+            return jsonify({'msg': 'Course ID is required'}), 400
+
+        async with db.session() as session:
+            course = (await session.execute(
+                select(Course)
+                .join(Faculty, Faculty.id == Course.faculty_id)
+                .where(Course.id == course_id, Faculty.user_id == get_jwt_identity())
+            )).scalar_one_or_none()
+
+            if not course:
+                return jsonify({'msg': 'Course not found or unauthorized'}), 404
+
+            count = await session.get(CourseSessionCount, course_id)
+            rows = (await session.execute(course_report_query(course_id))).all()
+
+        report = build_course_report(course_id, count.session_count if count else 0, rows)
+        report['course'] = course.course_name
+
+        return jsonify(report), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to generate report', 'error': str(e)}), 500
+
+@attendance_bp.route('/student/attendance/summary', methods=['GET'])
+@role_required('student')
+async def get_student_attendance_summary():
+    """Get per-course attendance totals for the logged-in student"""
+    try:
+        async with db.session() as session:
+            student = (await session.execute(
+                select(Student).where(Student.user_id == get_jwt_identity())
+            )).scalar_one_or_none()
+
+            if not student:
+                return jsonify({'msg': 'Student profile not found'}), 404
+
+            rows = (await session.execute(student_summary_query(student.id))).all()
+
+        return jsonify({
+            'student_name': student.full_name,
+            'courses': build_student_summary(rows)
+        }), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to retrieve attendance summary', 'error': str(e)}), 500
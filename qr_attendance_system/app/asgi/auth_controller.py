@@ -0,0 +1,150 @@
+import asyncio
+from quart import Blueprint, request, jsonify
+from sqlalchemy import select, or_
+from app.models.models import hash_password, User, Student, Faculty
+from app.asgi.database import db
+from app.asgi.security import create_access_token, get_jwt_identity, role_required
+
+auth_bp = Blueprint('auth', __name__)
+
+async def _username_or_email_taken(session, data):
+    """Return an error message when the username or email is already used"""
+    rows = (await session.execute(
+        select(User.username, User.email).where(
+            or_(User.username == data['username'], User.email == data['email'])
+        )
+    )).all()
+
+    for username, email in rows:
+        if username == data['username']:
+            return 'Username already exists'
+    if rows:
+        return 'Email already exists'
+    return None
+
+async def _register(data, role, build_profile):
+    async with db.session() as session:
+        error = await _username_or_email_taken(session, data)
+        if error:
+            return jsonify({'msg': error}), 400
+
+        # bcrypt is CPU bound; keep it off the event loop
+        password_hash = await asyncio.to_thread(hash_password, data['password'])
+
+        try:
+            user = User(
+                username=data['username'],
+                email=data['email'],
+                password_hash=password_hash,
+                role=role
+            )
+            session.add(user)
+            await session.flush()  # Get the user ID without committing
+
+            session.add(build_profile(user, data))
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+    return None
+
+@auth_bp.route('/register/student', methods=['POST'])
+async def register_student():
+    """Register a new student"""
+    try:
+        data = await request.get_json()
+
+        error = await _register(data, 'student', lambda user, data: Student(
+            user_id=user.id,
+            student_id=data['student_id'],
+            full_name=data['full_name'],
+            department=data.get('department'),
+            semester=data.get('semester')
+        ))
+        if error:
+            return error
+
+        return jsonify({'msg': 'Student registered successfully'}), 201
+    except Exception as e:
+        return jsonify({'msg': 'Registration failed', 'error': str(e)}), 500
+
+@auth_bp.route('/register/faculty', methods=['POST'])
+async def register_faculty():
+    """Register a new faculty member"""
+    try:
+        data = await request.get_json()
+
+        error = await _register(data, 'faculty', lambda user, data: Faculty(
+            user_id=user.id,
+            faculty_id=data['faculty_id'],
+            full_name=data['full_name'],
+            department=data.get('department')
+        ))
+        if error:
+            return error
+
+        return jsonify({'msg': 'Faculty registered successfully'}), 201
+    except Exception as e:
+        return jsonify({'msg': 'Registration failed', 'error': str(e)}), 500
+
+@auth_bp.route('/login', methods=['POST'])
+async def login():
+    """Authenticate user and return JWT token"""
+    try:
+        data = await request.get_json()
+        username = data.get('username')
+        password = data.get('password')
+
+        if not username or not password:
+            return jsonify({'msg': 'Missing username or password'}), 400
+
+        async with db.session() as session:
+            user = (await session.execute(
+                select(User).where(User.username == username)
+            )).scalar_one_or_none()
+
+        valid = user is not None and await asyncio.to_thread(user.check_password, password)
+
+        if not valid:
+            return jsonify({'msg': 'Invalid credentials'}), 401
+
+        access_token = create_access_token(
+            identity=user.id,
+            additional_claims={'role': user.role, 'user_id': user.id}
+        )
+
+        return jsonify({
+            'access_token': access_token,
+            'role': user.role,
+            'user_id': user.id
+        }), 200
+    except Exception as e:
+        return jsonify({'msg': 'Login failed', 'error': str(e)}), 500
+
+@auth_bp.route('/profile', methods=['GET'])
+@role_required('student')
+async def student_profile():
+    """Get student profile information"""
+    try:
+        async with db.session() as session:
+            row = (await session.execute(
+                select(User, Student)
+                .join(Student, Student.user_id == User.id)
+                .where(User.id == get_jwt_identity())
+            )).first()
+
+        if not row:
+            return jsonify({'msg': 'Student profile not found'}), 404
+
+        user, student = row
+        return jsonify({
+            'username': user.username,
+            'email': user.email,
+            'student_id': student.student_id,
+            'full_name': student.full_name,
+            'department': student.department,
+            'semester': student.semester
+        }), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to retrieve profile', 'error': str(e)}), 500
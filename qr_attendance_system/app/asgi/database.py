@@ -0,0 +1,85 @@
+"""
+Async database access for the ASGI API
+
+The ASGI server uses the same tables and models as the Flask app, through
+SQLAlchemy's asyncio extension and an async driver (aiosqlite for SQLite,
+asyncpg for PostgreSQL). Its connection pool is separate from the Flask one
+but configured the same way (app/utils/database.py).
+"""
+
+import os
+from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from app.models.models import db as models_db
+from app.utils.database import database_url, engine_options, configure_engine, missing_tables
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg'
+}
+
+def async_database_url(url, instance_path):
+    """Translate the sync DATABASE_URL into its async-driver equivalent"""
+    url = database_url(url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS:
+        url = url.set(drivername=ASYNC_DRIVERS[backend])
+
+    # Flask-SQLAlchemy resolves relative SQLite paths against the instance
+    # folder; do the same so both servers share one database file
+    if backend == 'sqlite' and url.database and url.database != ':memory:' and not os.path.isabs(url.database):
+        url = url.set(database=os.path.join(instance_path, url.database))
+
+    return url
+
+class AsyncDatabase:
+    """Engine and session factory bound to one ASGI app"""
+    def __init__(self):
+        self.engine = None
+        self.sessionmaker = None
+
+    def init_app(self, app, instance_path):
+        url = async_database_url(app.config['SQLALCHEMY_DATABASE_URI'], instance_path)
+
+        if url.get_backend_name() == 'sqlite' and url.database and url.database != ':memory:':
+            os.makedirs(os.path.dirname(url.database), exist_ok=True)
+
+        options = engine_options(
+            app.config,
+            url,
+            pool_size=app.config['ASYNC_DB_POOL_SIZE'],
+            max_overflow=app.config['ASYNC_DB_MAX_OVERFLOW'],
+            is_async=True
+        )
+        self.engine = create_async_engine(url, **options)
+        configure_engine(self.engine.sync_engine, app.config)
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        # Same rule as create_app(): tables come from `flask init-db`
+        if app.config['AUTO_CREATE_TABLES']:
+            @app.before_serving
+            async def create_tables():
+                async with self.engine.begin() as conn:
+                    await conn.run_sync(models_db.metadata.create_all)
+        else:
+            @app.before_serving
+            async def check_tables():
+                # Refuse to start rather than answer every request with a 500
+                async with self.engine.connect() as conn:
+                    missing = await conn.run_sync(missing_tables, models_db.metadata)
+                if missing:
+                    raise RuntimeError(
+                        f"Database tables are missing ({', '.join(missing)}). "
+                        'Run `flask --app run init-db` or set AUTO_CREATE_TABLES=1.'
+                    )
+
+        @app.after_serving
+        async def dispose_engine():
+            await self.engine.dispose()
+
+    @asynccontextmanager
+    async def session(self):
+        async with self.sessionmaker() as session:
+            yield session
+
+db = AsyncDatabase()
@@ -0,0 +1,62 @@
+"""
+JWT handling for the ASGI API
+
+Tokens carry the same claims as the ones issued by Flask-JWT-Extended in the
+Flask app and are signed with the same JWT_SECRET_KEY, so a token from
+either server is accepted by the other.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from functools import wraps
+import jwt
+from quart import current_app, g, jsonify, request
+
+def create_access_token(identity, additional_claims=None):
+    """Issue an access token for the given user identity"""
+    now = datetime.now(timezone.utc)
+    payload = {
+        'fresh': False,
+        'iat': now,
+        'jti': str(uuid.uuid4()),
+        'type': 'access',
+        'sub': identity,
+        'nbf': now,
+        'exp': now + current_app.config['JWT_ACCESS_TOKEN_EXPIRES']
+    }
+    payload.update(additional_claims or {})
+    return jwt.encode(payload, current_app.config['JWT_SECRET_KEY'], algorithm='HS256')
+
+def get_jwt():
+    return g.jwt_claims
+
+def get_jwt_identity():
+    return g.jwt_claims.get('sub')
+
+def role_required(required_role):
+    """Decorator to restrict access based on user role"""
+    def wrapper(fn):
+        @wraps(fn)
+        async def decorator(*args, **kwargs):
+            header = request.headers.get('Authorization', '')
+            if not header.startswith('Bearer '):
+                return jsonify(msg='Missing Authorization Header'), 401
+
+            try:
+                claims = jwt.decode(
+                    header[len('Bearer '):],
+                    current_app.config['JWT_SECRET_KEY'],
+                    algorithms=['HS256']
+                )
+            except jwt.ExpiredSignatureError:
+                return jsonify(msg='Token has expired'), 401
+            except jwt.InvalidTokenError as e:
+                return jsonify(msg=str(e)), 422
+
+            if claims.get('role') != required_role:
+                return jsonify(msg=f'Missing required role: {required_role}'), 403
+
+            g.jwt_claims = claims
+            return await fn(*args, **kwargs)
+        return decorator
+    return wrapper
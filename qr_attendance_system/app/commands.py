@@ -0,0 +1,105 @@
+"""
+Flask CLI commands for the QR Attendance System
+
+Run with the API app, e.g. ``flask --app run import-students intake.csv``.
+"""
+
+import json
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.utils.bulk_import import import_students_csv, import_enrollments_csv
+from app.utils.export import EXPORT_FORMATS, generate_export
+from app.models.models import db
+from app.utils.summary import rebuild_summaries
+
+def _print_import_report(report, report_path):
+    summary = report.to_dict()
+    click.echo(
+        f"Read {summary['rows_read']} rows: "
+        f"{summary['users_created']} users created, "
+        f"{summary['enrollments_created']} enrollments created, "
+        f"{summary['rows_failed']} rows failed"
+    )
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        click.echo(f'Error report written to {report_path}')
+    else:
+        for error in summary['errors']:
+            click.echo(f"  line {error['line']}: {error['error']}", err=True)
+
+@click.command('import-students')
+@click.argument('csv_file', type=click.File('rb'))
+@click.option('--chunk-size', type=int, default=None, help='Rows per insert transaction.')
+@click.option('--hash-workers', type=int, default=None, help='Threads used for password hashing.')
+@click.option('--report', 'report_path', type=click.Path(dir_okay=False), help='Write the per-row report as JSON.')
+@with_appcontext
+def import_students_command(csv_file, chunk_size, hash_workers, report_path):
+    """Bulk import students (and optional enrollments) from CSV_FILE"""
+    report = import_students_csv(
+        csv_file,
+        chunk_size=chunk_size or current_app.config['BULK_IMPORT_CHUNK_SIZE'],
+        hash_workers=hash_workers or current_app.config['BULK_IMPORT_HASH_WORKERS']
+    )
+    _print_import_report(report, report_path)
+
+@click.command('import-enrollments')
+@click.argument('csv_file', type=click.File('rb'))
+@click.option('--chunk-size', type=int, default=None, help='Rows per insert transaction.')
+@click.option('--report', 'report_path', type=click.Path(dir_okay=False), help='Write the per-row report as JSON.')
+@with_appcontext
+def import_enrollments_command(csv_file, chunk_size, report_path):
+    """Bulk enroll students in courses from CSV_FILE"""
+    report = import_enrollments_csv(
+        csv_file,
+        chunk_size=chunk_size or current_app.config['BULK_IMPORT_CHUNK_SIZE']
+    )
+    _print_import_report(report, report_path)
+
+@click.command('export-attendance')
+@click.option('--format', 'fmt', type=click.Choice(list(EXPORT_FORMATS)), default='csv', show_default=True)
+@click.option('--start', type=click.DateTime(), help='First session date to include.')
+@click.option('--end', type=click.DateTime(), help='Session date to stop before.')
+@click.option('--course-id', type=int, help='Only export this course.')
+@click.option('--batch-size', type=int, default=None, help='Rows fetched (and Parquet row group size) per batch.')
+@click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True), required=True)
+@with_appcontext
+def export_attendance_command(fmt, start, end, course_id, batch_size, output):
+    """Export attendance joined with student, course and session data"""
+    chunks = generate_export(
+        fmt,
+        start=start,
+        end=end,
+        course_id=course_id,
+        batch_size=batch_size or current_app.config['EXPORT_BATCH_SIZE']
+    )
+
+    mode = 'wb' if fmt == 'parquet' else 'w'
+    with open(output, mode, newline='' if mode == 'w' else None) as f:
+        for chunk in chunks:
+            f.write(chunk)
+    click.echo(f'Attendance exported to {output}')
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create any missing database tables"""
+    db.create_all()
+    click.echo('Database tables created')
+
+@click.command('rebuild-attendance-summary')
+@with_appcontext
+def rebuild_attendance_summary_command():
+    """Recompute the per-course attendance summary tables"""
+    counts = rebuild_summaries()
+    click.echo(f"Rebuilt {counts['summaries']} student summaries across {counts['courses']} courses")
+
+def register_commands(app):
+    """Attach the CLI commands to the given app"""
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(import_students_command)
+    app.cli.add_command(import_enrollments_command)
+    app.cli.add_command(export_attendance_command)
+    app.cli.add_command(rebuild_attendance_summary_command)
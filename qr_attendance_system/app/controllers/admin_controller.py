@@ -1,8 +1,12 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import get_jwt_identity
-from app.models.models import db, User, Student, Faculty, Course, Enrollment, Session
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from app.models.models import db
+from app.repositories import get_repository
 from app.utils.helpers import role_required
-from datetime import datetime
+from app.utils.bulk_import import import_students_csv, import_enrollments_csv
+from app.utils.export import EXPORT_FORMATS, generate_export, parse_export_date
+from app.utils.database import pool_status
+from app.utils.profiler import profiler, ProfilerBusy, format_collapsed
+from app.utils.json_provider import json_list_response
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -11,91 +15,72 @@ admin_bp = Blueprint('admin', __name__)
 def get_all_users():
     """Get all users in the system"""
     try:
-        users = User.query.all()
+        repository = get_repository()
+        students = {student['user_id']: student for student in repository.list_students()}
+        faculties = {faculty['user_id']: faculty for faculty in repository.list_faculties()}
         user_data = []
         
-        for user in users:
+        for user in repository.list_users():
             user_info = {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'role': user.role,
-                'created_at': user.created_at
+                'id': user['id'],
+                'username': user['username'],
+                'email': user['email'],
+                'role': user['role'],
+                'created_at': user['created_at']
             }
             
             # Add role-specific information
-            if user.role == 'student':
-                student = Student.query.filter_by(user_id=user.id).first()
+            if user['role'] == 'student':
+                student = students.get(user['id'])
                 if student:
-                    user_info['student_id'] = student.student_id
-                    user_info['full_name'] = student.full_name
-                    user_info['department'] = student.department
-            elif user.role == 'faculty':
-                faculty = Faculty.query.filter_by(user_id=user.id).first()
+                    user_info['student_id'] = student['student_id']
+                    user_info['full_name'] = student['full_name']
+                    user_info['department'] = student['department']
+            elif user['role'] == 'faculty':
+                faculty = faculties.get(user['id'])
                 if faculty:
-                    user_info['faculty_id'] = faculty.faculty_id
-                    user_info['full_name'] = faculty.full_name
-                    user_info['department'] = faculty.department
+                    user_info['faculty_id'] = faculty['faculty_id']
+                    user_info['full_name'] = faculty['full_name']
+                    user_info['department'] = faculty['department']
                     
             user_data.append(user_info)
         
-        return jsonify({
-            'total_users': len(user_data),
-            'users': user_data
-        }), 200
+        return json_list_response('users', user_data, total_users=len(user_data))
     except Exception as e:
         return jsonify({'msg': 'Failed to retrieve users', 'error': str(e)}), 500
 
-@admin_bp.route('/admin/student/<int:student_id>', methods=['DELETE'])
+@admin_bp.route('/admin/student/<record_id:student_id>', methods=['DELETE'])
 @role_required('admin')
 def delete_student(student_id):
     """Delete a student and associated user"""
     try:
-        student = Student.query.get(student_id)
+        repository = get_repository()
+        student = repository.get_student(student_id)
         if not student:
             return jsonify({'msg': 'Student not found'}), 404
         
-        # Delete associated user
-        user = User.query.get(student.user_id)
-        
-        # Delete student record
-        db.session.delete(student)
-        
-        # Delete user record
-        if user:
-            db.session.delete(user)
-        
-        db.session.commit()
+        # Delete the user together with the student record
+        repository.delete_user(student['user_id'])
         
         return jsonify({'msg': 'Student deleted successfully'}), 200
     except Exception as e:
-        db.session.rollback()
         return jsonify({'msg': 'Failed to delete student', 'error': str(e)}), 500
 
-@admin_bp.route('/admin/faculty/<int:faculty_id>', methods=['DELETE'])
+@admin_bp.route('/admin/faculty/<record_id:faculty_id>', methods=['DELETE'])
 @role_required('admin')
 def delete_faculty(faculty_id):
     """Delete a faculty member and associated user"""
     try:
-        faculty = Faculty.query.get(faculty_id)
+        repository = get_repository()
+        faculty = repository.get_faculty(faculty_id)
         if not faculty:
             return jsonify({'msg': 'Faculty not found'}), 404
         
-        # Delete associated user
-        user = User.query.get(faculty.user_id)
-        
-        # Delete faculty record
-        db.session.delete(faculty)
-        
-        # Delete user record
-        if user:
-            db.session.delete(user)
-        
-        db.session.commit()
+        # Delete the user together with the faculty record
+        repository.delete_user(faculty['user_id'])
         
         return jsonify({'msg': 'Faculty deleted successfully'}), 200
     except Exception as e:
-        db.session.rollback()
         return jsonify({'msg': 'Failed to delete faculty', 'error': str(e)}), 500
 
 @admin_bp.route('/admin/course', methods=['POST'])
@@ -104,45 +89,40 @@ def create_course():
     """Create a new course"""
     try:
         data = request.get_json()
+        repository = get_repository()
         
         # Check if course code already exists
-        if Course.query.filter_by(course_code=data['course_code']).first():
+        if repository.get_course_by_code(data['course_code']):
             return jsonify({'msg': 'Course code already exists'}), 400
         
-        course = Course(
-            course_code=data['course_code'],
-            course_name=data['course_name'],
+        course = repository.create_course(
+            data['course_code'],
+            data['course_name'],
             department=data.get('department'),
             semester=data.get('semester'),
             faculty_id=data.get('faculty_id')
         )
         
-        db.session.add(course)
-        db.session.commit()
-        
         return jsonify({
             'msg': 'Course created successfully',
-            'course_id': course.id
+            'course_id': course['id']
         }), 201
     except Exception as e:
-        db.session.rollback()
         return jsonify({'msg': 'Failed to create course', 'error': str(e)}), 500
 
-@admin_bp.route('/admin/course/<int:course_id>', methods=['DELETE'])
+@admin_bp.route('/admin/course/<record_id:course_id>', methods=['DELETE'])
 @role_required('admin')
 def delete_course(course_id):
     """Delete a course"""
     try:
-        course = Course.query.get(course_id)
-        if not course:
+        repository = get_repository()
+        if not repository.get_course(course_id):
             return jsonify({'msg': 'Course not found'}), 404
         
-        db.session.delete(course)
-        db.session.commit()
+        repository.delete_course(course_id)
         
         return jsonify({'msg': 'Course deleted successfully'}), 200
     except Exception as e:
-        db.session.rollback()
         return jsonify({'msg': 'Failed to delete course', 'error': str(e)}), 500
 
 @admin_bp.route('/admin/enrollment', methods=['POST'])
@@ -153,76 +133,184 @@ def create_enrollment():
         data = request.get_json()
         student_id = data.get('student_id')
         course_id = data.get('course_id')
+        repository = get_repository()
         
         # Check if enrollment already exists
-        existing_enrollment = Enrollment.query.filter_by(
-            student_id=student_id,
-            course_id=course_id
-        ).first()
-        
-        if existing_enrollment:
+        if repository.is_enrolled(student_id, course_id):
             return jsonify({'msg': 'Student already enrolled in this course'}), 400
         
         # Check if student and course exist
-        student = Student.query.get(student_id)
-        course = Course.query.get(course_id)
-        
-        if not student:
+        if not repository.get_student(student_id):
             return jsonify({'msg': 'Student not found'}), 404
         
-        if not course:
+        if not repository.get_course(course_id):
             return jsonify({'msg': 'Course not found'}), 404
         
-        enrollment = Enrollment(
-            student_id=student_id,
-            course_id=course_id
-        )
+        enrollment = repository.enroll(student_id, course_id)
         
-        db.session.add(enrollment)
-        db.session.commit()
+        # A concurrent request can still enroll the student first
+        if not enrollment:
+            return jsonify({'msg': 'Student already enrolled in this course'}), 400
         
         return jsonify({
             'msg': 'Student enrolled successfully',
-            'enrollment_id': enrollment.id
+            'enrollment_id': enrollment['id']
         }), 201
     except Exception as e:
-        db.session.rollback()
         return jsonify({'msg': 'Failed to enroll student', 'error': str(e)}), 500
 
+def _sqlalchemy_only():
+    """Error response for routes that work on the SQLAlchemy tables directly"""
+    if current_app.config['STORAGE_BACKEND'] != 'sqlalchemy':
+        return jsonify({'msg': 'Only available with STORAGE_BACKEND=sqlalchemy'}), 501
+    return None
+
+def _csv_upload_stream():
+    """Return the uploaded CSV as a stream (multipart 'file' field or raw body)"""
+    upload = request.files.get('file')
+    return upload.stream if upload else request.stream
+
+@admin_bp.route('/admin/import/students', methods=['POST'])
+@role_required('admin')
+def import_students():
+    """Bulk import students (and optional enrollments) from a CSV file"""
+    unsupported = _sqlalchemy_only()
+    if unsupported:
+        return unsupported
+    
+    try:
+        chunk_size = request.args.get('chunk_size', current_app.config['BULK_IMPORT_CHUNK_SIZE'], type=int)
+        report = import_students_csv(
+            _csv_upload_stream(),
+            chunk_size=chunk_size,
+            hash_workers=current_app.config['BULK_IMPORT_HASH_WORKERS']
+        )
+        
+        return jsonify(report.to_dict()), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'msg': 'Failed to import students', 'error': str(e)}), 500
+
+@admin_bp.route('/admin/import/enrollments', methods=['POST'])
+@role_required('admin')
+def import_enrollments():
+    """Bulk enroll students in courses from a CSV file"""
+    unsupported = _sqlalchemy_only()
+    if unsupported:
+        return unsupported
+    
+    try:
+        chunk_size = request.args.get('chunk_size', current_app.config['BULK_IMPORT_CHUNK_SIZE'], type=int)
+        report = import_enrollments_csv(_csv_upload_stream(), chunk_size=chunk_size)
+        
+        return jsonify(report.to_dict()), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'msg': 'Failed to import enrollments', 'error': str(e)}), 500
+
+@admin_bp.route('/admin/export/attendance', methods=['GET'])
+@role_required('admin')
+def export_attendance():
+    """Stream attendance records as CSV or Parquet"""
+    unsupported = _sqlalchemy_only()
+    if unsupported:
+        return unsupported
+    
+    try:
+        fmt = request.args.get('format', 'csv').lower()
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'msg': f'Unsupported export format: {fmt}'}), 400
+        
+        try:
+            start = parse_export_date(request.args.get('start'))
+            end = parse_export_date(request.args.get('end'))
+        except ValueError:
+            return jsonify({'msg': 'Dates must be in ISO format (YYYY-MM-DD)'}), 400
+        
+        chunks = generate_export(
+            fmt,
+            start=start,
+            end=end,
+            course_id=request.args.get('course_id', type=int),
+            batch_size=current_app.config['EXPORT_BATCH_SIZE']
+        )
+        
+        mimetype, extension = EXPORT_FORMATS[fmt]
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename=attendance.{extension}'}
+        )
+    except Exception as e:
+        return jsonify({'msg': 'Failed to export attendance', 'error': str(e)}), 500
+
 @admin_bp.route('/admin/dashboard', methods=['GET'])
 @role_required('admin')
 def admin_dashboard():
     """Get admin dashboard statistics"""
     try:
-        # Get counts
-        total_students = Student.query.count()
-        total_faculties = Faculty.query.count()
-        total_courses = Course.query.count()
-        total_sessions = db.session.query(db.func.count()).select_from(Session).scalar() or 0
+        repository = get_repository()
         
-        # Get recent enrollments
-        recent_enrollments = Enrollment.query.order_by(Enrollment.enrollment_date.desc()).limit(5).all()
-        enrollment_data = []
+        # The SQLAlchemy backend serves counts from its in-memory counters
+        counts = repository.counts()
         
-        for enrollment in recent_enrollments:
-            student = Student.query.get(enrollment.student_id)
-            course = Course.query.get(enrollment.course_id)
-            
-            if student and course:
-                enrollment_data.append({
-                    'student_name': student.full_name,
-                    'course_name': course.course_name,
-                    'enrollment_date': enrollment.enrollment_date
-                })
+        # Get recent enrollments
+        enrollment_data = repository.recent_enrollments(limit=5)
         
         return jsonify({
             'statistics': {
-                'total_students': total_students,
-                'total_faculties': total_faculties,
-                'total_courses': total_courses,
-                'total_sessions': total_sessions
+                'total_students': counts['students'],
+                'total_faculties': counts['faculties'],
+                'total_courses': counts['courses'],
+                'total_sessions': counts['sessions']
             },
             'recent_enrollments': enrollment_data
         }), 200
     except Exception as e:
-        return jsonify({'msg': 'Failed to retrieve dashboard data', 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'msg': 'Failed to retrieve dashboard data', 'error': str(e)}), 500
+
+@admin_bp.route('/admin/db/pool', methods=['GET'])
+@role_required('admin')
+def database_pool():
+    """Get connection pool occupancy and checkout wait statistics"""
+    unsupported = _sqlalchemy_only()
+    if unsupported:
+        return unsupported
+    
+    try:
+        return jsonify(pool_status(db.engine)), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to retrieve pool statistics', 'error': str(e)}), 500
+
+@admin_bp.route('/admin/profile', methods=['GET'])
+@role_required('admin')
+def profile_requests():
+    """Sample request threads for a bounded window and return collapsed stacks"""
+    try:
+        if not current_app.config['PROFILER_ENABLED']:
+            return jsonify({'msg': 'Profiler is disabled (set PROFILER_ENABLED=1)'}), 404
+        
+        seconds = request.args.get('seconds', 10, type=float)
+        interval = request.args.get('interval_ms', 5, type=float) / 1000
+        max_seconds = current_app.config['PROFILER_MAX_SECONDS']
+        if not 0 < seconds <= max_seconds:
+            return jsonify({'msg': f'seconds must be between 0 and {max_seconds:g}'}), 400
+        if not 0.001 <= interval <= 1:
+            return jsonify({'msg': 'interval_ms must be between 1 and 1000'}), 400
+        
+        # Optionally keep only one endpoint, e.g. attendance.mark_attendance
+        try:
+            stacks, rounds = profiler.profile(seconds, interval, request.args.get('endpoint'))
+        except ProfilerBusy:
+            return jsonify({'msg': 'A profile is already running in this worker'}), 409
+        
+        return Response(
+            format_collapsed(stacks),
+            mimetype='text/plain',
+            headers={
+                'X-Profile-Samples': str(sum(stacks.values())),
+                'X-Profile-Rounds': str(rounds)
+            }
+        )
+    except Exception as e:
+        return jsonify({'msg': 'Failed to profile requests', 'error': str(e)}), 500
\ No newline at end of file
@@ -1,8 +1,12 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import get_jwt_identity, get_jwt
-from app.models.models import db, Session, Attendance, Student, Course, Enrollment
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import get_jwt_identity, get_jwt, create_access_token, decode_token, verify_jwt_in_request
+from app.repositories import get_repository, record_id
 from app.utils.helpers import role_required, roles_required, generate_time_bound_qr
-from datetime import datetime
+from app.utils.live import publish_attendance, live_response
+from app.utils.tracing import traced, span
+from app.utils.json_provider import json_list_response
+from app.utils.offline_scans import MAX_BATCH_SIZE, validate_scans
+from datetime import datetime, timedelta
 
 attendance_bp = Blueprint('attendance', __name__)
 
@@ -22,27 +26,19 @@ def create_session():
         qr_data = generate_time_bound_qr(course_id, faculty_id)
         
         # Create session
-        session = Session(
-            course_id=course_id,
-            faculty_id=faculty_id,
-            qr_code_token=qr_data['token'],
-            qr_expiration=qr_data['expiration']
-        )
-        
-        db.session.add(session)
-        db.session.commit()
+        session = get_repository().create_session(course_id, faculty_id, qr_data['token'], qr_data['expiration'])
         
         return jsonify({
             'msg': 'Session created successfully',
-            'session_id': session.id,
+            'session_id': session['id'],
             'qr_code': qr_data['qr_code'],
             'expiration': qr_data['expiration']
         }), 201
     except Exception as e:
-        db.session.rollback()
         return jsonify({'msg': 'Failed to create session', 'error': str(e)}), 500
 
 @attendance_bp.route('/student/attendance/mark', methods=['POST'])
+@traced('mark_attendance')
 @role_required('student')
 def mark_attendance():
     """Mark attendance using QR code token"""
@@ -54,100 +50,201 @@ def mark_attendance():
         if not qr_token:
             return jsonify({'msg': 'QR token is required'}), 400
         
+        repository = get_repository()
+        
         # Find the session with the QR token
-        session = Session.query.filter_by(qr_code_token=qr_token).first()
+        with span('session.lookup'):
+            session = repository.get_session_by_token(qr_token)
         
         if not session:
             return jsonify({'msg': 'Invalid QR code'}), 400
         
         # Check if session is still active
-        if not session.is_active or session.qr_expiration < datetime.utcnow():
+        if not session['is_active'] or session['qr_expiration'] < datetime.utcnow():
             return jsonify({'msg': 'QR code has expired'}), 400
         
         # Get student profile
-        student = Student.query.filter_by(user_id=student_user_id).first()
+        with span('student.lookup'):
+            student = repository.get_student_by_user_id(student_user_id)
         
         if not student:
             return jsonify({'msg': 'Student profile not found'}), 404
         
         # Check if student is enrolled in the course
-        enrollment = Enrollment.query.filter_by(
-            student_id=student.id,
-            course_id=session.course_id
-        ).first()
+        with span('enrollment.check'):
+            enrolled = repository.is_enrolled(student['id'], session['course_id'])
         
-        if not enrollment:
+        if not enrolled:
             return jsonify({'msg': 'You are not enrolled in this course'}), 403
         
-        # Check if attendance already marked
-        existing_attendance = Attendance.query.filter_by(
-            session_id=session.id,
-            student_id=student.id
-        ).first()
+        # Mark attendance; the backend rejects a second mark for the session
+        marked_at = datetime.utcnow()
         
-        if existing_attendance:
+        with span('attendance.mark'):
+            marked = repository.mark_attendance(session, student['id'], marked_at)
+        
+        if not marked:
             return jsonify({'msg': 'Attendance already marked for this session'}), 400
         
-        # Mark attendance
-        attendance = Attendance(
-            session_id=session.id,
-            student_id=student.id
+        with span('live.publish'):
+            publish_attendance(session['id'], student['student_id'], student['full_name'], marked_at)
+        
+        # Get course information
+        with span('course.lookup'):
+            course = repository.get_course(session['course_id'])
+        
+        with span('serialize'):
+            response = jsonify({
+                'msg': 'Attendance marked successfully',
+                'course': course['course_name'] if course else 'Unknown',
+                'session_date': session['session_date']
+            })
+        return response, 201
+    except Exception as e:
+        return jsonify({'msg': 'Failed to mark attendance', 'error': str(e)}), 500
+
+@attendance_bp.route('/student/attendance/mark/batch', methods=['POST'])
+@role_required('student')
+def mark_attendance_batch():
+    """Mark attendance for scans the mobile app queued while offline"""
+    try:
+        student_user_id = get_jwt_identity()
+        data = request.get_json() or {}
+        scans = data.get('scans')
+        
+        if not isinstance(scans, list) or not scans:
+            return jsonify({'msg': 'scans must be a non-empty list'}), 400
+        if len(scans) > MAX_BATCH_SIZE:
+            return jsonify({'msg': f'At most {MAX_BATCH_SIZE} scans per batch'}), 413
+        
+        repository = get_repository()
+        student = repository.get_student_by_user_id(student_user_id)
+        
+        if not student:
+            return jsonify({'msg': 'Student profile not found'}), 404
+        
+        # Check every scan against its session's window at capture time
+        accepted, results = validate_scans(
+            repository, scans, data.get('sent_at'), datetime.utcnow(),
+            max_delay=timedelta(seconds=current_app.config['OFFLINE_SCAN_MAX_DELAY']),
+            max_skew=timedelta(seconds=current_app.config['OFFLINE_SCAN_MAX_CLOCK_SKEW'])
         )
         
-        db.session.add(attendance)
-        db.session.commit()
+        # Enrollment is checked once per course
+        enrolled = {}
+        marks = []
+        for index, session, marked_at in accepted:
+            course_id = session['course_id']
+            if course_id not in enrolled:
+                enrolled[course_id] = repository.is_enrolled(student['id'], course_id)
+            if enrolled[course_id]:
+                marks.append((index, session, marked_at))
+            else:
+                results[index].update(status='not_enrolled', msg='You are not enrolled in this course')
         
-        # Get course information
-        course = Course.query.get(session.course_id)
+        # One round trip for the whole batch
+        marked = repository.mark_attendance_batch([(session, student['id'], marked_at) for _, session, marked_at in marks])
+        for (index, session, marked_at), ok in zip(marks, marked):
+            if not ok:
+                results[index].update(status='already_marked', msg='Attendance already marked for this session')
+                continue
+            results[index].update(status='marked', session_id=session['id'], marked_at=marked_at)
+            publish_attendance(session['id'], student['student_id'], student['full_name'], marked_at)
         
-        return jsonify({
-            'msg': 'Attendance marked successfully',
-            'course': course.course_name if course else 'Unknown',
-            'session_date': session.session_date
-        }), 201
+        return jsonify({'marked': sum(marked), 'results': results}), 200
     except Exception as e:
-        db.session.rollback()
         return jsonify({'msg': 'Failed to mark attendance', 'error': str(e)}), 500
 
-@attendance_bp.route('/faculty/session/<int:session_id>/attendances', methods=['GET'])
+@attendance_bp.route('/faculty/session/<record_id:session_id>/attendances', methods=['GET'])
 @role_required('faculty')
 def get_session_attendances(session_id):
     """Get all attendances for a specific session"""
     try:
         faculty_id = get_jwt().get('user_id')
         
+        repository = get_repository()
+        
         # Verify the session belongs to this faculty
-        session = Session.query.filter_by(id=session_id, faculty_id=faculty_id).first()
+        session = repository.get_session(session_id)
         
-        if not session:
+        if not session or session['faculty_id'] != faculty_id:
             return jsonify({'msg': 'Session not found or unauthorized'}), 404
         
-        # Get all attendances for this session
-        attendances = Attendance.query.filter_by(session_id=session_id).all()
-        
-        # Prepare attendance data
-        attendance_data = []
-        for att in attendances:
-            student = Student.query.get(att.student_id)
-            if student:
-                attendance_data.append({
-                    'student_id': student.student_id,
-                    'student_name': student.full_name,
-                    'marked_at': att.marked_at
-                })
+        # Get all attendances for this session with the student names
+        attendance_data = repository.session_attendances(session_id)
         
         # Get course information
-        course = Course.query.get(session.course_id)
+        course = repository.get_course(session['course_id'])
         
         return jsonify({
             'session_id': session_id,
-            'course': course.course_name if course else 'Unknown',
+            'course': course['course_name'] if course else 'Unknown',
             'total_attendances': len(attendance_data),
             'attendances': attendance_data
         }), 200
     except Exception as e:
         return jsonify({'msg': 'Failed to retrieve attendances', 'error': str(e)}), 500
 
+@attendance_bp.route('/faculty/session/<record_id:session_id>/live/token', methods=['POST'])
+@role_required('faculty')
+def create_live_token(session_id):
+    """Issue a short-lived token that opens the live feed of one session"""
+    try:
+        faculty_id = get_jwt().get('user_id')
+        
+        repository = get_repository()
+        
+        # Verify the session belongs to this faculty
+        session = repository.get_session(session_id)
+        
+        if not session or session['faculty_id'] != faculty_id:
+            return jsonify({'msg': 'Session not found or unauthorized'}), 404
+        
+        # No role claim: the token opens this feed and is refused everywhere else
+        expires_in = current_app.config['LIVE_STREAM_TOKEN_EXPIRES']
+        token = create_access_token(
+            identity=get_jwt_identity(),
+            additional_claims={'user_id': faculty_id, 'live_session': session_id},
+            expires_delta=timedelta(seconds=expires_in)
+        )
+        
+        return jsonify({'stream_token': token, 'expires_in': expires_in}), 201
+    except Exception as e:
+        return jsonify({'msg': 'Failed to issue stream token', 'error': str(e)}), 500
+
+@attendance_bp.route('/faculty/session/<record_id:session_id>/live', methods=['GET'])
+def live_session_attendances(session_id):
+    """Stream newly marked attendances for a session as Server-Sent Events"""
+    # Browsers' EventSource cannot send an Authorization header, so the feed
+    # also takes a stream token from /live/token in the query string
+    token = request.args.get('token')
+    if token:
+        claims = decode_token(token)
+        if claims.get('live_session') != session_id:
+            return jsonify({'msg': 'Stream token is not valid for this session'}), 403
+    else:
+        verify_jwt_in_request()
+        claims = get_jwt()
+        if claims.get('role') != 'faculty':
+            return jsonify(msg='Missing required role: faculty'), 403
+    
+    try:
+        faculty_id = claims.get('user_id')
+        
+        repository = get_repository()
+        
+        # Verify the session belongs to this faculty
+        session = repository.get_session(session_id)
+        
+        if not session or session['faculty_id'] != faculty_id:
+            return jsonify({'msg': 'Session not found or unauthorized'}), 404
+        
+        count = repository.session_attendance_count(session_id)
+        
+        return live_response(session_id, count)
+    except Exception as e:
+        return jsonify({'msg': 'Failed to open live feed', 'error': str(e)}), 500
+
 @attendance_bp.route('/student/attendance/history', methods=['GET'])
 @role_required('student')
 def get_student_attendance_history():
@@ -155,32 +252,66 @@ def get_student_attendance_history():
     try:
         student_user_id = get_jwt_identity()
         
+        repository = get_repository()
+        
         # Get student profile
-        student = Student.query.filter_by(user_id=student_user_id).first()
+        student = repository.get_student_by_user_id(student_user_id)
         
         if not student:
             return jsonify({'msg': 'Student profile not found'}), 404
         
-        # Get all attendances for this student
-        attendances = Attendance.query.filter_by(student_id=student.id).all()
-        
-        # Prepare attendance data
-        attendance_data = []
-        for att in attendances:
-            session = Session.query.get(att.session_id)
-            course = Course.query.get(session.course_id) if session else None
-            
-            attendance_data.append({
-                'course': course.course_name if course else 'Unknown',
-                'course_code': course.course_code if course else 'Unknown',
-                'session_date': session.session_date if session else None,
-                'marked_at': att.marked_at
-            })
+        # Get all attendances for this student with course and session details
+        attendance_data = repository.student_history(student['id'])
+        
+        return json_list_response(
+            'attendance_history',
+            attendance_data,
+            student_name=student['full_name'],
+            total_attendances=len(attendance_data)
+        )
+    except Exception as e:
+        return jsonify({'msg': 'Failed to retrieve attendance history', 'error': str(e)}), 500
+
+@attendance_bp.route('/faculty/attendance/report', methods=['GET'])
+@role_required('faculty')
+def get_attendance_report():
+    """Get per-student attendance for one of the faculty's courses"""
+    try:
+        course_id = request.args.get('course_id', type=record_id)
+        
+        if not course_id:
+            return jsonify({'msg': 'Course ID is required'}), 400
+        
+        repository = get_repository()
+        
+        # Verify the course belongs to this faculty
+        faculty = repository.get_faculty_by_user_id(get_jwt_identity())
+        course = repository.get_course(course_id)
+        
+        if not course or not faculty or course['faculty_id'] != faculty['id']:
+            return jsonify({'msg': 'Course not found or unauthorized'}), 404
+        
+        report = repository.course_report(course_id)
+        report['course'] = course['course_name']
+        
+        return jsonify(report), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to generate report', 'error': str(e)}), 500
+
+@attendance_bp.route('/student/attendance/summary', methods=['GET'])
+@role_required('student')
+def get_student_attendance_summary():
+    """Get per-course attendance totals for the logged-in student"""
+    try:
+        repository = get_repository()
+        student = repository.get_student_by_user_id(get_jwt_identity())
+        
+        if not student:
+            return jsonify({'msg': 'Student profile not found'}), 404
         
         return jsonify({
-            'student_name': student.full_name,
-            'total_attendances': len(attendance_data),
-            'attendance_history': attendance_data
+            'student_name': student['full_name'],
+            'courses': repository.student_summary(student['id'])
         }), 200
     except Exception as e:
-        return jsonify({'msg': 'Failed to retrieve attendance history', 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'msg': 'Failed to retrieve attendance summary', 'error': str(e)}), 500
\ No newline at end of file
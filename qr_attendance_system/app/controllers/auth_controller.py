@@ -1,8 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, get_jwt_identity, get_jwt
-from app.models.models import db, User, Student, Faculty
+from app.models.models import hash_password, check_password
+from app.repositories import get_repository
 from app.utils.helpers import role_required
-import bcrypt
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -11,40 +11,33 @@ def register_student():
     """Register a new student"""
     try:
         data = request.get_json()
+        repository = get_repository()
         
         # Check if user already exists
-        if User.query.filter_by(username=data['username']).first():
+        if repository.get_user_by_username(data['username']):
             return jsonify({'msg': 'Username already exists'}), 400
         
-        if User.query.filter_by(email=data['email']).first():
+        if repository.get_user_by_email(data['email']):
             return jsonify({'msg': 'Email already exists'}), 400
         
         # Create user
-        user = User(
-            username=data['username'],
-            email=data['email'],
-            role='student'
-        )
-        user.set_password(data['password'])
-        
-        db.session.add(user)
-        db.session.flush()  # Get the user ID without committing
-        
-        # Create student profile
-        student = Student(
-            user_id=user.id,
-            student_id=data['student_id'],
-            full_name=data['full_name'],
-            department=data.get('department'),
-            semester=data.get('semester')
-        )
-        
-        db.session.add(student)
-        db.session.commit()
+        user = repository.create_user(data['username'], data['email'], hash_password(data['password']), 'student')
+        
+        # Create student profile; remove the user again if that fails
+        try:
+            repository.create_student(
+                user['id'],
+                data['student_id'],
+                data['full_name'],
+                department=data.get('department'),
+                semester=data.get('semester')
+            )
+        except Exception:
+            repository.delete_user(user['id'])
+            raise
         
         return jsonify({'msg': 'Student registered successfully'}), 201
     except Exception as e:
-        db.session.rollback()
         return jsonify({'msg': 'Registration failed', 'error': str(e)}), 500
 
 @auth_bp.route('/register/faculty', methods=['POST'])
@@ -52,39 +45,32 @@ def register_faculty():
     """Register a new faculty member (admin only)"""
     try:
         data = request.get_json()
+        repository = get_repository()
         
         # Check if user already exists
-        if User.query.filter_by(username=data['username']).first():
+        if repository.get_user_by_username(data['username']):
             return jsonify({'msg': 'Username already exists'}), 400
         
-        if User.query.filter_by(email=data['email']).first():
+        if repository.get_user_by_email(data['email']):
             return jsonify({'msg': 'Email already exists'}), 400
         
         # Create user
-        user = User(
-            username=data['username'],
-            email=data['email'],
-            role='faculty'
-        )
-        user.set_password(data['password'])
-        
-        db.session.add(user)
-        db.session.flush()  # Get the user ID without committing
-        
-        # Create faculty profile
-        faculty = Faculty(
-            user_id=user.id,
-            faculty_id=data['faculty_id'],
-            full_name=data['full_name'],
-            department=data.get('department')
-        )
-        
-        db.session.add(faculty)
-        db.session.commit()
+        user = repository.create_user(data['username'], data['email'], hash_password(data['password']), 'faculty')
+        
+        # Create faculty profile; remove the user again if that fails
+        try:
+            repository.create_faculty(
+                user['id'],
+                data['faculty_id'],
+                data['full_name'],
+                department=data.get('department')
+            )
+        except Exception:
+            repository.delete_user(user['id'])
+            raise
         
         return jsonify({'msg': 'Faculty registered successfully'}), 201
     except Exception as e:
-        db.session.rollback()
         return jsonify({'msg': 'Registration failed', 'error': str(e)}), 500
 
 @auth_bp.route('/login', methods=['POST'])
@@ -98,24 +84,24 @@ def login():
         if not username or not password:
             return jsonify({'msg': 'Missing username or password'}), 400
         
-        user = User.query.filter_by(username=username).first()
+        user = get_repository().get_user_by_username(username)
         
-        if user and user.check_password(password):
+        if user and user['password_hash'] and check_password(password, user['password_hash']):
             # Create additional claims
             additional_claims = {
-                'role': user.role,
-                'user_id': user.id
+                'role': user['role'],
+                'user_id': user['id']
             }
             
             access_token = create_access_token(
-                identity=user.id, 
+                identity=user['id'], 
                 additional_claims=additional_claims
             )
             
             return jsonify({
                 'access_token': access_token,
-                'role': user.role,
-                'user_id': user.id
+                'role': user['role'],
+                'user_id': user['id']
             }), 200
         else:
             return jsonify({'msg': 'Invalid credentials'}), 401
@@ -127,24 +113,25 @@ def login():
 def student_profile():
     """Get student profile information"""
     try:
+        repository = get_repository()
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = repository.get_user(current_user_id)
         
         if not user:
             return jsonify({'msg': 'User not found'}), 404
             
-        student = Student.query.filter_by(user_id=current_user_id).first()
+        student = repository.get_student_by_user_id(current_user_id)
         
         if not student:
             return jsonify({'msg': 'Student profile not found'}), 404
             
         return jsonify({
-            'username': user.username,
-            'email': user.email,
-            'student_id': student.student_id,
-            'full_name': student.full_name,
-            'department': student.department,
-            'semester': student.semester
+            'username': user['username'],
+            'email': user['email'],
+            'student_id': student['student_id'],
+            'full_name': student['full_name'],
+            'department': student['department'],
+            'semester': student['semester']
         }), 200
     except Exception as e:
         return jsonify({'msg': 'Failed to retrieve profile', 'error': str(e)}), 500
\ No newline at end of file
@@ -1,12 +1,23 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-import bcrypt
-import qrcode
 from io import BytesIO
 import base64
+from app.utils.metrics import timer
 
 db = SQLAlchemy()
 
+def hash_password(password):
+    """Return a bcrypt hash of the given password"""
+    import bcrypt
+    with timer('password_hash_seconds', 'hash'):
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+def check_password(password, password_hash):
+    """Check a password against a bcrypt hash from hash_password"""
+    import bcrypt
+    with timer('password_hash_seconds', 'check'):
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -23,11 +34,11 @@ class User(db.Model):
     
     def set_password(self, password):
         """Hash and set the user's password"""
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         """Check if the provided password matches the hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return check_password(password, self.password_hash)
     
     def __repr__(self):
         return f'<User {self.username}>'
@@ -113,6 +124,8 @@ class Session(db.Model):
     
     def generate_qr_code(self):
         """Generate a QR code for this session"""
+        # qrcode pulls in PIL; import it on first use, not at startup
+        import qrcode
         qr = qrcode.QRCode(version=1, box_size=10, border=5)
         qr.add_data(self.qr_code_token)
         qr.make(fit=True)
@@ -141,4 +154,25 @@ class Attendance(db.Model):
     student = db.relationship('Student')
     
     def __repr__(self):
-        return f'<Attendance Session:{self.session_id} Student:{self.student_id}>'
\ No newline at end of file
+        return f'<Attendance Session:{self.session_id} Student:{self.student_id}>'
+
+class CourseAttendanceSummary(db.Model):
+    __tablename__ = 'course_attendance_summary'
+    
+    # Maintained incrementally on every mark; rebuilt by `flask rebuild-attendance-summary`
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True, index=True)
+    sessions_attended = db.Column(db.Integer, nullable=False, default=0)
+    last_marked_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<CourseAttendanceSummary Course:{self.course_id} Student:{self.student_id}>'
+
+class CourseSessionCount(db.Model):
+    __tablename__ = 'course_session_count'
+    
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), primary_key=True)
+    session_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<CourseSessionCount Course:{self.course_id} Sessions:{self.session_count}>'
\ No newline at end of file
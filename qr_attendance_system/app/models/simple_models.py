@@ -1,6 +1,7 @@
 """
 Simple models for the QR Attendance System
-This version doesn't depend on external packages for easier testing
+This version doesn't depend on external packages for easier testing.
+They are stored by app.repositories.memory.MemoryRepository.
 """
 
 import json
@@ -11,7 +12,7 @@ class SimpleModel:
     """Base class for all models"""
     def __init__(self):
         self.id = str(uuid.uuid4())
-        self.created_at = datetime.now().isoformat()
+        self.created_at = datetime.now()
     
     def to_dict(self):
         """Convert model to dictionary"""
@@ -24,16 +25,16 @@ class SimpleModel:
 
 class User(SimpleModel):
     """User model for students, faculty, and admins"""
-    def __init__(self, username, email, password, role):
+    def __init__(self, username, email, password_hash, role):
         super().__init__()
         self.username = username
         self.email = email
-        self.password = password  # In real app, this would be hashed
+        self.password_hash = password_hash  # The demo stores the password as given
         self.role = role  # student, faculty, admin
     
     def check_password(self, password):
         """Check if provided password matches stored password"""
-        return self.password == password
+        return self.password_hash == password
 
 class Student(SimpleModel):
     """Student profile model"""
@@ -64,100 +65,29 @@ class Course(SimpleModel):
         self.semester = semester
         self.faculty_id = faculty_id
 
+class Enrollment(SimpleModel):
+    """Student enrollment in a course"""
+    def __init__(self, student_id, course_id):
+        super().__init__()
+        self.student_id = student_id
+        self.course_id = course_id
+        self.enrollment_date = self.created_at
+
 class Session(SimpleModel):
     """Attendance session with QR code"""
-    def __init__(self, course_id, faculty_id):
+    def __init__(self, course_id, faculty_id, qr_code_token=None, qr_expiration=None):
         super().__init__()
         self.course_id = course_id
         self.faculty_id = faculty_id
-        self.qr_code_token = str(uuid.uuid4())
-        self.qr_expiration = (datetime.now() + timedelta(minutes=3)).isoformat()
+        self.session_date = self.created_at
+        self.qr_code_token = qr_code_token or str(uuid.uuid4())
+        self.qr_expiration = qr_expiration or datetime.now() + timedelta(minutes=3)
         self.is_active = True
 
 class Attendance(SimpleModel):
     """Attendance record"""
-    def __init__(self, session_id, student_id):
+    def __init__(self, session_id, student_id, marked_at=None):
         super().__init__()
         self.session_id = session_id
         self.student_id = student_id
-        self.marked_at = datetime.now().isoformat()
-
-# Simple in-memory storage for demonstration
-class Storage:
-    """Simple storage for demonstration purposes"""
-    def __init__(self):
-        self.users = {}
-        self.students = {}
-        self.faculties = {}
-        self.courses = {}
-        self.sessions = {}
-        self.attendances = {}
-    
-    def add_user(self, user):
-        self.users[user.id] = user
-    
-    def get_user(self, user_id):
-        return self.users.get(user_id)
-    
-    def get_user_by_username(self, username):
-        for user in self.users.values():
-            if user.username == username:
-                return user
-        return None
-    
-    def add_student(self, student):
-        self.students[student.id] = student
-    
-    def get_student(self, student_id):
-        return self.students.get(student_id)
-    
-    def get_student_by_user_id(self, user_id):
-        for student in self.students.values():
-            if student.user_id == user_id:
-                return student
-        return None
-    
-    def add_faculty(self, faculty):
-        self.faculties[faculty.id] = faculty
-    
-    def get_faculty(self, faculty_id):
-        return self.faculties.get(faculty_id)
-    
-    def get_faculty_by_user_id(self, user_id):
-        for faculty in self.faculties.values():
-            if faculty.user_id == user_id:
-                return faculty
-        return None
-    
-    def add_course(self, course):
-        self.courses[course.id] = course
-    
-    def get_course(self, course_id):
-        return self.courses.get(course_id)
-    
-    def add_session(self, session):
-        self.sessions[session.id] = session
-    
-    def get_session(self, session_id):
-        return self.sessions.get(session_id)
-    
-    def get_session_by_token(self, token):
-        for session in self.sessions.values():
-            if session.qr_code_token == token:
-                return session
-        return None
-    
-    def add_attendance(self, attendance):
-        self.attendances[attendance.id] = attendance
-    
-    def get_attendance(self, attendance_id):
-        return self.attendances.get(attendance_id)
-    
-    def get_attendances_by_session(self, session_id):
-        return [a for a in self.attendances.values() if a.session_id == session_id]
-    
-    def get_attendances_by_student(self, student_id):
-        return [a for a in self.attendances.values() if a.student_id == student_id]
-
-# Global storage instance
-storage = Storage()
\ No newline at end of file
+        self.marked_at = marked_at or datetime.now()
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""Storage backends behind a common repository interface"""
+
+from flask import current_app
+from werkzeug.routing import BaseConverter
+from app.repositories.base import AttendanceRepository, RepositoryError
+
+BACKENDS = ('sqlalchemy', 'supabase', 'memory')
+
+def create_repository(config):
+    """Build the repository selected by config['STORAGE_BACKEND']"""
+    backend = config.get('STORAGE_BACKEND', 'sqlalchemy')
+
+    # Backends are imported on demand so unused drivers need not be installed
+    if backend == 'sqlalchemy':
+        from app.repositories.sqlalchemy import SQLAlchemyRepository
+        return SQLAlchemyRepository()
+    if backend == 'supabase':
+        from app.repositories.supabase import SupabaseRepository
+        return SupabaseRepository.from_config(config)
+    if backend == 'memory':
+        from app.repositories.memory import MemoryRepository
+        return MemoryRepository()
+    raise RepositoryError(f'Unknown storage backend {backend!r}, expected one of {", ".join(BACKENDS)}')
+
+def record_id(value):
+    """Parse a record id from a URL: an int, or a string id of the memory backend"""
+    return int(value) if value.isdigit() else value
+
+class RecordIdConverter(BaseConverter):
+    """<record_id:name> route parts, parsed with record_id"""
+    regex = r'[^/]+'
+
+    def to_python(self, value):
+        return record_id(value)
+
+def init_repository(app):
+    """Create the app's repository and the record_id URL converter"""
+    repository = create_repository(app.config)
+    app.extensions['repository'] = repository
+    app.url_map.converters['record_id'] = RecordIdConverter
+    return repository
+
+def get_repository():
+    """Return the repository of the current app"""
+    return current_app.extensions['repository']
@@ -0,0 +1,138 @@
+"""
+Storage interface shared by every backend
+
+Records are plain dicts keyed by the column names of app/models/models.py,
+so routes work the same whichever backend stores the data.
+"""
+
+class RepositoryError(Exception):
+    """A storage backend could not complete an operation"""
+
+class AttendanceRepository:
+    """Users, courses, sessions, attendance and reports"""
+
+    # Users and profiles
+
+    def get_user(self, user_id):
+        raise NotImplementedError
+
+    def get_user_by_username(self, username):
+        raise NotImplementedError
+
+    def get_user_by_email(self, email):
+        raise NotImplementedError
+
+    def list_users(self):
+        raise NotImplementedError
+
+    def create_user(self, username, email, password_hash, role):
+        raise NotImplementedError
+
+    def delete_user(self, user_id):
+        """Delete a user together with their student or faculty profile"""
+        raise NotImplementedError
+
+    def list_students(self):
+        raise NotImplementedError
+
+    def list_faculties(self):
+        raise NotImplementedError
+
+    def get_student(self, student_id):
+        raise NotImplementedError
+
+    def get_student_by_user_id(self, user_id):
+        raise NotImplementedError
+
+    def create_student(self, user_id, student_id, full_name, department=None, semester=None):
+        raise NotImplementedError
+
+    def get_faculty(self, faculty_id):
+        raise NotImplementedError
+
+    def get_faculty_by_user_id(self, user_id):
+        raise NotImplementedError
+
+    def create_faculty(self, user_id, faculty_id, full_name, department=None):
+        raise NotImplementedError
+
+    # Courses and enrollment
+
+    def get_course(self, course_id):
+        raise NotImplementedError
+
+    def get_course_by_code(self, course_code):
+        raise NotImplementedError
+
+    def list_courses(self, faculty_id=None):
+        """All courses, or only those taught by one faculty"""
+        raise NotImplementedError
+
+    def create_course(self, course_code, course_name, department=None, semester=None, faculty_id=None):
+        raise NotImplementedError
+
+    def delete_course(self, course_id):
+        raise NotImplementedError
+
+    def enroll(self, student_id, course_id):
+        """Enroll a student; return the enrollment, or None if already enrolled"""
+        raise NotImplementedError
+
+    def is_enrolled(self, student_id, course_id):
+        raise NotImplementedError
+
+    # Sessions and attendance
+
+    def create_session(self, course_id, faculty_id, qr_code_token, qr_expiration):
+        raise NotImplementedError
+
+    def get_session(self, session_id):
+        raise NotImplementedError
+
+    def get_session_by_token(self, token):
+        raise NotImplementedError
+
+    def list_sessions(self):
+        raise NotImplementedError
+
+    def mark_attendance(self, session, student_id, marked_at):
+        """Record one attendance; return False if it was already marked"""
+        return self.mark_attendance_batch([(session, student_id, marked_at)])[0]
+
+    def mark_attendance_batch(self, marks):
+        """
+        Record (session, student_id, marked_at) tuples in one round trip.
+
+        Returns one bool per mark: True if it was recorded, False if the
+        student was already marked for that session.
+        """
+        raise NotImplementedError
+
+    # Reports
+
+    def counts(self):
+        """Row totals: users, students, faculties, courses, sessions, attendances"""
+        raise NotImplementedError
+
+    def recent_enrollments(self, limit=5):
+        """[{student_name, course_name, enrollment_date}], newest first"""
+        raise NotImplementedError
+
+    def session_attendance_count(self, session_id):
+        raise NotImplementedError
+
+    def session_attendances(self, session_id):
+        """[{student_id, student_name, marked_at}] for one session"""
+        raise NotImplementedError
+
+    def student_history(self, student_id):
+        """[{session_id, course_id, course, course_code, session_date, marked_at}] for one student"""
+        raise NotImplementedError
+
+    def course_report(self, course_id):
+        """Per-student attendance of a course (see app.utils.summary.build_course_report)"""
+        raise NotImplementedError
+
+    def student_summary(self, student_id):
+        """Per-course attendance of a student (see app.utils.summary.build_student_summary)"""
+        raise NotImplementedError
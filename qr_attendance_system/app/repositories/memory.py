@@ -0,0 +1,270 @@
+"""
+In-memory storage backend
+
+Used by the web demo (simple_app.py) and the command line demo. Every lookup
+by username, user, token, code or session has its own index, and attendance
+totals are kept as running counters like the summary tables of the
+SQLAlchemy backend. Data lives in process memory only.
+"""
+
+import threading
+from app.models.simple_models import User, Student, Faculty, Course, Enrollment, Session, Attendance
+from app.repositories.base import AttendanceRepository
+from app.utils.summary import build_course_report, build_student_summary
+
+class MemoryRepository(AttendanceRepository):
+    """Indexed dict storage of simple_models records"""
+    def __init__(self):
+        self._lock = threading.RLock()
+
+        self.users = {}
+        self.students = {}
+        self.faculties = {}
+        self.courses = {}
+        self.enrollments = {}
+        self.sessions = {}
+        self.attendances = {}
+
+        # Secondary indexes
+        self._users_by_username = {}
+        self._users_by_email = {}
+        self._students_by_user = {}
+        self._faculties_by_user = {}
+        self._courses_by_code = {}
+        self._sessions_by_token = {}
+        self._attendances_by_session = {}  # session_id -> {student_id: attendance}
+        self._attendances_by_student = {}  # student_id -> [attendance]
+        self._enrollments = {}  # course_id -> {student_id: enrollment}
+        self._student_courses = {}  # student_id -> {course_id}
+
+        # Running totals so reports never rescan the attendance log
+        self._session_counts = {}  # course_id -> sessions created
+        self._attendance_totals = {}  # (course_id, student_id) -> (attended, last_marked_at)
+
+    # Users and profiles
+
+    def get_user(self, user_id):
+        return self.users.get(user_id)
+
+    def get_user_by_username(self, username):
+        return self._users_by_username.get(username)
+
+    def get_user_by_email(self, email):
+        return self._users_by_email.get(email)
+
+    def list_users(self):
+        return list(self.users.values())
+
+    def create_user(self, username, email, password_hash, role):
+        user = User(username, email, password_hash, role).to_dict()
+        with self._lock:
+            self.users[user['id']] = user
+            self._users_by_username[username] = user
+            self._users_by_email[email] = user
+        return user
+
+    def delete_user(self, user_id):
+        with self._lock:
+            user = self.users.pop(user_id, None)
+            if user:
+                self._users_by_username.pop(user['username'], None)
+                self._users_by_email.pop(user['email'], None)
+
+            student = self._students_by_user.pop(user_id, None)
+            if student:
+                self.students.pop(student['id'], None)
+                for course_id in self._student_courses.pop(student['id'], set()):
+                    enrollment = self._enrollments.get(course_id, {}).pop(student['id'], None)
+                    if enrollment:
+                        self.enrollments.pop(enrollment['id'], None)
+
+            faculty = self._faculties_by_user.pop(user_id, None)
+            if faculty:
+                self.faculties.pop(faculty['id'], None)
+
+    def list_students(self):
+        return list(self.students.values())
+
+    def list_faculties(self):
+        return list(self.faculties.values())
+
+    def get_student(self, student_id):
+        return self.students.get(student_id)
+
+    def get_student_by_user_id(self, user_id):
+        return self._students_by_user.get(user_id)
+
+    def create_student(self, user_id, student_id, full_name, department=None, semester=None):
+        student = Student(user_id, student_id, full_name, department, semester).to_dict()
+        with self._lock:
+            self.students[student['id']] = student
+            self._students_by_user[user_id] = student
+        return student
+
+    def get_faculty(self, faculty_id):
+        return self.faculties.get(faculty_id)
+
+    def get_faculty_by_user_id(self, user_id):
+        return self._faculties_by_user.get(user_id)
+
+    def create_faculty(self, user_id, faculty_id, full_name, department=None):
+        faculty = Faculty(user_id, faculty_id, full_name, department).to_dict()
+        with self._lock:
+            self.faculties[faculty['id']] = faculty
+            self._faculties_by_user[user_id] = faculty
+        return faculty
+
+    # Courses and enrollment
+
+    def get_course(self, course_id):
+        return self.courses.get(course_id)
+
+    def get_course_by_code(self, course_code):
+        return self._courses_by_code.get(course_code)
+
+    def list_courses(self, faculty_id=None):
+        courses = list(self.courses.values())
+        if faculty_id is not None:
+            courses = [course for course in courses if course['faculty_id'] == faculty_id]
+        return courses
+
+    def create_course(self, course_code, course_name, department=None, semester=None, faculty_id=None):
+        course = Course(course_code, course_name, department, semester, faculty_id).to_dict()
+        with self._lock:
+            self.courses[course['id']] = course
+            self._courses_by_code[course_code] = course
+        return course
+
+    def delete_course(self, course_id):
+        with self._lock:
+            course = self.courses.pop(course_id, None)
+            if course:
+                self._courses_by_code.pop(course['course_code'], None)
+                for student_id, enrollment in self._enrollments.pop(course_id, {}).items():
+                    self._student_courses.get(student_id, set()).discard(course_id)
+                    self.enrollments.pop(enrollment['id'], None)
+
+    def enroll(self, student_id, course_id):
+        with self._lock:
+            enrolled = self._enrollments.setdefault(course_id, {})
+            if student_id in enrolled:
+                return None
+            enrollment = Enrollment(student_id, course_id).to_dict()
+            self.enrollments[enrollment['id']] = enrollment
+            enrolled[student_id] = enrollment
+            self._student_courses.setdefault(student_id, set()).add(course_id)
+            return enrollment
+
+    def is_enrolled(self, student_id, course_id):
+        return student_id in self._enrollments.get(course_id, ())
+
+    # Sessions and attendance
+
+    def create_session(self, course_id, faculty_id, qr_code_token, qr_expiration):
+        session = Session(course_id, faculty_id, qr_code_token, qr_expiration).to_dict()
+        with self._lock:
+            self.sessions[session['id']] = session
+            self._sessions_by_token[qr_code_token] = session
+            self._session_counts[course_id] = self._session_counts.get(course_id, 0) + 1
+        return session
+
+    def get_session(self, session_id):
+        return self.sessions.get(session_id)
+
+    def get_session_by_token(self, token):
+        return self._sessions_by_token.get(token)
+
+    def list_sessions(self):
+        return list(self.sessions.values())
+
+    def mark_attendance_batch(self, marks):
+        results = []
+        with self._lock:
+            for session, student_id, marked_at in marks:
+                marked = self._attendances_by_session.setdefault(session['id'], {})
+                if student_id in marked:
+                    results.append(False)
+                    continue
+
+                attendance = Attendance(session['id'], student_id, marked_at).to_dict()
+                self.attendances[attendance['id']] = attendance
+                marked[student_id] = attendance
+                self._attendances_by_student.setdefault(student_id, []).append(attendance)
+
+                key = (session['course_id'], student_id)
+                attended, last = self._attendance_totals.get(key, (0, None))
+                self._attendance_totals[key] = (attended + 1, max(last, marked_at) if last else marked_at)
+                results.append(True)
+        return results
+
+    # Reports
+
+    def counts(self):
+        return {
+            'users': len(self.users),
+            'students': len(self.students),
+            'faculties': len(self.faculties),
+            'courses': len(self.courses),
+            'sessions': len(self.sessions),
+            'attendances': len(self.attendances)
+        }
+
+    def recent_enrollments(self, limit=5):
+        # Enrollments are kept in insertion order, so the newest are last
+        recent = []
+        for enrollment in reversed(list(self.enrollments.values())[-limit:]):
+            student = self.students.get(enrollment['student_id'])
+            course = self.courses.get(enrollment['course_id'])
+            recent.append({
+                'student_name': student['full_name'] if student else 'Unknown',
+                'course_name': course['course_name'] if course else 'Unknown',
+                'enrollment_date': enrollment['enrollment_date']
+            })
+        return recent
+
+    def session_attendance_count(self, session_id):
+        return len(self._attendances_by_session.get(session_id, ()))
+
+    def session_attendances(self, session_id):
+        attendances = []
+        for student_id, attendance in self._attendances_by_session.get(session_id, {}).items():
+            student = self.students.get(student_id)
+            attendances.append({
+                'student_id': student['student_id'] if student else None,
+                'student_name': student['full_name'] if student else 'Unknown',
+                'marked_at': attendance['marked_at']
+            })
+        return attendances
+
+    def student_history(self, student_id):
+        history = []
+        for attendance in self._attendances_by_student.get(student_id, ()):
+            session = self.sessions.get(attendance['session_id'])
+            course = self.courses.get(session['course_id']) if session else None
+            history.append({
+                'session_id': attendance['session_id'],
+                'course_id': session['course_id'] if session else None,
+                'course': course['course_name'] if course else 'Unknown',
+                'course_code': course['course_code'] if course else 'Unknown',
+                'session_date': session['session_date'] if session else None,
+                'marked_at': attendance['marked_at']
+            })
+        return history
+
+    def course_report(self, course_id):
+        rows = []
+        for student_id in self._enrollments.get(course_id, ()):
+            student = self.students.get(student_id)
+            if student:
+                attended, last = self._attendance_totals.get((course_id, student_id), (0, None))
+                rows.append((student['student_id'], student['full_name'], attended, last))
+        return build_course_report(course_id, self._session_counts.get(course_id, 0), rows)
+
+    def student_summary(self, student_id):
+        rows = []
+        for course_id in self._student_courses.get(student_id, ()):
+            course = self.courses.get(course_id)
+            if course:
+                attended, last = self._attendance_totals.get((course_id, student_id), (0, None))
+                rows.append((course_id, course['course_code'], course['course_name'], attended, last, self._session_counts.get(course_id, 0)))
+        return build_student_summary(rows)
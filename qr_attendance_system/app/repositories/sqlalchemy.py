@@ -0,0 +1,279 @@
+"""
+SQLAlchemy storage backend
+
+Wraps the Flask-SQLAlchemy models of app/models/models.py. Every write
+commits its own transaction and keeps the summary tables of
+app/utils/summary.py up to date, so reports stay single-query reads.
+"""
+
+from flask import current_app
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+from app.models.models import db, User, Student, Faculty, Course, Enrollment, Session, Attendance
+from app.repositories.base import AttendanceRepository
+from app.utils import summary
+from app.utils import stats
+from app.utils.tracing import span
+
+def _record(instance):
+    """Column values of a model instance as a dict"""
+    if instance is None:
+        return None
+    return {column.key: getattr(instance, column.key) for column in instance.__table__.columns}
+
+class SQLAlchemyRepository(AttendanceRepository):
+    """Relational storage through the application's db.session"""
+
+    def _create(self, instance):
+        try:
+            db.session.add(instance)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return _record(instance)
+
+    def _first(self, model, **filters):
+        return _record(db.session.execute(db.select(model).filter_by(**filters).limit(1)).scalar())
+
+    # Users and profiles
+
+    def get_user(self, user_id):
+        return _record(db.session.get(User, user_id))
+
+    def get_user_by_username(self, username):
+        return self._first(User, username=username)
+
+    def get_user_by_email(self, email):
+        return self._first(User, email=email)
+
+    def list_users(self):
+        return [_record(user) for user in db.session.execute(db.select(User)).scalars()]
+
+    def create_user(self, username, email, password_hash, role):
+        return self._create(User(username=username, email=email, password_hash=password_hash, role=role))
+
+    def delete_user(self, user_id):
+        try:
+            student = db.session.execute(db.select(Student).filter_by(user_id=user_id)).scalar()
+            if student:
+                summary.forget_student(student.id)
+                # Enrollments would otherwise be orphaned with a NULL student_id
+                Enrollment.query.filter_by(student_id=student.id).delete()
+                db.session.delete(student)
+            faculty = db.session.execute(db.select(Faculty).filter_by(user_id=user_id)).scalar()
+            if faculty:
+                db.session.delete(faculty)
+            user = db.session.get(User, user_id)
+            if user:
+                db.session.delete(user)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def list_students(self):
+        return [_record(student) for student in db.session.execute(db.select(Student)).scalars()]
+
+    def list_faculties(self):
+        return [_record(faculty) for faculty in db.session.execute(db.select(Faculty)).scalars()]
+
+    def get_student(self, student_id):
+        return _record(db.session.get(Student, student_id))
+
+    def get_student_by_user_id(self, user_id):
+        return self._first(Student, user_id=user_id)
+
+    def create_student(self, user_id, student_id, full_name, department=None, semester=None):
+        return self._create(Student(
+            user_id=user_id,
+            student_id=student_id,
+            full_name=full_name,
+            department=department,
+            semester=semester
+        ))
+
+    def get_faculty(self, faculty_id):
+        return _record(db.session.get(Faculty, faculty_id))
+
+    def get_faculty_by_user_id(self, user_id):
+        return self._first(Faculty, user_id=user_id)
+
+    def create_faculty(self, user_id, faculty_id, full_name, department=None):
+        return self._create(Faculty(user_id=user_id, faculty_id=faculty_id, full_name=full_name, department=department))
+
+    # Courses and enrollment
+
+    def get_course(self, course_id):
+        return _record(db.session.get(Course, course_id))
+
+    def get_course_by_code(self, course_code):
+        return self._first(Course, course_code=course_code)
+
+    def list_courses(self, faculty_id=None):
+        query = db.select(Course)
+        if faculty_id is not None:
+            query = query.filter_by(faculty_id=faculty_id)
+        return [_record(course) for course in db.session.execute(query).scalars()]
+
+    def create_course(self, course_code, course_name, department=None, semester=None, faculty_id=None):
+        return self._create(Course(
+            course_code=course_code,
+            course_name=course_name,
+            department=department,
+            semester=semester,
+            faculty_id=faculty_id
+        ))
+
+    def delete_course(self, course_id):
+        course = db.session.get(Course, course_id)
+        if course:
+            try:
+                summary.forget_course(course_id)
+                db.session.delete(course)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def enroll(self, student_id, course_id):
+        enrollment = Enrollment(student_id=student_id, course_id=course_id)
+        try:
+            db.session.add(enrollment)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return None
+        return _record(enrollment)
+
+    def is_enrolled(self, student_id, course_id):
+        return self._first(Enrollment, student_id=student_id, course_id=course_id) is not None
+
+    # Sessions and attendance
+
+    def create_session(self, course_id, faculty_id, qr_code_token, qr_expiration):
+        session = Session(
+            course_id=course_id,
+            faculty_id=faculty_id,
+            qr_code_token=qr_code_token,
+            qr_expiration=qr_expiration
+        )
+        try:
+            db.session.add(session)
+            summary.record_session(course_id)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return _record(session)
+
+    def get_session(self, session_id):
+        return _record(db.session.get(Session, session_id))
+
+    def get_session_by_token(self, token):
+        return self._first(Session, qr_code_token=token)
+
+    def list_sessions(self):
+        return [_record(session) for session in db.session.execute(db.select(Session)).scalars()]
+
+    def mark_attendance_batch(self, marks):
+        keys = {(session['id'], student_id) for session, student_id, marked_at in marks}
+        existing = set()
+        if keys:
+            with span('attendance.duplicate_check'):
+                existing = set(db.session.execute(
+                    db.select(Attendance.session_id, Attendance.student_id)
+                    .where(tuple_(Attendance.session_id, Attendance.student_id).in_(keys))
+                ).all())
+
+        results = []
+        try:
+            for session, student_id, marked_at in marks:
+                key = (session['id'], student_id)
+                if key in existing:
+                    results.append(False)
+                    continue
+
+                # A concurrent mark can still win the race; the savepoint
+                # keeps the rest of the batch when it does
+                try:
+                    with span('attendance.insert'), db.session.begin_nested():
+                        db.session.add(Attendance(session_id=session['id'], student_id=student_id, marked_at=marked_at))
+                except IntegrityError:
+                    existing.add(key)
+                    results.append(False)
+                    continue
+
+                existing.add(key)
+                summary.record_attendance(session['course_id'], student_id, marked_at)
+                results.append(True)
+            with span('attendance.commit'):
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return results
+
+    # Reports
+
+    def counts(self):
+        # The app's cached counters when there is one, else an exact count
+        if 'stats' in current_app.extensions:
+            counts = stats.get_stats().snapshot()
+        else:
+            counts = db.session.execute(stats.counts_query()).mappings().one()
+        return {
+            'users': counts['total_users'],
+            'students': counts['total_students'],
+            'faculties': counts['total_faculties'],
+            'courses': counts['total_courses'],
+            'sessions': counts['total_sessions'],
+            'attendances': counts['total_attendances']
+        }
+
+    def recent_enrollments(self, limit=5):
+        return stats.recent_enrollments(limit)
+
+    def session_attendance_count(self, session_id):
+        return db.session.execute(
+            db.select(db.func.count()).select_from(Attendance).where(Attendance.session_id == session_id)
+        ).scalar()
+
+    def session_attendances(self, session_id):
+        rows = db.session.execute(
+            db.select(Student.student_id, Student.full_name, Attendance.marked_at)
+            .join(Student, Student.id == Attendance.student_id)
+            .where(Attendance.session_id == session_id)
+        ).all()
+        return [
+            {'student_id': student_number, 'student_name': full_name, 'marked_at': marked_at}
+            for student_number, full_name, marked_at in rows
+        ]
+
+    def student_history(self, student_id):
+        rows = db.session.execute(
+            db.select(
+                Attendance.session_id, Session.course_id, Course.course_name, Course.course_code,
+                Session.session_date, Attendance.marked_at
+            )
+            .join(Session, Session.id == Attendance.session_id)
+            .outerjoin(Course, Course.id == Session.course_id)
+            .where(Attendance.student_id == student_id)
+        ).all()
+        return [
+            {
+                'session_id': session_id,
+                'course_id': course_id,
+                'course': course_name or 'Unknown',
+                'course_code': course_code or 'Unknown',
+                'session_date': session_date,
+                'marked_at': marked_at
+            }
+            for session_id, course_id, course_name, course_code, session_date, marked_at in rows
+        ]
+
+    def course_report(self, course_id):
+        return summary.course_report(course_id)
+
+    def student_summary(self, student_id):
+        return summary.student_summary(student_id)
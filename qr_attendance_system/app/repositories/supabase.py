@@ -0,0 +1,507 @@
+"""
+Supabase storage backend
+
+Talks to the Supabase REST (PostgREST) API over a shared httpx client, so
+TCP/TLS connections are kept alive and reused across calls instead of being
+opened per request. The Supabase project is expected to have the tables of
+DATABASE_SCHEMA.md with their foreign keys (PostgREST uses them to embed
+related rows).
+
+Each operation is written once as a generator that yields HTTP requests and
+receives the responses, which SupabaseRepository sends with blocking httpx
+calls. Requests are retried with exponential backoff:
+requests that are safe to resend (reads, ignore-duplicates upserts) on
+connection errors and 429/502/503/504; plain inserts only when the request
+never reached PostgREST (connection refused, 429, 503), since a 502/504 may
+come after the row was written.
+
+Lists are read in pages of SUPABASE_PAGE_SIZE rows, so PostgREST's max-rows
+cap cannot truncate them; keep the page size at or below the project's
+max-rows (1000 by default).
+
+Reports are computed from the raw attendance rows; the incremental summary
+tables are only maintained by the SQLAlchemy backend.
+"""
+
+import random
+import time
+from datetime import datetime, timezone
+import httpx
+from app.repositories.base import AttendanceRepository, RepositoryError
+from app.utils.summary import build_course_report, build_student_summary
+
+RETRY_STATUS = {429, 502, 503, 504}
+
+# Statuses returned before the request was processed; safe to resend anything
+UNPROCESSED_STATUS = {429, 503}
+
+PAGE_SIZE = 1000
+
+TIMESTAMP_FIELDS = ('created_at', 'enrollment_date', 'session_date', 'qr_expiration', 'marked_at')
+
+OPERATIONS = [name for name in vars(AttendanceRepository) if not name.startswith('_')]
+
+class _Request:
+    """One PostgREST call yielded by an operation"""
+    def __init__(self, method, table, params=None, json=None, prefer=None, idempotent=None):
+        self.method = method
+        self.table = table
+        self.params = params or {}
+        self.json = json
+        self.headers = {'Prefer': prefer} if prefer else {}
+        # Reads and ignore-duplicates upserts can be resent safely
+        self.idempotent = method == 'GET' if idempotent is None else idempotent
+
+def _parse_timestamp(value):
+    if not isinstance(value, str):
+        return value
+    parsed = datetime.fromisoformat(value)
+    # The rest of the app works in naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _record(row):
+    """Convert a PostgREST row into a repository record"""
+    if row is None:
+        return None
+    for field in TIMESTAMP_FIELDS:
+        if field in row:
+            row[field] = _parse_timestamp(row[field])
+    return row
+
+def _first(response):
+    rows = response.json()
+    return _record(rows[0]) if rows else None
+
+def _isoformat(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+def _total_count(response):
+    # Content-Range: 0-0/42 (or */0 when nothing matched)
+    content_range = response.headers.get('Content-Range', '*/0')
+    return int(content_range.rsplit('/', 1)[1])
+
+def _eq(value):
+    return f'eq.{value}'
+
+def _in(values):
+    return 'in.(' + ','.join(str(value) for value in values) + ')'
+
+class _SupabaseOperations:
+    """The repository operations as request generators"""
+
+    def _get_one(self, table, **filters):
+        params = {column: _eq(value) for column, value in filters.items()}
+        params.update(select='*', limit=1)
+        return _first((yield _Request('GET', table, params)))
+
+    def _get_pages(self, table, params):
+        """Every row matching params, fetched page by page in id order"""
+        rows = []
+        while True:
+            page_params = dict(params, order='id', limit=self.page_size, offset=len(rows))
+            page = (yield _Request('GET', table, page_params)).json()
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+
+    def _get_all(self, table, **filters):
+        params = {column: _eq(value) for column, value in filters.items()}
+        params['select'] = '*'
+        rows = yield from self._get_pages(table, params)
+        return [_record(row) for row in rows]
+
+    def _count(self, table):
+        response = yield _Request('GET', table, {'select': 'id', 'limit': 1}, prefer='count=exact')
+        return _total_count(response)
+
+    def _insert(self, table, row):
+        response = yield _Request('POST', table, json=row, prefer='return=representation')
+        return _first(response)
+
+    def get_user(self, user_id):
+        return (yield from self._get_one('users', id=user_id))
+
+    def get_user_by_username(self, username):
+        return (yield from self._get_one('users', username=username))
+
+    def get_user_by_email(self, email):
+        return (yield from self._get_one('users', email=email))
+
+    def list_users(self):
+        return (yield from self._get_all('users'))
+
+    def create_user(self, username, email, password_hash, role):
+        return (yield from self._insert('users', {
+            'username': username,
+            'email': email,
+            'password_hash': password_hash,
+            'role': role
+        }))
+
+    def delete_user(self, user_id):
+        # Profiles first, so the users row is no longer referenced
+        for table in ('students', 'faculties'):
+            yield _Request('DELETE', table, {'user_id': _eq(user_id)}, idempotent=True)
+        yield _Request('DELETE', 'users', {'id': _eq(user_id)}, idempotent=True)
+
+    def list_students(self):
+        return (yield from self._get_all('students'))
+
+    def list_faculties(self):
+        return (yield from self._get_all('faculties'))
+
+    def get_student(self, student_id):
+        return (yield from self._get_one('students', id=student_id))
+
+    def get_student_by_user_id(self, user_id):
+        return (yield from self._get_one('students', user_id=user_id))
+
+    def create_student(self, user_id, student_id, full_name, department=None, semester=None):
+        return (yield from self._insert('students', {
+            'user_id': user_id,
+            'student_id': student_id,
+            'full_name': full_name,
+            'department': department,
+            'semester': semester
+        }))
+
+    def get_faculty(self, faculty_id):
+        return (yield from self._get_one('faculties', id=faculty_id))
+
+    def get_faculty_by_user_id(self, user_id):
+        return (yield from self._get_one('faculties', user_id=user_id))
+
+    def create_faculty(self, user_id, faculty_id, full_name, department=None):
+        return (yield from self._insert('faculties', {
+            'user_id': user_id,
+            'faculty_id': faculty_id,
+            'full_name': full_name,
+            'department': department
+        }))
+
+    def get_course(self, course_id):
+        return (yield from self._get_one('courses', id=course_id))
+
+    def get_course_by_code(self, course_code):
+        return (yield from self._get_one('courses', course_code=course_code))
+
+    def list_courses(self, faculty_id=None):
+        if faculty_id is None:
+            return (yield from self._get_all('courses'))
+        return (yield from self._get_all('courses', faculty_id=faculty_id))
+
+    def create_course(self, course_code, course_name, department=None, semester=None, faculty_id=None):
+        return (yield from self._insert('courses', {
+            'course_code': course_code,
+            'course_name': course_name,
+            'department': department,
+            'semester': semester,
+            'faculty_id': faculty_id
+        }))
+
+    def delete_course(self, course_id):
+        # Dependent rows follow the ON DELETE rules of the project's foreign keys
+        yield _Request('DELETE', 'courses', {'id': _eq(course_id)}, idempotent=True)
+
+    def enroll(self, student_id, course_id):
+        response = yield _Request(
+            'POST', 'enrollments',
+            params={'on_conflict': 'student_id,course_id'},
+            json={'student_id': student_id, 'course_id': course_id},
+            prefer='resolution=ignore-duplicates,return=representation',
+            idempotent=True
+        )
+        return _first(response)
+
+    def is_enrolled(self, student_id, course_id):
+        enrollment = yield from self._get_one('enrollments', student_id=student_id, course_id=course_id)
+        return enrollment is not None
+
+    def create_session(self, course_id, faculty_id, qr_code_token, qr_expiration):
+        return (yield from self._insert('sessions', {
+            'course_id': course_id,
+            'faculty_id': faculty_id,
+            'qr_code_token': qr_code_token,
+            'qr_expiration': _isoformat(qr_expiration),
+            'session_date': datetime.utcnow().isoformat(),
+            'is_active': True
+        }))
+
+    def get_session(self, session_id):
+        return (yield from self._get_one('sessions', id=session_id))
+
+    def get_session_by_token(self, token):
+        return (yield from self._get_one('sessions', qr_code_token=token))
+
+    def list_sessions(self):
+        return (yield from self._get_all('sessions'))
+
+    def mark_attendance(self, session, student_id, marked_at):
+        results = yield from _SupabaseOperations.mark_attendance_batch(self, [(session, student_id, marked_at)])
+        return results[0]
+
+    def mark_attendance_batch(self, marks):
+        rows = {}
+        for session, student_id, marked_at in marks:
+            rows.setdefault((session['id'], student_id), {
+                'session_id': session['id'],
+                'student_id': student_id,
+                'marked_at': _isoformat(marked_at)
+            })
+
+        created = set()
+        if rows:
+            # One upsert for the whole batch; existing rows are skipped and
+            # only the inserted ones come back
+            response = yield _Request(
+                'POST', 'attendances',
+                params={'on_conflict': 'session_id,student_id', 'select': 'session_id,student_id'},
+                json=list(rows.values()),
+                prefer='resolution=ignore-duplicates,return=representation',
+                idempotent=True
+            )
+            created = {(row['session_id'], row['student_id']) for row in response.json()}
+
+        results = []
+        for session, student_id, marked_at in marks:
+            key = (session['id'], student_id)
+            results.append(key in created)
+            # A student listed twice in one batch is only recorded once
+            created.discard(key)
+        return results
+
+    def counts(self):
+        counts = {}
+        for name, table in (
+            ('users', 'users'),
+            ('students', 'students'),
+            ('faculties', 'faculties'),
+            ('courses', 'courses'),
+            ('sessions', 'sessions'),
+            ('attendances', 'attendances')
+        ):
+            counts[name] = yield from self._count(table)
+        return counts
+
+    def recent_enrollments(self, limit=5):
+        response = yield _Request('GET', 'enrollments', {
+            'select': 'enrollment_date,students(full_name),courses(course_name)',
+            'order': 'enrollment_date.desc',
+            'limit': limit
+        })
+        return [
+            {
+                'student_name': row['students']['full_name'],
+                'course_name': row['courses']['course_name'],
+                'enrollment_date': _parse_timestamp(row['enrollment_date'])
+            }
+            for row in response.json()
+        ]
+
+    def session_attendance_count(self, session_id):
+        response = yield _Request('GET', 'attendances', {
+            'select': 'id',
+            'session_id': _eq(session_id),
+            'limit': 1
+        }, prefer='count=exact')
+        return _total_count(response)
+
+    def session_attendances(self, session_id):
+        rows = yield from self._get_pages('attendances', {
+            'select': 'marked_at,students(student_id,full_name)',
+            'session_id': _eq(session_id)
+        })
+        return [
+            {
+                'student_id': row['students']['student_id'],
+                'student_name': row['students']['full_name'],
+                'marked_at': _parse_timestamp(row['marked_at'])
+            }
+            for row in rows
+        ]
+
+    def student_history(self, student_id):
+        rows = yield from self._get_pages('attendances', {
+            'select': 'session_id,marked_at,sessions(course_id,session_date,courses(course_name,course_code))',
+            'student_id': _eq(student_id)
+        })
+        history = []
+        for row in rows:
+            session = row['sessions'] or {}
+            course = session.get('courses') or {}
+            history.append({
+                'session_id': row['session_id'],
+                'course_id': session.get('course_id'),
+                'course': course.get('course_name', 'Unknown'),
+                'course_code': course.get('course_code', 'Unknown'),
+                'session_date': _parse_timestamp(session.get('session_date')),
+                'marked_at': _parse_timestamp(row['marked_at'])
+            })
+        return history
+
+    def course_report(self, course_id):
+        sessions = yield _Request('GET', 'sessions', {
+            'select': 'id',
+            'course_id': _eq(course_id),
+            'limit': 1
+        }, prefer='count=exact')
+        enrollments = yield from self._get_pages('enrollments', {
+            'select': 'students(id,student_id,full_name)',
+            'course_id': _eq(course_id)
+        })
+        attendances = yield from self._get_pages('attendances', {
+            'select': 'student_id,marked_at,sessions!inner(course_id)',
+            'sessions.course_id': _eq(course_id)
+        })
+
+        attended = {}
+        for row in attendances:
+            count, last = attended.get(row['student_id'], (0, None))
+            marked_at = _parse_timestamp(row['marked_at'])
+            attended[row['student_id']] = (count + 1, max(last, marked_at) if last else marked_at)
+
+        rows = []
+        for enrollment in enrollments:
+            student = enrollment['students']
+            count, last = attended.get(student['id'], (0, None))
+            rows.append((student['student_id'], student['full_name'], count, last))
+
+        return build_course_report(course_id, _total_count(sessions), rows)
+
+    def student_summary(self, student_id):
+        enrollments = yield from self._get_pages('enrollments', {
+            'select': 'courses(id,course_code,course_name)',
+            'student_id': _eq(student_id)
+        })
+        courses = [row['courses'] for row in enrollments]
+        if not courses:
+            return []
+
+        attendances = yield from self._get_pages('attendances', {
+            'select': 'marked_at,sessions(course_id)',
+            'student_id': _eq(student_id)
+        })
+        sessions = yield from self._get_pages('sessions', {
+            'select': 'course_id',
+            'course_id': _in(course['id'] for course in courses)
+        })
+
+        totals = {}
+        for row in sessions:
+            totals[row['course_id']] = totals.get(row['course_id'], 0) + 1
+
+        attended = {}
+        for row in attendances:
+            course_id = row['sessions']['course_id']
+            count, last = attended.get(course_id, (0, None))
+            marked_at = _parse_timestamp(row['marked_at'])
+            attended[course_id] = (count + 1, max(last, marked_at) if last else marked_at)
+
+        return build_student_summary([
+            (course['id'], course['course_code'], course['course_name'], *attended.get(course['id'], (0, None)), totals.get(course['id'], 0))
+            for course in courses
+        ])
+
+class SupabaseRepository(_SupabaseOperations, AttendanceRepository):
+    """Blocking Supabase backend sharing one keep-alive connection pool"""
+    def __init__(self, url, key, timeout=10, max_retries=3, backoff=0.2, max_backoff=5, pool_size=20, page_size=PAGE_SIZE):
+        self.base_url = url.rstrip('/') + '/rest/v1'
+        self.headers = {
+            'apikey': key,
+            'Authorization': f'Bearer {key}',
+            'Content-Type': 'application/json'
+        }
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.page_size = page_size
+        self.client = httpx.Client(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    def close(self):
+        self.client.close()
+
+    @classmethod
+    def from_config(cls, config):
+        if not config.get('SUPABASE_URL') or not config.get('SUPABASE_KEY'):
+            raise RepositoryError('SUPABASE_URL and SUPABASE_KEY must be set to use the Supabase backend')
+        return cls(
+            config['SUPABASE_URL'],
+            config['SUPABASE_KEY'],
+            timeout=config['SUPABASE_TIMEOUT'],
+            max_retries=config['SUPABASE_MAX_RETRIES'],
+            pool_size=config['SUPABASE_POOL_SIZE'],
+            page_size=config.get('SUPABASE_PAGE_SIZE', PAGE_SIZE)
+        )
+
+    def _retry_delay(self, attempt, response=None):
+        """Seconds to wait before retry number `attempt` (0-based)"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), self.max_backoff)
+        # Exponential backoff with jitter so retrying workers spread out
+        return min(self.backoff * 2 ** attempt, self.max_backoff) * random.uniform(0.5, 1.5)
+
+    def _should_retry(self, request, attempt, error=None, response=None):
+        if attempt >= self.max_retries:
+            return False
+        if error is not None:
+            # A connection that was never established never sent the request
+            return request.idempotent or isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+        # A 502/504 may arrive after an insert was applied; resending it
+        # would create the row twice
+        if request.idempotent:
+            return response.status_code in RETRY_STATUS
+        return response.status_code in UNPROCESSED_STATUS
+
+    def _check(self, request, response):
+        if response.status_code >= 400:
+            raise RepositoryError(
+                f'Supabase {request.method} {request.table} failed with {response.status_code}: {response.text}'
+            )
+        return response
+
+    def _send(self, request):
+        attempt = 0
+        while True:
+            try:
+                response = self.client.request(
+                    request.method, request.table,
+                    params=request.params, json=request.json, headers=request.headers
+                )
+            except httpx.TransportError as e:
+                if not self._should_retry(request, attempt, error=e):
+                    raise RepositoryError(f'Supabase {request.method} {request.table} failed: {e}') from e
+                time.sleep(self._retry_delay(attempt))
+            else:
+                if not self._should_retry(request, attempt, response=response):
+                    return self._check(request, response)
+                time.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+    def _run(self, operation):
+        try:
+            request = next(operation)
+            while True:
+                request = operation.send(self._send(request))
+        except StopIteration as done:
+            return done.value
+
+def _blocking(name):
+    operation = getattr(_SupabaseOperations, name)
+    def method(self, *args, **kwargs):
+        return self._run(operation(self, *args, **kwargs))
+    method.__name__ = name
+    method.__doc__ = getattr(AttendanceRepository, name).__doc__
+    return method
+
+# Expose every operation under its interface name
+for _name in OPERATIONS:
+    setattr(SupabaseRepository, _name, _blocking(_name))
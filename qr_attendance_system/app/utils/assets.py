@@ -0,0 +1,128 @@
+"""
+Content-hashed, precompressed front-end assets
+
+The web demo's stylesheet and scripts live in static/css/app.css,
+static/js/app.js and the scanner's static/js/qr-worker.js. `build` copies them to static/dist under names that carry
+a hash of their content (``js/app.3f2a9c1d07.js``), writes gzip and brotli
+versions next to each copy, and records the mapping in
+static/dist/manifest.json:
+
+    python -m app.utils.assets
+
+Since a changed file gets a new name, /assets/ serves the copies with a
+one-year immutable Cache-Control, choosing the precompressed variant the
+browser accepts. Templates call ``asset_url('js/app.js')``. Until a manifest
+is installed with `build_assets` that resolves to the plain /static/ file,
+so edits show up on reload during development.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from flask import current_app, request, send_from_directory, url_for
+from app.utils.compression import negotiate
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SOURCES = ('css/app.css', 'js/app.js', 'js/qr-worker.js')
+DIST = 'dist'
+MANIFEST = 'manifest.json'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+# Precompressed variant suffix by Content-Encoding, best first
+VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+
+def hashed_name(path, data):
+    """path with a hash of data before the extension"""
+    root, ext = os.path.splitext(path)
+    return f'{root}.{hashlib.sha256(data).hexdigest()[:10]}{ext}'
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def build(static_folder, sources=SOURCES):
+    """Write hashed and precompressed copies of sources; return the manifest"""
+    dist = os.path.join(static_folder, DIST)
+    manifest = {}
+    for path in sources:
+        with open(os.path.join(static_folder, path), 'rb') as f:
+            data = f.read()
+        name = hashed_name(path, data)
+        target = os.path.join(dist, name)
+        # Same name means same content, so existing files are reused; earlier
+        # builds are kept for pages still open in browsers
+        if not os.path.exists(target + '.gz'):
+            _write(target + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None and not os.path.exists(target + '.br'):
+            _write(target + '.br', brotli.compress(data, quality=11))
+        if not os.path.exists(target):
+            _write(target, data)
+        manifest[path] = name
+
+    _write(os.path.join(dist, MANIFEST), json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+def build_assets(app):
+    """Build the assets and serve the hashed copies from now on"""
+    app.extensions['assets'] = build(app.static_folder)
+    return app.extensions['assets']
+
+def asset_url(path):
+    """URL of a front-end asset: the hashed copy when built, else the source"""
+    name = current_app.extensions.get('assets', {}).get(path)
+    if name:
+        return url_for('assets', filename=name)
+    return url_for('static', filename=path)
+
+def serve_asset(filename):
+    """Serve a hashed asset, precompressed when the browser accepts it"""
+    dist = os.path.join(current_app.static_folder, DIST)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    available = [
+        encoding for encoding, suffix in VARIANTS
+        if os.path.isfile(os.path.join(dist, filename + suffix))
+    ]
+    encoding = negotiate(request.accept_encodings, available) if available else None
+    suffix = dict(VARIANTS).get(encoding, '')
+
+    response = send_from_directory(dist, filename + suffix, mimetype=mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = IMMUTABLE
+    return response
+
+def init_assets(app):
+    """Add asset_url() to templates and the /assets/ route"""
+    app.extensions.setdefault('assets', {})
+    app.add_url_rule('/assets/<path:filename>', 'assets', serve_asset, methods=['GET'])
+    app.context_processor(lambda: {'asset_url': asset_url})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the content-hashed, precompressed front-end assets')
+    parser.add_argument('--static', default=os.path.join(os.path.dirname(__file__), '..', '..', 'static'),
+                        help='Static folder holding the sources.')
+    args = parser.parse_args(argv)
+
+    static_folder = os.path.abspath(args.static)
+    for path, name in build(static_folder).items():
+        target = os.path.join(static_folder, DIST, name)
+        sizes = [f'{os.path.getsize(target)} B']
+        for encoding, suffix in VARIANTS:
+            if os.path.exists(target + suffix):
+                sizes.append(f'{encoding} {os.path.getsize(target + suffix)} B')
+        print(f'{path} -> {DIST}/{name} ({", ".join(sizes)})')
+    if brotli is None:
+        print('brotli is not installed; only gzip variants were written')
+
+if __name__ == '__main__':
+    main()
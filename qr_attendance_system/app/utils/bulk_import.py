@@ -0,0 +1,267 @@
+"""
+Bulk CSV import for students and enrollments
+
+Rows are read from the upload one at a time, validated against key sets that
+are loaded from the database once per import, and written in chunks. Each
+chunk is its own transaction, so a bad chunk never rolls back rows that were
+already committed and memory use is bounded by the chunk size.
+"""
+
+import csv
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from app.models.models import db, hash_password, User, Student, Course, Enrollment
+
+STUDENT_REQUIRED_COLUMNS = ('username', 'email', 'password', 'student_id', 'full_name')
+ENROLLMENT_REQUIRED_COLUMNS = ('student_id', 'course_code')
+DEFAULT_CHUNK_SIZE = 500
+
+class ImportReport:
+    """Per-row outcome of a bulk import"""
+    def __init__(self):
+        self.rows_read = 0
+        self.users_created = 0
+        self.enrollments_created = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.errors.append({'line': line, 'error': message})
+
+    def to_dict(self):
+        return {
+            'rows_read': self.rows_read,
+            'users_created': self.users_created,
+            'enrollments_created': self.enrollments_created,
+            'rows_failed': len({e['line'] for e in self.errors}),
+            'errors': self.errors
+        }
+
+def iter_csv_rows(stream, encoding='utf-8'):
+    """Yield (line_number, row) pairs from a binary or text CSV stream"""
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding=encoding, newline='')
+
+    reader = csv.DictReader(stream)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    for row in reader:
+        yield reader.line_num, {
+            key: value.strip() if isinstance(value, str) else ''
+            for key, value in row.items() if key
+        }
+
+def _missing_columns(row, required):
+    return [column for column in required if not row.get(column)]
+
+def _split_course_codes(value):
+    return [code.strip() for code in value.replace(',', ';').split(';') if code.strip()]
+
+class StudentImporter:
+    """Create users, student profiles and optional enrollments from CSV rows
+
+    Expected columns: username, email, password, student_id, full_name and
+    optionally department, semester and course_codes (separated by ';').
+    """
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, hash_workers=None):
+        self.chunk_size = max(1, chunk_size)
+        self.hash_workers = hash_workers or os.cpu_count() or 1
+        self.report = ImportReport()
+
+        # Key sets are loaded once so validation never hits the database
+        self.usernames = {value for (value,) in db.session.query(User.username)}
+        self.emails = {value for (value,) in db.session.query(User.email)}
+        self.student_numbers = {value for (value,) in db.session.query(Student.student_id)}
+        self.course_ids = dict(db.session.query(Course.course_code, Course.id))
+
+    def validate(self, line, row):
+        """Return the cleaned row, or None after recording why it was rejected"""
+        missing = _missing_columns(row, STUDENT_REQUIRED_COLUMNS)
+        if missing:
+            self.report.add_error(line, f"Missing required columns: {', '.join(missing)}")
+            return None
+
+        if row['username'] in self.usernames:
+            self.report.add_error(line, 'Username already exists')
+            return None
+
+        if row['email'] in self.emails:
+            self.report.add_error(line, 'Email already exists')
+            return None
+
+        if row['student_id'] in self.student_numbers:
+            self.report.add_error(line, 'Student ID already exists')
+            return None
+
+        semester = row.get('semester')
+        if semester:
+            try:
+                semester = int(semester)
+            except ValueError:
+                self.report.add_error(line, f'Invalid semester: {semester}')
+                return None
+
+        course_codes = _split_course_codes(row.get('course_codes', ''))
+        unknown = [code for code in course_codes if code not in self.course_ids]
+        if unknown:
+            self.report.add_error(line, f"Unknown course codes: {', '.join(unknown)}")
+            return None
+
+        # Reserve the keys so duplicates later in the same file are rejected
+        self.usernames.add(row['username'])
+        self.emails.add(row['email'])
+        self.student_numbers.add(row['student_id'])
+
+        return {
+            'line': line,
+            'username': row['username'],
+            'email': row['email'],
+            'password': row['password'],
+            'student_id': row['student_id'],
+            'full_name': row['full_name'],
+            'department': row.get('department') or None,
+            'semester': semester or None,
+            'course_ids': list(dict.fromkeys(self.course_ids[code] for code in course_codes))
+        }
+
+    def write_chunk(self, chunk, executor):
+        """Insert one chunk of validated rows in a single transaction"""
+        hashes = list(executor.map(hash_password, (row['password'] for row in chunk)))
+
+        try:
+            users = [
+                User(username=row['username'], email=row['email'], password_hash=password_hash, role='student')
+                for row, password_hash in zip(chunk, hashes)
+            ]
+            db.session.add_all(users)
+            db.session.flush()  # Assign user IDs for the whole chunk at once
+
+            students = [
+                Student(
+                    user_id=user.id,
+                    student_id=row['student_id'],
+                    full_name=row['full_name'],
+                    department=row['department'],
+                    semester=row['semester']
+                )
+                for row, user in zip(chunk, users)
+            ]
+            db.session.add_all(students)
+            db.session.flush()
+
+            enrollments = [
+                {'student_id': student.id, 'course_id': course_id}
+                for row, student in zip(chunk, students)
+                for course_id in row['course_ids']
+            ]
+            if enrollments:
+                db.session.execute(Enrollment.__table__.insert(), enrollments)
+
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for row in chunk:
+                self.usernames.discard(row['username'])
+                self.emails.discard(row['email'])
+                self.student_numbers.discard(row['student_id'])
+                self.report.add_error(row['line'], f'Chunk insert failed: {e}')
+            return
+
+        self.report.users_created += len(users)
+        self.report.enrollments_created += len(enrollments)
+
+    def run(self, stream):
+        chunk = []
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as executor:
+            for line, row in iter_csv_rows(stream):
+                self.report.rows_read += 1
+                cleaned = self.validate(line, row)
+                if cleaned is None:
+                    continue
+
+                chunk.append(cleaned)
+                if len(chunk) >= self.chunk_size:
+                    self.write_chunk(chunk, executor)
+                    chunk = []
+
+            if chunk:
+                self.write_chunk(chunk, executor)
+
+        return self.report
+
+class EnrollmentImporter:
+    """Enroll existing students in existing courses from CSV rows
+
+    Expected columns: student_id (the student number) and course_code.
+    """
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = max(1, chunk_size)
+        self.report = ImportReport()
+
+        self.student_ids = dict(db.session.query(Student.student_id, Student.id))
+        self.course_ids = dict(db.session.query(Course.course_code, Course.id))
+        self.existing = set(db.session.query(Enrollment.student_id, Enrollment.course_id))
+
+    def validate(self, line, row):
+        missing = _missing_columns(row, ENROLLMENT_REQUIRED_COLUMNS)
+        if missing:
+            self.report.add_error(line, f"Missing required columns: {', '.join(missing)}")
+            return None
+
+        student_id = self.student_ids.get(row['student_id'])
+        if student_id is None:
+            self.report.add_error(line, 'Student not found')
+            return None
+
+        course_id = self.course_ids.get(row['course_code'])
+        if course_id is None:
+            self.report.add_error(line, 'Course not found')
+            return None
+
+        if (student_id, course_id) in self.existing:
+            self.report.add_error(line, 'Student already enrolled in this course')
+            return None
+
+        self.existing.add((student_id, course_id))
+        return {'line': line, 'student_id': student_id, 'course_id': course_id}
+
+    def write_chunk(self, chunk):
+        try:
+            db.session.execute(
+                Enrollment.__table__.insert(),
+                [{'student_id': row['student_id'], 'course_id': row['course_id']} for row in chunk]
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for row in chunk:
+                self.existing.discard((row['student_id'], row['course_id']))
+                self.report.add_error(row['line'], f'Chunk insert failed: {e}')
+            return
+
+        self.report.enrollments_created += len(chunk)
+
+    def run(self, stream):
+        chunk = []
+        for line, row in iter_csv_rows(stream):
+            self.report.rows_read += 1
+            cleaned = self.validate(line, row)
+            if cleaned is None:
+                continue
+
+            chunk.append(cleaned)
+            if len(chunk) >= self.chunk_size:
+                self.write_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            self.write_chunk(chunk)
+
+        return self.report
+
+def import_students_csv(stream, chunk_size=DEFAULT_CHUNK_SIZE, hash_workers=None):
+    """Import students from a CSV stream and return an ImportReport"""
+    return StudentImporter(chunk_size, hash_workers).run(stream)
+
+def import_enrollments_csv(stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Import enrollments from a CSV stream and return an ImportReport"""
+    return EnrollmentImporter(chunk_size).run(stream)
@@ -0,0 +1,112 @@
+"""
+On-the-fly response compression
+
+`init_compression` adds an after_request hook that compresses JSON, HTML and
+plain text responses of at least COMPRESS_MIN_SIZE bytes. It uses brotli when
+the client accepts it and the package is installed, and gzip otherwise.
+Streamed responses (large lists from json_list_response) are compressed
+chunk by chunk as they are sent.
+
+Files served with send_file and responses that already carry a
+Content-Encoding (the precompressed assets in app/utils/assets.py) are left
+alone.
+"""
+
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript')
+
+def available_encodings():
+    """Encodings this process can produce, best first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def negotiate(accept_encodings, encodings=None):
+    """The best encoding the client accepts, or None"""
+    for encoding in encodings or available_encodings():
+        if accept_encodings[encoding] > 0:
+            return encoding
+    return None
+
+class _Compressor:
+    """Incremental gzip or brotli compressor"""
+    def __init__(self, encoding, level, brotli_quality):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._obj = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits 31: zlib stream in a gzip container
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        if self.encoding == 'br':
+            return self._obj.process(data)
+        return self._obj.compress(data)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._obj.finish()
+        return self._obj.flush()
+
+def _compress_stream(chunks, compressor):
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+def compress_response(response, encoding, level=6, brotli_quality=4, min_size=1024):
+    """Compress response in place with encoding; return whether it was"""
+    compressor = _Compressor(encoding, level, brotli_quality)
+    if response.is_streamed:
+        # Size unknown up front; streamed lists are large by construction
+        response.response = _compress_stream(response.response, compressor)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return False
+        response.set_data(compressor.compress(data) + compressor.finish())
+
+    response.headers['Content-Encoding'] = encoding
+    # The compressed body differs byte for byte, so a strong ETag becomes weak
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return True
+
+def init_compression(app):
+    """Compress eligible responses; register before other after_request hooks"""
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return False
+
+    mimetypes = set(app.config.get('COMPRESS_MIMETYPES') or DEFAULT_MIMETYPES)
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    level = app.config.get('COMPRESS_LEVEL', 6)
+    brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+
+    def compress(response):
+        if response.mimetype not in mimetypes or response.direct_passthrough:
+            return response
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return response
+        if 'Content-Encoding' in response.headers or request.method == 'HEAD':
+            return response
+
+        # Caches must keep the encoded and plain bodies apart
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate(request.accept_encodings)
+        if encoding:
+            compress_response(response, encoding, level, brotli_quality, min_size)
+        return response
+
+    # after_request hooks run in reverse order, so this one runs last
+    app.after_request(compress)
+    return True
@@ -0,0 +1,192 @@
+"""
+Database engine configuration
+
+Pool parameters are chosen per backend and connection-level settings are
+applied as each new DBAPI connection is opened:
+
+* SQLite: WAL journal, synchronous=NORMAL, mmap and a busy timeout, so a
+  writer that finds the database locked waits for it instead of failing
+  with "database is locked".
+* PostgreSQL: a server-side statement timeout and, with psycopg 3, server
+  side prepared statements for repeated queries.
+
+Every pool records checkouts and how long callers waited for a connection
+in `pool_metrics`.
+"""
+
+import threading
+import time
+from sqlalchemy import event, exc, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+class PoolMetrics:
+    """Process-wide connection pool counters"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.acquire_count = 0
+            self.acquire_seconds_total = 0.0
+            self.acquire_seconds_max = 0.0
+
+    def increment(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_acquire(self, seconds, timed_out=False):
+        with self._lock:
+            self.acquire_count += 1
+            self.acquire_seconds_total += seconds
+            self.acquire_seconds_max = max(self.acquire_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self, pool=None):
+        with self._lock:
+            data = {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'acquire_count': self.acquire_count,
+                'acquire_seconds_total': round(self.acquire_seconds_total, 6),
+                'acquire_seconds_max': round(self.acquire_seconds_max, 6),
+                'acquire_seconds_avg': round(self.acquire_seconds_total / self.acquire_count, 6) if self.acquire_count else 0.0
+            }
+
+        if isinstance(pool, QueuePool):
+            data.update(
+                pool_size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=pool.overflow()
+            )
+        return data
+
+pool_metrics = PoolMetrics()
+
+class _TimedGetMixin:
+    # _do_get is where a checkout blocks when the pool is exhausted
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            pool_metrics.record_acquire(time.perf_counter() - start, timed_out)
+
+class TimedQueuePool(_TimedGetMixin, QueuePool):
+    """QueuePool that records how long each checkout waited"""
+
+class TimedAsyncAdaptedQueuePool(_TimedGetMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited"""
+
+def database_url(uri):
+    """Parse a DATABASE_URL, accepting the legacy postgres:// scheme"""
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return make_url(uri)
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def engine_options(config, url, pool_size=None, max_overflow=None, is_async=False):
+    """Keyword arguments for create_engine() for the given backend"""
+    backend = url.get_backend_name()
+
+    # In-memory SQLite lives in a single connection; keep the driver defaults
+    if _is_memory_sqlite(url):
+        return {}
+
+    options = {
+        'poolclass': TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        'pool_size': pool_size or config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'] if max_overflow is None else max_overflow,
+        'pool_timeout': config['DB_POOL_TIMEOUT']
+    }
+
+    if backend == 'sqlite':
+        # The driver-level timeout is the busy handler for the first lock
+        options['connect_args'] = {'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000}
+    elif backend == 'postgresql':
+        options.update(
+            pool_recycle=config['DB_POOL_RECYCLE'],
+            pool_pre_ping=config['DB_POOL_PRE_PING']
+        )
+        statement_timeout = config['PG_STATEMENT_TIMEOUT_MS']
+        driver = url.get_driver_name()
+        if driver == 'asyncpg':
+            # asyncpg prepares every statement server-side and caches it
+            options['connect_args'] = {'server_settings': {'statement_timeout': str(statement_timeout)}}
+        else:
+            options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+            if driver == 'psycopg':
+                options['connect_args']['prepare_threshold'] = config['PG_PREPARE_THRESHOLD']
+
+    return options
+
+def configure_engine(engine, config):
+    """Attach per-connection settings and pool metrics to an engine"""
+    url = engine.url
+
+    if url.get_backend_name() == 'sqlite' and not _is_memory_sqlite(url):
+        pragmas = [
+            'PRAGMA journal_mode=WAL',
+            f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+            f"PRAGMA mmap_size={config['SQLITE_MMAP_SIZE']}",
+            f"PRAGMA busy_timeout={config['SQLITE_BUSY_TIMEOUT_MS']}"
+        ]
+
+        @event.listens_for(engine, 'connect')
+        def apply_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    @event.listens_for(engine, 'connect')
+    def count_connect(dbapi_connection, connection_record):
+        pool_metrics.increment('connects')
+
+    @event.listens_for(engine, 'checkout')
+    def count_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_metrics.increment('checkouts')
+
+    @event.listens_for(engine, 'checkin')
+    def count_checkin(dbapi_connection, connection_record):
+        pool_metrics.increment('checkins')
+
+    @event.listens_for(engine, 'invalidate')
+    def count_invalidate(dbapi_connection, connection_record, exception):
+        pool_metrics.increment('invalidations')
+
+def init_database(app, db):
+    """Initialize Flask-SQLAlchemy with the tuned engine for the configured backend"""
+    url = database_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['SQLALCHEMY_DATABASE_URI'] = url.render_as_string(hide_password=False)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config, url))
+
+    db.init_app(app)
+    with app.app_context():
+        configure_engine(db.engine, app.config)
+
+def missing_tables(connection, metadata):
+    """Names of the tables in metadata that the database does not have"""
+    existing = set(inspect(connection).get_table_names())
+    return sorted(name for name in metadata.tables if name not in existing)
+
+def pool_status(engine):
+    """Pool counters plus the current pool occupancy of an engine"""
+    return pool_metrics.snapshot(engine.pool)
@@ -0,0 +1,51 @@
+"""
+Versioned ETags for read endpoints
+
+`ResourceVersions` keeps a counter per resource name (e.g. ``history:<user>``,
+``courses``, ``stats``). Write paths bump the resources they change. A read
+endpoint builds its ETag from the user and the versions of the resources it
+depends on *before* loading anything. When the browser sends that ETag back
+in If-None-Match, the endpoint answers 304 without touching storage.
+
+The ETag also carries a per-process epoch, so a restarted in-memory server
+never matches tags issued by its previous run.
+"""
+
+import threading
+import uuid
+from flask import request, make_response
+
+class ResourceVersions:
+    """Thread-safe version counters keyed by resource name"""
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def bump(self, *resources):
+        with self._lock:
+            for resource in resources:
+                self._versions[resource] = self._versions.get(resource, 0) + 1
+
+    def version(self, resource):
+        return self._versions.get(resource, 0)
+
+    def etag(self, user_id, *resources):
+        """Weak ETag value for a user's view of the given resources"""
+        versions = '.'.join(str(self.version(resource)) for resource in resources)
+        return f'{self.epoch}-{user_id}-{versions}'
+
+def is_fresh(etag):
+    """Whether the request's If-None-Match already names this ETag"""
+    return request.if_none_match.contains_weak(etag)
+
+def not_modified(etag):
+    """Empty 304 response carrying the ETag"""
+    return with_etag(make_response('', 304), etag)
+
+def with_etag(rv, etag):
+    """Attach the ETag to a view return value; browsers must revalidate each time"""
+    response = make_response(rv)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
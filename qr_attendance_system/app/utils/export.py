@@ -0,0 +1,174 @@
+"""
+Streaming attendance export
+
+Attendance rows are joined with student, course and session data and read
+through a streaming cursor (a server-side cursor on PostgreSQL) in batches,
+so an export of any size is produced with a constant amount of memory.
+"""
+
+import csv
+import io
+from datetime import datetime
+from app.models.models import db, Attendance, Session, Course, Student
+
+EXPORT_COLUMNS = (
+    'attendance_id',
+    'marked_at',
+    'session_id',
+    'session_date',
+    'course_code',
+    'course_name',
+    'student_id',
+    'student_name',
+    'department',
+    'semester'
+)
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+
+DEFAULT_BATCH_SIZE = 10000
+
+def parse_export_date(value):
+    """Parse an ISO date or datetime query argument (None when empty)"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+def attendance_export_query(start=None, end=None, course_id=None):
+    """Build the export SELECT for an optional session date range and course"""
+    query = db.select(
+        Attendance.id.label('attendance_id'),
+        Attendance.marked_at,
+        Session.id.label('session_id'),
+        Session.session_date,
+        Course.course_code,
+        Course.course_name,
+        Student.student_id,
+        Student.full_name.label('student_name'),
+        Student.department,
+        Student.semester
+    ).join_from(
+        Attendance, Session, Attendance.session_id == Session.id
+    ).join(
+        Course, Session.course_id == Course.id
+    ).join(
+        Student, Attendance.student_id == Student.id
+    )
+
+    if start:
+        query = query.where(Session.session_date >= start)
+    if end:
+        query = query.where(Session.session_date < end)
+    if course_id:
+        query = query.where(Session.course_id == course_id)
+
+    return query.order_by(Attendance.id)
+
+def iter_export_batches(query, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield lists of result rows, never holding more than one batch"""
+    result = db.session.execute(
+        query.execution_options(stream_results=True, max_row_buffer=batch_size)
+    )
+    try:
+        for partition in result.partitions(batch_size):
+            yield partition
+    finally:
+        result.close()
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def generate_csv(query, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield the export as CSV text, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in iter_export_batches(query, batch_size):
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to a generator
+
+    The Parquet writer only appends and asks for the current position, so
+    the bytes can be drained after every row group instead of being kept.
+    """
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def generate_parquet(query, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield the export as a Parquet file, one row group per batch"""
+    # pandas/pyarrow are optional and only needed for this format
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('attendance_id', pa.int64()),
+        ('marked_at', pa.timestamp('us')),
+        ('session_id', pa.int64()),
+        ('session_date', pa.timestamp('us')),
+        ('course_code', pa.string()),
+        ('course_name', pa.string()),
+        ('student_id', pa.string()),
+        ('student_name', pa.string()),
+        ('department', pa.string()),
+        ('semester', pa.int64())
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in iter_export_batches(query, batch_size):
+            frame = pd.DataFrame.from_records(rows, columns=EXPORT_COLUMNS)
+            writer.write_table(
+                pa.Table.from_pandas(frame, schema=schema, preserve_index=False),
+                row_group_size=batch_size
+            )
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def generate_export(fmt, start=None, end=None, course_id=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Return a generator producing the attendance export in the given format"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    query = attendance_export_query(start, end, course_id)
+    if fmt == 'parquet':
+        try:
+            import pandas
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError('Parquet export requires pandas and pyarrow to be installed')
+        return generate_parquet(query, batch_size)
+    return generate_csv(query, batch_size)
@@ -4,9 +4,10 @@ from datetime import datetime, timedelta
 from functools import wraps
 from flask import jsonify, request
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
-import qrcode
 from io import BytesIO
 import base64
+from app.utils.metrics import timer
+from app.utils.tracing import span
 
 def generate_qr_token():
     """Generate a unique token for QR code"""
@@ -14,14 +15,17 @@ def generate_qr_token():
 
 def generate_qr_code(token):
     """Generate a QR code image from a token"""
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
-    qr.add_data(token)
-    qr.make(fit=True)
-    
-    img = qr.make_image(fill_color="black", back_color="white")
-    buffered = BytesIO()
-    img.save(buffered, 'PNG')
-    img_str = base64.b64encode(buffered.getvalue()).decode()
+    # qrcode pulls in PIL; import it on first use, not at startup
+    import qrcode
+    with timer('qr_render_seconds'):
+        qr = qrcode.QRCode(version=1, box_size=10, border=5)
+        qr.add_data(token)
+        qr.make(fit=True)
+        
+        img = qr.make_image(fill_color="black", back_color="white")
+        buffered = BytesIO()
+        img.save(buffered, 'PNG')
+        img_str = base64.b64encode(buffered.getvalue()).decode()
     return img_str
 
 def generate_time_bound_qr(course_id, faculty_id, duration_minutes=3):
@@ -40,8 +44,9 @@ def role_required(required_role):
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt()
+            with span('jwt.verify'):
+                verify_jwt_in_request()
+                claims = get_jwt()
             if claims.get('role') != required_role:
                 return jsonify(msg=f'Missing required role: {required_role}'), 403
             else:
@@ -54,8 +59,9 @@ def roles_required(required_roles):
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt()
+            with span('jwt.verify'):
+                verify_jwt_in_request()
+                claims = get_jwt()
             if claims.get('role') not in required_roles:
                 return jsonify(msg=f'Missing required roles: {required_roles}'), 403
             else:
@@ -0,0 +1,131 @@
+"""
+Fast JSON responses
+
+`FastJSONProvider` replaces Flask's default provider in create_app() and
+simple_app.py. It serializes with orjson when that package is installed and
+with the standard library otherwise. Both paths write datetimes and dates as
+ISO 8601 (Flask's default would produce HTTP dates) and UUIDs as strings.
+They do this directly, not through a fallback hook.
+
+The API stores naive UTC (``datetime.utcnow()``), so with JSON_NAIVE_UTC on
+(the default in config.py) naive datetimes are written with a ``+00:00``
+offset and clients read them as UTC, as they did the HTTP dates' "GMT". The
+web demo keeps local time and leaves it off.
+
+`json_list_response` returns large list payloads as a streamed JSON object.
+The list is encoded in chunks while the response is sent, so the whole body
+never exists as one string.
+"""
+
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+from flask import current_app, jsonify, Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def isoformat(value, naive_utc=False):
+    """ISO 8601 text of a date, time or datetime; naive datetimes as UTC if naive_utc"""
+    if naive_utc and isinstance(value, datetime) and value.tzinfo is None:
+        return value.isoformat() + '+00:00'
+    return value.isoformat()
+
+def _default(o, naive_utc=False):
+    """Types neither serializer handles on its own"""
+    if isinstance(o, (datetime, date, time)):
+        return isoformat(o, naive_utc)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson-backed provider with ISO datetimes; stdlib json when orjson is missing"""
+    def __init__(self, app, use_orjson=True, naive_utc=False):
+        super().__init__(app)
+        self.use_orjson = use_orjson and orjson is not None
+        self.naive_utc = naive_utc
+
+    def default(self, o):
+        return _default(o, self.naive_utc)
+
+    def _orjson_options(self, indent):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.naive_utc:
+            options |= orjson.OPT_NAIVE_UTC
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, indent=False):
+        """Serialize obj to UTF-8 bytes"""
+        if self.use_orjson:
+            return orjson.dumps(obj, default=_default, option=self._orjson_options(indent))
+        return self.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and set(kwargs) <= {'indent'}:
+            return self.dumps_bytes(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.dumps_bytes(obj, indent), mimetype=self.mimetype)
+
+def _encode(provider, obj):
+    if isinstance(provider, FastJSONProvider):
+        return provider.dumps_bytes(obj)
+    return provider.dumps(obj).encode('utf-8')
+
+def _stream_object(provider, fields, key, items, chunk_size):
+    # Runs after the request context is gone, so the provider is passed in
+    head = _encode(provider, fields)
+    # Reopen the object after the scalar fields and append the list
+    yield head[:-1] + (b',' if fields else b'') + _encode(provider, key) + b':['
+    for start in range(0, len(items), chunk_size):
+        chunk = _encode(provider, items[start:start + chunk_size])
+        yield (b',' if start else b'') + chunk[1:-1]
+    yield b']}'
+
+def json_list_response(key, items, status=200, **fields):
+    """Respond with {**fields, key: items}; stream it when the list is large"""
+    threshold = current_app.config.get('JSON_STREAM_THRESHOLD', 1000)
+    if not threshold or len(items) < threshold:
+        return jsonify({**fields, key: items}), status
+    chunk_size = current_app.config.get('JSON_STREAM_CHUNK_SIZE', 500)
+    return Response(
+        _stream_object(current_app.json, fields, key, items, chunk_size),
+        status=status,
+        mimetype='application/json'
+    )
+
+def init_json(app):
+    """Install FastJSONProvider on the app"""
+    app.json = FastJSONProvider(
+        app,
+        use_orjson=app.config.get('JSON_USE_ORJSON', True),
+        naive_utc=app.config.get('JSON_NAIVE_UTC', False)
+    )
+    return app.json
@@ -0,0 +1,111 @@
+"""
+Live attendance feed for the faculty projector view
+
+The mark path publishes one small event per attendance to an in-process
+broker. Every open `/faculty/session/<id>/live` stream subscribes to its
+session and relays the events as Server-Sent Events. Events arriving within
+the coalescing window are sent as a single frame, so a burst of scans at
+class start costs one write per window instead of one per student.
+
+The broker lives in process memory: with several worker processes a stream
+only sees marks handled by its own worker.
+"""
+
+import json
+import threading
+import time
+from flask import Response, current_app
+from app.utils.json_provider import isoformat
+
+class Subscription:
+    """Pending events for one open stream"""
+    def __init__(self, session_id, count=0, max_pending=500):
+        self.session_id = session_id
+        self.count = count
+        self.max_pending = max_pending
+        self._events = []
+        self._condition = threading.Condition()
+
+    def push(self, event):
+        with self._condition:
+            self.count += 1
+            self._events.append(event)
+            # A stalled client must not grow memory without bound; the
+            # running count in every frame stays exact either way
+            if len(self._events) > self.max_pending:
+                del self._events[:len(self._events) - self.max_pending]
+            self._condition.notify()
+
+    def wait(self, timeout):
+        """Block until events are pending (or timeout) and take them all"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._events, timeout)
+            events, self._events = self._events, []
+            return events, self.count
+
+class LiveBroker:
+    """In-process publish/subscribe keyed by attendance session"""
+    def __init__(self, coalesce_interval=0.25, keepalive_interval=15):
+        self.coalesce_interval = coalesce_interval
+        self.keepalive_interval = keepalive_interval
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, session_id, count=0):
+        subscription = Subscription(session_id, count)
+        with self._lock:
+            self._subscriptions.setdefault(session_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.session_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.session_id]
+
+    def publish(self, session_id, event):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(session_id, ()))
+        for subscription in subscribers:
+            subscription.push(event)
+
+    def stream(self, session_id, count=0):
+        """Yield SSE frames for a session until the client disconnects"""
+        subscription = self.subscribe(session_id, count)
+        try:
+            yield _sse_frame('snapshot', {'count': subscription.count})
+            while True:
+                events, count = subscription.wait(self.keepalive_interval)
+                if not events:
+                    yield ': keepalive\n\n'
+                    continue
+
+                # Let the rest of a burst arrive, then send it as one frame
+                time.sleep(self.coalesce_interval)
+                more, count = subscription.wait(0)
+                yield _sse_frame('attendance', {'count': count, 'marked': events + more})
+        finally:
+            self.unsubscribe(subscription)
+
+def _sse_frame(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+
+broker = LiveBroker()
+
+def publish_attendance(session_id, student_id, student_name, marked_at):
+    """Announce a newly marked attendance to live viewers of the session"""
+    broker.publish(session_id, {
+        'student_id': student_id,
+        'student_name': student_name,
+        'marked_at': isoformat(marked_at, getattr(current_app.json, 'naive_utc', False)) if hasattr(marked_at, 'isoformat') else marked_at
+    })
+
+def live_response(session_id, count):
+    """Build the text/event-stream response for a session"""
+    return Response(
+        broker.stream(session_id, count),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
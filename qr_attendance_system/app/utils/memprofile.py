@@ -0,0 +1,256 @@
+"""
+Memory profiling for the in-memory server
+
+Two views of where the web demo's memory goes:
+
+- `repository_footprint` sizes every collection of a MemoryRepository, with
+  its secondary indexes, and reports bytes per record. Records are sampled
+  and extrapolated, so the cost stays low on large stores. Given a memory
+  limit it also estimates how many more attendances fit.
+- `SnapshotTracker` takes tracemalloc snapshots and diffs each one against
+  the previous one and against the first (baseline), by allocation site.
+  Growth that stays after compaction or a semester rollover shows up here.
+
+simple_app.py serves both to admins under /admin/memory. Run
+``python -m app.utils.memprofile`` to poll that endpoint and print growth
+over time.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+# Collection -> (attribute holding the records, attributes of its indexes)
+COLLECTIONS = {
+    'users': ('users', ('_users_by_username',)),
+    'students': ('students', ('_students_by_user',)),
+    'faculties': ('faculties', ('_faculties_by_user',)),
+    'courses': ('courses', ('_courses_by_code', '_session_counts')),
+    'sessions': ('sessions', ('_sessions_by_token',)),
+    'attendances': ('attendances', ('_attendances_by_session', '_attendances_by_student', '_attendance_totals')),
+    'enrollments': ('_enrollments', ('_student_courses',))
+}
+
+def deep_size(obj, skip=frozenset(), seen=None):
+    """Bytes held by obj and everything it contains, except objects in skip"""
+    if seen is None:
+        seen = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        item = stack.pop()
+        ident = id(item)
+        if ident in seen or ident in skip:
+            continue
+        seen.add(ident)
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return size
+
+def _sampled_size(container, sample_size, skip):
+    """Dict overhead plus the size of its entries, extrapolated from a sample"""
+    items = list(container.items())
+    if not items:
+        return sys.getsizeof(container)
+    sample = items if len(items) <= sample_size else random.sample(items, sample_size)
+    entry_bytes = sum(deep_size(key, skip) + deep_size(value, skip) for key, value in sample)
+    return sys.getsizeof(container) + int(entry_bytes * len(items) / len(sample))
+
+def _record_count(name, records):
+    if name == 'enrollments':
+        return sum(len(students) for students in records.values())
+    return len(records)
+
+def process_rss():
+    """Resident set size of this process in bytes, where the OS reports it"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def repository_footprint(repository, sample_size=1000, limit_bytes=None):
+    """Estimate the memory held by each collection of a MemoryRepository"""
+    with repository._lock:
+        containers = {
+            name: (getattr(repository, attribute), [getattr(repository, index) for index in indexes])
+            for name, (attribute, indexes) in COLLECTIONS.items()
+        }
+        # Copy the top level so writes can go on while the copies are sized
+        containers = {
+            name: (dict(records), [dict(index) for index in indexes])
+            for name, (records, indexes) in containers.items()
+        }
+
+    # Indexes point at the same record dicts; count those once, under the
+    # collection that owns them
+    primary = set()
+    for name, (records, indexes) in containers.items():
+        if name != 'enrollments':
+            primary.update(id(record) for record in records.values())
+    primary = frozenset(primary)
+
+    collections = {}
+    for name, (records, indexes) in containers.items():
+        count = _record_count(name, records)
+        record_bytes = _sampled_size(records, sample_size, frozenset())
+        index_bytes = sum(_sampled_size(index, sample_size, primary) for index in indexes)
+        collections[name] = {
+            'records': count,
+            'record_bytes': record_bytes,
+            'index_bytes': index_bytes,
+            'bytes_per_record': round((record_bytes + index_bytes) / count) if count else None
+        }
+
+    total = sum(c['record_bytes'] + c['index_bytes'] for c in collections.values())
+    report = {
+        'taken_at': datetime.now().isoformat(),
+        'collections': collections,
+        'total_bytes': total,
+        'rss_bytes': process_rss()
+    }
+
+    per_attendance = collections['attendances']['bytes_per_record']
+    if limit_bytes and report['rss_bytes'] is not None and per_attendance:
+        headroom = max(limit_bytes - report['rss_bytes'], 0)
+        report['limit_bytes'] = limit_bytes
+        report['attendances_until_limit'] = headroom // per_attendance
+    return report
+
+def _stat_to_dict(stat):
+    frame = stat.traceback[0]
+    return {
+        'site': f'{frame.filename}:{frame.lineno}',
+        'size_bytes': stat.size,
+        'size_diff_bytes': stat.size_diff,
+        'count': stat.count,
+        'count_diff': stat.count_diff
+    }
+
+class SnapshotTracker:
+    """tracemalloc snapshots diffed against the previous one and the baseline"""
+    def __init__(self):
+        self.baseline = None
+        self.previous = None
+        self._lock = threading.Lock()
+
+    def _take(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>')
+        ))
+
+    def snapshot(self, frames=1, top=20, key_type='lineno'):
+        """Take a snapshot, starting tracemalloc on the first call"""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self.baseline = self.previous = self._take()
+                return {'started': True, 'frames': frames}
+
+            current = self._take()
+            report = {
+                'started': False,
+                'traced_bytes': tracemalloc.get_traced_memory()[0],
+                'peak_bytes': tracemalloc.get_traced_memory()[1],
+                'overhead_bytes': tracemalloc.get_tracemalloc_memory(),
+                'since_previous': [_stat_to_dict(s) for s in current.compare_to(self.previous, key_type)[:top]],
+                'since_baseline': [_stat_to_dict(s) for s in current.compare_to(self.baseline, key_type)[:top]]
+            }
+            self.previous = current
+            return report
+
+    def stop(self):
+        """Stop tracing and drop the stored snapshots"""
+        with self._lock:
+            self.baseline = self.previous = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    def status(self):
+        if not tracemalloc.is_tracing():
+            return {'tracing': False}
+        current, peak = tracemalloc.get_traced_memory()
+        return {'tracing': True, 'traced_bytes': current, 'peak_bytes': peak}
+
+tracker = SnapshotTracker()
+
+# Command line: poll a running server
+
+def _mb(value):
+    return f'{value / (1024 * 1024):.1f}' if value is not None else '-'
+
+def main(argv=None):
+    """Poll GET /admin/memory on a running web demo and print growth"""
+    import http.cookiejar
+    import urllib.request
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--url', default='http://localhost:5000', help='Base URL of simple_app.py.')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--interval', type=float, default=60, help='Seconds between reports.')
+    parser.add_argument('--count', type=int, default=1, help='Number of reports (0 runs until interrupted).')
+    parser.add_argument('--limit-mb', type=float, help='Memory limit used for the projection.')
+    parser.add_argument('--snapshot', action='store_true', help='Also take tracemalloc snapshots and show top growth.')
+    args = parser.parse_args(argv)
+
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def call(method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(args.url + path, data=data, method=method, headers={'Content-Type': 'application/json'})
+        with opener.open(req) as response:
+            return json.loads(response.read())
+
+    call('POST', '/login', {'username': args.username, 'password': args.password})
+    query = f'?limit_mb={args.limit_mb}' if args.limit_mb else ''
+    if args.snapshot:
+        call('POST', '/admin/memory/snapshot')
+
+    first = None
+    taken = 0
+    while True:
+        report = call('GET', '/admin/memory' + query)
+        now = time.monotonic()
+        first = first or (now, report)
+
+        print(f"\n{report['taken_at']}  store {_mb(report['total_bytes'])} MB  rss {_mb(report['rss_bytes'])} MB")
+        print(f"  {'collection':<12} {'records':>9} {'MB':>8} {'B/record':>9}")
+        for name, c in report['collections'].items():
+            print(f"  {name:<12} {c['records']:>9} {_mb(c['record_bytes'] + c['index_bytes']):>8} {c['bytes_per_record'] or '-':>9}")
+
+        elapsed = now - first[0]
+        if elapsed > 0 and report['rss_bytes'] and first[1]['rss_bytes']:
+            rate = (report['rss_bytes'] - first[1]['rss_bytes']) / elapsed
+            line = f'  rss growth {_mb(rate * 3600)} MB/hour'
+            if args.limit_mb and rate > 0:
+                hours = (args.limit_mb * 1024 * 1024 - report['rss_bytes']) / rate / 3600
+                line += f', limit reached in {hours:.1f} hours'
+            print(line)
+        if 'attendances_until_limit' in report:
+            print(f"  about {report['attendances_until_limit']} more attendances fit under the limit")
+
+        if args.snapshot:
+            diff = call('POST', '/admin/memory/snapshot')
+            for stat in diff.get('since_previous', [])[:10]:
+                print(f"  {stat['size_diff_bytes']:>+12} B  {stat['site']}")
+
+        taken += 1
+        if args.count and taken >= args.count:
+            break
+        time.sleep(args.interval)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""
+Request instrumentation exposed in Prometheus text format
+
+With METRICS_ENABLED=1, `init_metrics` records for every request its latency
+and the number of SQL statements it ran and their total time. The SQL
+figures come from the shared statement timer in app/utils/query_timing.py.
+QR rendering and password hashing are timed wherever they happen. `GET /metrics` serves the
+histograms, plus the connection pool counters of app/utils/database.py.
+
+When metrics are disabled no hooks or listeners are installed. `timer()`
+then returns a shared no-op context manager, so the instrumented helpers
+cost one attribute check.
+
+Every worker process keeps its own figures. Scrape each worker, or run a
+single worker with threads, to see the whole server.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from flask import g, request, has_request_context, current_app, Response, abort
+from app.utils import query_timing
+from app.utils.database import pool_metrics
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values"""
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, [("le", _number(float(bound)))])} {cumulative}')
+            lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, [("le", "+Inf")])} {values[-1]}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(values[-2])}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {values[-1]}')
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+class Metrics:
+    """The process-wide histograms"""
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}
+        for histogram in (
+            Histogram('http_request_duration_seconds', 'Request latency by route.', labelnames=('method', 'route', 'status')),
+            Histogram('http_request_sql_statements', 'SQL statements executed per request.', COUNT_BUCKETS, ('method', 'route')),
+            Histogram('http_request_sql_seconds', 'Time spent in SQL per request.', labelnames=('method', 'route')),
+            Histogram('db_statement_seconds', 'Duration of single SQL statements.'),
+            Histogram('qr_render_seconds', 'Time to render a QR code image.'),
+            Histogram('password_hash_seconds', 'Time spent hashing or checking a password.', labelnames=('operation',))
+        ):
+            self.histograms[histogram.name] = histogram
+
+    def observe(self, name, value, *labels):
+        self.histograms[name].observe(value, *labels)
+
+    def render(self, pool=None):
+        lines = []
+        for histogram in self.histograms.values():
+            lines += histogram.render()
+
+        snapshot = pool_metrics.snapshot(pool)
+        for key in ('connects', 'checkouts', 'checkins', 'invalidations', 'timeouts'):
+            lines += [f'# TYPE db_pool_{key}_total counter', f'db_pool_{key}_total {snapshot[key]}']
+        lines += [
+            '# TYPE db_pool_acquire_seconds_total counter',
+            f'db_pool_acquire_seconds_total {_number(snapshot["acquire_seconds_total"])}',
+            '# TYPE db_pool_acquire_seconds_max gauge',
+            f'db_pool_acquire_seconds_max {_number(snapshot["acquire_seconds_max"])}'
+        ]
+        for key, name in (('pool_size', 'db_pool_size'), ('checked_out', 'db_pool_checked_out'), ('checked_in', 'db_pool_checked_in'), ('overflow', 'db_pool_overflow')):
+            if key in snapshot:
+                lines += [f'# TYPE {name} gauge', f'{name} {snapshot[key]}']
+
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+metrics = Metrics()
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def timer(name, *labels):
+    """Time a block into the named histogram (a no-op while metrics are disabled)"""
+    if not metrics.enabled:
+        return _NULL_TIMER
+    return _Timer(metrics.histograms[name], labels)
+
+# SQL statements
+
+def _observe_statement(statement, parameters, elapsed):
+    metrics.observe('db_statement_seconds', elapsed)
+
+    if has_request_context():
+        sql = g.get('_metrics_sql')
+        if sql is not None:
+            sql[0] += 1
+            sql[1] += elapsed
+
+# Requests
+
+def _route_label():
+    # The URL rule, not the path, keeps the label set bounded
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+def _start_request():
+    g._metrics_start = time.perf_counter()
+    g._metrics_sql = [0, 0.0]
+
+def _finish_request(response):
+    start = g.pop('_metrics_start', None)
+    if start is None:
+        return response
+
+    method, route = request.method, _route_label()
+    metrics.observe('http_request_duration_seconds', time.perf_counter() - start, method, route, response.status_code)
+    statements, seconds = g.pop('_metrics_sql', (0, 0.0))
+    metrics.observe('http_request_sql_statements', statements, method, route)
+    metrics.observe('http_request_sql_seconds', seconds, method, route)
+    return response
+
+def metrics_endpoint():
+    """Serve the metrics in Prometheus text format"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        abort(401)
+
+    pool = None
+    sqlalchemy = current_app.extensions.get('sqlalchemy')
+    if sqlalchemy is not None:
+        pool = sqlalchemy.engine.pool
+
+    return Response(metrics.render(pool), mimetype='text/plain; version=0.0.4')
+
+def init_metrics(app):
+    """Instrument the app when METRICS_ENABLED is set; return whether it was"""
+    if not app.config.get('METRICS_ENABLED'):
+        return False
+
+    metrics.enabled = True
+    query_timing.subscribe(_observe_statement)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint, methods=['GET'])
+    return True
@@ -0,0 +1,98 @@
+"""
+Validation of scans captured offline
+
+The mobile app stores each scan with the device's time and uploads the queue
+in batches once the network is back. A batch looks like:
+
+    {"sent_at": "<device time of upload>",
+     "scans": [{"qr_token": "...", "scanned_at": "<device time of scan>"}, ...]}
+
+Device times carry the phone's UTC offset and are converted to the server's
+zone (``server_tz``: UTC for the API, local time for the demo) first. Device
+clocks still drift, so every scan time is then moved by the difference
+between the server's clock and ``sent_at`` before it is checked. A scan is accepted
+when that corrected time falls inside its session's QR window (session start
+to QR expiration, give or take ``grace``), is not in the future, and arrives
+no later than ``max_delay`` after the window closed. Accepted scans are
+recorded at their capture time, not at upload time.
+
+Both device times are supplied by the client, so a back-dated scan cannot be
+told apart from a real one. The only time the server can vouch for is the
+upload itself, so ``max_delay`` is what bounds how long a leaked token stays
+usable: keep it to minutes (OFFLINE_SCAN_MAX_DELAY). Batches whose clock
+differs from the server's by more than ``max_skew`` (OFFLINE_SCAN_MAX_CLOCK_SKEW)
+are refused as a whole: every scan gets status ``clock_skew``, which the app
+keeps queued until the phone's clock is fixed.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+MAX_BATCH_SIZE = 100
+DEFAULT_MAX_DELAY = timedelta(minutes=10)
+DEFAULT_MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+def parse_device_time(value, server_tz=timezone.utc):
+    """Naive datetime in server_tz (None for local time) from an ISO 8601 string, or None"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    # Naive times are taken as they are; the sent_at offset still corrects them
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(server_tz).replace(tzinfo=None)
+    return parsed
+
+def validate_scans(repository, scans, sent_at, now, grace=timedelta(seconds=30), max_delay=DEFAULT_MAX_DELAY,
+                   max_skew=DEFAULT_MAX_CLOCK_SKEW, server_tz=timezone.utc):
+    """Check each scan against its session's window at capture time.
+
+    now and the session times are naive datetimes in server_tz (None for
+    local time). Returns (accepted, results). results has one dict per scan,
+    in order; rejected scans already carry their status. accepted lists
+    (index, session, marked_at) for the scans that still need marking.
+    """
+    sent_at = parse_device_time(sent_at, server_tz)
+    offset = now - sent_at if sent_at else timedelta(0)
+    # A clock this far off is more likely forged than drifted
+    skewed = abs(offset) > max_skew
+
+    accepted = []
+    results = []
+    seen = set()
+    sessions = {}
+    for index, scan in enumerate(scans):
+        token = scan.get('qr_token') if isinstance(scan, dict) else None
+        scanned_at = parse_device_time(scan.get('scanned_at'), server_tz) if token else None
+        result = {'qr_token': token}
+        results.append(result)
+
+        if not token or not scanned_at:
+            result.update(status='invalid', msg='qr_token and scanned_at are required')
+            continue
+        if skewed:
+            result.update(status='clock_skew', msg='Device clock differs too much from the server')
+            continue
+        if token in seen:
+            result.update(status='duplicate', msg='Token appears twice in this batch')
+            continue
+        seen.add(token)
+
+        if token not in sessions:
+            sessions[token] = repository.get_session_by_token(token)
+        session = sessions[token]
+        if not session:
+            result.update(status='invalid', msg='Invalid QR code')
+            continue
+
+        captured_at = scanned_at + offset
+        opened = session['session_date'] - grace
+        closed = session['qr_expiration'] + grace
+        if captured_at > now + grace:
+            result.update(status='invalid', msg='Scan time is in the future')
+        elif not opened <= captured_at <= closed:
+            result.update(status='expired', msg='QR code was not valid at scan time')
+        elif now - closed > max_delay:
+            result.update(status='expired', msg='Scan was uploaded too late')
+        else:
+            accepted.append((index, session, min(max(captured_at, session['session_date']), now)))
+    return accepted, results
@@ -0,0 +1,98 @@
+"""
+Sampling profiler for the running server
+
+With PROFILER_ENABLED=1, `init_profiler` tags every request thread with the
+endpoint it is serving (``blueprint.view``, e.g. ``admin.get_all_users``).
+`SamplingProfiler.profile` then reads the stacks of the tagged threads through
+``sys._current_frames()`` at a fixed interval for a bounded window. The
+samples are aggregated into collapsed stacks, one ``frame;frame;... count``
+line per distinct stack, with the endpoint as the root frame. flamegraph.pl,
+speedscope and inferno read this format as is.
+
+Only threads of the process that serves the profile request are sampled. Run
+gunicorn with threads (GUNICORN_THREADS > 1) so that other requests are served
+while a window is open; a sync worker can only see its own profile request.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from flask import request
+
+class ProfilerBusy(Exception):
+    """Raised when a profiling window is already open in this process"""
+
+def _frame_label(code):
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+def collapse_stack(frame):
+    """Return the stack of `frame` root first, joined with ';'"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+class SamplingProfiler:
+    """Samples the stacks of tagged request threads"""
+    def __init__(self):
+        self._tags = {}  # thread ident -> endpoint
+        self._window = threading.Lock()
+
+    def tag(self, endpoint):
+        self._tags[threading.get_ident()] = endpoint
+
+    def untag(self):
+        self._tags.pop(threading.get_ident(), None)
+
+    def profile(self, seconds, interval=0.005, endpoint=None):
+        """Sample request threads for `seconds`; return (stack counts, sample rounds)"""
+        if not self._window.acquire(blocking=False):
+            raise ProfilerBusy('A profile is already running')
+
+        try:
+            own = threading.get_ident()
+            stacks = Counter()
+            rounds = 0
+            deadline = time.perf_counter() + seconds
+
+            while time.perf_counter() < deadline:
+                frames = sys._current_frames()
+                for ident, tag in list(self._tags.items()):
+                    if ident == own or (endpoint and tag != endpoint):
+                        continue
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stacks[f'{tag};{collapse_stack(frame)}'] += 1
+                # Drop the frame references before sleeping
+                del frames
+                rounds += 1
+                time.sleep(interval)
+
+            return stacks, rounds
+        finally:
+            self._window.release()
+
+def format_collapsed(stacks):
+    """Render stack counts as collapsed-stack text, heaviest first"""
+    return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+
+profiler = SamplingProfiler()
+
+def _tag_request():
+    profiler.tag(request.endpoint or 'unmatched')
+
+def _untag_request(exc):
+    profiler.untag()
+
+def init_profiler(app):
+    """Tag request threads when PROFILER_ENABLED is set; return whether it was"""
+    if not app.config.get('PROFILER_ENABLED'):
+        return False
+
+    app.before_request(_tag_request)
+    app.teardown_request(_untag_request)
+    return True
@@ -0,0 +1,33 @@
+"""
+Shared SQL statement timing
+
+One pair of SQLAlchemy cursor listeners times every statement and passes the
+result to the subscribed callbacks: request metrics (app/utils/metrics.py)
+and the slow-query log and N+1 detector (app/utils/sql_diagnostics.py). Each
+statement is timed once, however many of them are enabled.
+"""
+
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_subscribers = []
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_timing_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_timing_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    for callback in _subscribers:
+        callback(statement, parameters, elapsed)
+
+def subscribe(callback):
+    """Call callback(statement, parameters, elapsed_seconds) after every statement"""
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
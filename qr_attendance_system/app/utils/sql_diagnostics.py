@@ -0,0 +1,125 @@
+"""
+Slow-query log and N+1 detector
+
+Two diagnostics on the shared statement timer (app/utils/query_timing.py),
+both off by default:
+
+- SQL_SLOW_QUERY_MS logs every statement that ran longer than the threshold,
+  with its bound parameters, the route and the application line that issued
+  it.
+- SQL_N_PLUS_ONE_THRESHOLD counts statement shapes per request. The shape is
+  the SQL text with whitespace and IN lists collapsed; parameters are already
+  placeholders. A shape that runs more than K times in one request is logged
+  when the request ends, with the route and the call site of the first
+  repeat. That is the usual sign of a per-row `.query.get()` loop.
+
+Messages go to the `app.utils.sql_diagnostics` logger, a child of the Flask
+app logger.
+"""
+
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from flask import g, request, has_request_context
+from app.utils import query_timing
+
+logger = logging.getLogger(__name__)
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PROJECT_ROOT = os.path.dirname(_APP_ROOT)
+_WHITESPACE = re.compile(r'\s+')
+# Frames of the timing hook itself are not call sites
+_OWN_FILES = {os.path.abspath(__file__), os.path.abspath(query_timing.__file__)}
+_IN_LIST = re.compile(r'\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))*\s*\)')
+
+# Populated by init_sql_diagnostics
+_settings = {'slow_seconds': None, 'repeat_threshold': None, 'max_param_length': 200}
+
+def statement_shape(statement):
+    """Normalize a statement so that repeats with other parameters compare equal"""
+    return _IN_LIST.sub('(...)', _WHITESPACE.sub(' ', statement).strip())
+
+def call_site():
+    """Return 'file:line in function' for the innermost application frame"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_PROJECT_ROOT) and filename not in _OWN_FILES:
+            relative = os.path.relpath(filename, _PROJECT_ROOT)
+            return f'{relative}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return 'unknown'
+
+def _format_params(parameters):
+    text = repr(parameters)
+    limit = _settings['max_param_length']
+    return text if len(text) <= limit else text[:limit] + '...'
+
+def _route():
+    if not has_request_context():
+        return 'no request'
+    return f'{request.method} {request.url_rule.rule if request.url_rule else request.path}'
+
+# SQL statements
+
+def _check_statement(statement, parameters, elapsed):
+    slow_seconds = _settings['slow_seconds']
+    if slow_seconds is not None and elapsed >= slow_seconds:
+        logger.warning(
+            'Slow query (%.1f ms) on %s at %s: %s | params=%s',
+            elapsed * 1000, _route(), call_site(), _WHITESPACE.sub(' ', statement).strip(), _format_params(parameters)
+        )
+
+    threshold = _settings['repeat_threshold']
+    if threshold is not None and has_request_context():
+        shapes = g.get('_sql_shapes')
+        if shapes is None:
+            return
+        shape = statement_shape(statement)
+        shapes[shape] += 1
+        # Remember where the first repeat past the threshold came from
+        if shapes[shape] == threshold + 1:
+            g._sql_call_sites[shape] = call_site()
+
+# Requests
+
+def _start_request():
+    g._sql_shapes = Counter()
+    g._sql_call_sites = {}
+
+def _report_repeats(response):
+    shapes = g.pop('_sql_shapes', None)
+    call_sites = g.pop('_sql_call_sites', {})
+    if not shapes:
+        return response
+
+    route = _route()
+    for shape, site in call_sites.items():
+        logger.warning(
+            'Possible N+1 on %s: statement ran %d times, first repeat at %s: %s',
+            route, shapes[shape], site, shape
+        )
+    return response
+
+def init_sql_diagnostics(app):
+    """Install the slow-query log and N+1 detector when configured; return whether any was"""
+    slow_ms = app.config.get('SQL_SLOW_QUERY_MS')
+    threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD')
+    if not slow_ms and not threshold:
+        return False
+
+    _settings['slow_seconds'] = slow_ms / 1000 if slow_ms else None
+    _settings['repeat_threshold'] = threshold or None
+    _settings['max_param_length'] = app.config.get('SQL_LOG_PARAM_LENGTH', 200)
+
+    # Creating the app logger attaches Flask's default handler, which this
+    # module's logger propagates to
+    app.logger.debug('SQL diagnostics: slow=%s ms, repeat threshold=%s', slow_ms, threshold)
+    query_timing.subscribe(_check_statement)
+
+    if threshold:
+        app.before_request(_start_request)
+        app.after_request(_report_repeats)
+    return True
@@ -0,0 +1,152 @@
+"""
+Cached dashboard statistics
+
+StatsService keeps a running count of users, students, faculty, courses,
+sessions and attendances. Inserts and deletes flushed through the ORM session
+adjust the counters once their transaction commits, and the counters are
+reconciled against the database whenever they are older than
+STATS_MAX_STALENESS seconds. That catches bulk statements, other worker
+processes and any other writes the ORM events do not see.
+"""
+
+import threading
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from app.models.models import db, User, Student, Faculty, Course, Session, Attendance, Enrollment
+
+COUNTED_MODELS = {
+    User: 'total_users',
+    Student: 'total_students',
+    Faculty: 'total_faculties',
+    Course: 'total_courses',
+    Session: 'total_sessions',
+    Attendance: 'total_attendances'
+}
+
+_PENDING_KEY = 'stats_pending_deltas'
+
+class StatsService:
+    """Process-wide running counters behind the admin dashboard"""
+    def __init__(self, max_staleness=60):
+        self.max_staleness = max_staleness
+        self._counts = None
+        self._reconciled_at = 0
+        self._lock = threading.Lock()
+
+    def apply(self, deltas):
+        """Add committed insert/delete deltas to the counters"""
+        with self._lock:
+            if self._counts is None:
+                return
+            for name, delta in deltas.items():
+                self._counts[name] = max(0, self._counts[name] + delta)
+
+    def reconcile(self):
+        """Replace the counters with exact counts from the database"""
+        counts = db.session.execute(counts_query()).one()._asdict()
+
+        with self._lock:
+            self._counts = counts
+            self._reconciled_at = time.monotonic()
+        return dict(counts)
+
+    def invalidate(self):
+        with self._lock:
+            self._counts = None
+
+    def snapshot(self):
+        """Return the counters, reconciling first if they are too old"""
+        with self._lock:
+            fresh = self._counts is not None and time.monotonic() - self._reconciled_at < self.max_staleness
+            if fresh:
+                return dict(self._counts)
+        return self.reconcile()
+
+def _collect_deltas(session, flush_context, instances):
+    # Staged per (possibly nested) transaction, so a savepoint rollback can
+    # drop just its own deltas
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    pending = session.info.setdefault(_PENDING_KEY, {}).setdefault(transaction, {})
+    for objects, sign in ((session.new, 1), (session.deleted, -1)):
+        for instance in objects:
+            name = COUNTED_MODELS.get(type(instance))
+            if name:
+                pending[name] = pending.get(name, 0) + sign
+
+def _apply_deltas(session):
+    staged = session.info.pop(_PENDING_KEY, None)
+    if staged and has_app_context():
+        service = current_app.extensions.get('stats')
+        if service:
+            deltas = {}
+            for transaction_deltas in staged.values():
+                for name, delta in transaction_deltas.items():
+                    deltas[name] = deltas.get(name, 0) + delta
+            service.apply(deltas)
+
+def _discard_deltas(session, previous_transaction):
+    """Drop the deltas of a rolled back transaction and of those nested in it"""
+    staged = session.info.get(_PENDING_KEY)
+    if not staged:
+        return
+    for transaction in list(staged):
+        ancestor = transaction
+        while ancestor is not None and ancestor is not previous_transaction:
+            ancestor = ancestor.parent
+        if ancestor is not None:
+            del staged[transaction]
+
+def counts_query():
+    """One SELECT returning every counter as a scalar subquery"""
+    return db.select(*[
+        db.select(db.func.count()).select_from(model).scalar_subquery().label(name)
+        for model, name in COUNTED_MODELS.items()
+    ])
+
+def recent_enrollments_query(limit=5):
+    """Latest enrollments joined with student and course names"""
+    return db.select(
+        Student.full_name,
+        Course.course_name,
+        Enrollment.enrollment_date
+    ).join_from(
+        Enrollment, Student, Enrollment.student_id == Student.id
+    ).join(
+        Course, Enrollment.course_id == Course.id
+    ).order_by(Enrollment.enrollment_date.desc()).limit(limit)
+
+def format_recent_enrollments(rows):
+    return [
+        {
+            'student_name': student_name,
+            'course_name': course_name,
+            'enrollment_date': enrollment_date
+        }
+        for student_name, course_name, enrollment_date in rows
+    ]
+
+def recent_enrollments(limit=5):
+    """Latest enrollments with student and course names in a single query"""
+    return format_recent_enrollments(db.session.execute(recent_enrollments_query(limit)).all())
+
+def get_stats():
+    """Return the StatsService of the current app"""
+    return current_app.extensions['stats']
+
+def init_stats(app):
+    """Create the app's StatsService and hook it into ORM transactions"""
+    service = StatsService(app.config.get('STATS_MAX_STALENESS', 60))
+    app.extensions['stats'] = service
+
+    # Deltas are staged per flush and only applied when the outermost
+    # transaction commits, so rolled back inserts are never counted.
+    # after_soft_rollback names the transaction that was rolled back, so a
+    # savepoint (begin_nested) drops its own deltas and keeps the outer ones
+    if not event.contains(OrmSession, 'before_flush', _collect_deltas):
+        event.listen(OrmSession, 'before_flush', _collect_deltas)
+        event.listen(OrmSession, 'after_commit', _apply_deltas)
+        event.listen(OrmSession, 'after_soft_rollback', _discard_deltas)
+
+    return service
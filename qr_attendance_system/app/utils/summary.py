@@ -0,0 +1,203 @@
+"""
+Per-course attendance summaries
+
+`course_attendance_summary` and `course_session_count` are kept up to date
+inside the same transaction as every attendance mark and session creation,
+so reports read one row per student instead of aggregating the raw
+`attendances` log. `rebuild_summaries` recomputes both tables from scratch
+to repair any drift.
+"""
+
+from sqlalchemy.exc import IntegrityError
+from app.models.models import (
+    db, Attendance, Session, Course, Student, Enrollment,
+    CourseAttendanceSummary, CourseSessionCount
+)
+
+def _attendance_percentage(attended, total):
+    if not total:
+        return 0
+    return round((attended / total) * 100, 1)
+
+def _upsert(update_stmt, insert_stmt):
+    """Run the UPDATE and fall back to INSERT when no row exists yet"""
+    if db.session.execute(update_stmt).rowcount:
+        return
+
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert_stmt)
+    except IntegrityError:
+        # A concurrent request created the row between our UPDATE and INSERT
+        db.session.execute(update_stmt)
+
+def session_count_upsert(course_id):
+    """UPDATE and INSERT statements counting one more session for a course"""
+    table = CourseSessionCount.__table__
+    return (
+        table.update()
+        .where(table.c.course_id == course_id)
+        .values(session_count=table.c.session_count + 1),
+        table.insert().values(course_id=course_id, session_count=1)
+    )
+
+def attendance_summary_upsert(course_id, student_id, marked_at):
+    """UPDATE and INSERT statements counting one more attended session"""
+    table = CourseAttendanceSummary.__table__
+    return (
+        table.update()
+        .where(table.c.course_id == course_id, table.c.student_id == student_id)
+        .values(
+            sessions_attended=table.c.sessions_attended + 1,
+            last_marked_at=db.case(
+                (table.c.last_marked_at > marked_at, table.c.last_marked_at),
+                else_=marked_at
+            )
+        ),
+        table.insert().values(
+            course_id=course_id,
+            student_id=student_id,
+            sessions_attended=1,
+            last_marked_at=marked_at
+        )
+    )
+
+def record_session(course_id):
+    """Count a newly created session towards its course total"""
+    _upsert(*session_count_upsert(course_id))
+
+def record_attendance(course_id, student_id, marked_at):
+    """Count a newly marked attendance towards the student's course total"""
+    _upsert(*attendance_summary_upsert(course_id, student_id, marked_at))
+
+def forget_course(course_id):
+    """Drop summary rows for a deleted course"""
+    CourseAttendanceSummary.query.filter_by(course_id=course_id).delete()
+    CourseSessionCount.query.filter_by(course_id=course_id).delete()
+
+def forget_student(student_id):
+    """Drop summary rows for a deleted student"""
+    CourseAttendanceSummary.query.filter_by(student_id=student_id).delete()
+
+def rebuild_summaries():
+    """Recompute both summary tables from the raw sessions and attendances"""
+    summary = CourseAttendanceSummary.__table__
+    session_count = CourseSessionCount.__table__
+
+    db.session.execute(summary.delete())
+    db.session.execute(session_count.delete())
+
+    db.session.execute(session_count.insert().from_select(
+        ['course_id', 'session_count'],
+        db.select(Session.course_id, db.func.count(Session.id)).group_by(Session.course_id)
+    ))
+    db.session.execute(summary.insert().from_select(
+        ['course_id', 'student_id', 'sessions_attended', 'last_marked_at'],
+        db.select(
+            Session.course_id,
+            Attendance.student_id,
+            db.func.count(Attendance.id),
+            db.func.max(Attendance.marked_at)
+        ).join(Session, Attendance.session_id == Session.id)
+        .group_by(Session.course_id, Attendance.student_id)
+    ))
+    db.session.commit()
+
+    return {
+        'courses': db.session.query(CourseSessionCount).count(),
+        'summaries': db.session.query(CourseAttendanceSummary).count()
+    }
+
+def course_session_total(course_id):
+    count = db.session.get(CourseSessionCount, course_id)
+    return count.session_count if count else 0
+
+def course_report_query(course_id):
+    """Enrolled students of a course with their summary row (if any)"""
+    return db.select(
+        Student.student_id,
+        Student.full_name,
+        CourseAttendanceSummary.sessions_attended,
+        CourseAttendanceSummary.last_marked_at
+    ).join(
+        Enrollment, Enrollment.student_id == Student.id
+    ).outerjoin(
+        CourseAttendanceSummary,
+        db.and_(
+            CourseAttendanceSummary.course_id == Enrollment.course_id,
+            CourseAttendanceSummary.student_id == Enrollment.student_id
+        )
+    ).where(Enrollment.course_id == course_id)
+
+def build_course_report(course_id, total_sessions, rows):
+    students_data = []
+    for student_number, full_name, attended, last_marked_at in rows:
+        attended = attended or 0
+        students_data.append({
+            'student_id': student_number,
+            'student_name': full_name,
+            'classes_attended': attended,
+            'total_classes': total_sessions,
+            'attendance_percentage': _attendance_percentage(attended, total_sessions),
+            'last_marked_at': last_marked_at
+        })
+
+    if students_data:
+        avg_attendance = round(sum(s['attendance_percentage'] for s in students_data) / len(students_data), 1)
+    else:
+        avg_attendance = 0
+
+    return {
+        'course_id': course_id,
+        'total_students': len(students_data),
+        'total_sessions': total_sessions,
+        'average_attendance': avg_attendance,
+        'students': students_data
+    }
+
+def course_report(course_id):
+    """Attendance per enrolled student for one course"""
+    rows = db.session.execute(course_report_query(course_id)).all()
+    return build_course_report(course_id, course_session_total(course_id), rows)
+
+def student_summary_query(student_id):
+    """Enrolled courses of a student with summary and session count rows"""
+    return db.select(
+        Course.id,
+        Course.course_code,
+        Course.course_name,
+        CourseAttendanceSummary.sessions_attended,
+        CourseAttendanceSummary.last_marked_at,
+        CourseSessionCount.session_count
+    ).join(
+        Enrollment, Enrollment.course_id == Course.id
+    ).outerjoin(
+        CourseAttendanceSummary,
+        db.and_(
+            CourseAttendanceSummary.course_id == Enrollment.course_id,
+            CourseAttendanceSummary.student_id == Enrollment.student_id
+        )
+    ).outerjoin(
+        CourseSessionCount, CourseSessionCount.course_id == Course.id
+    ).where(Enrollment.student_id == student_id)
+
+def build_student_summary(rows):
+    courses_data = []
+    for course_id, course_code, course_name, attended, last_marked_at, total in rows:
+        attended = attended or 0
+        total = total or 0
+        courses_data.append({
+            'course_id': course_id,
+            'course_code': course_code,
+            'course_name': course_name,
+            'classes_attended': attended,
+            'total_classes': total,
+            'attendance_percentage': _attendance_percentage(attended, total),
+            'last_marked_at': last_marked_at
+        })
+
+    return courses_data
+
+def student_summary(student_id):
+    """Attendance per enrolled course for one student"""
+    return build_student_summary(db.session.execute(student_summary_query(student_id)).all())
@@ -0,0 +1,208 @@
+"""
+Per-request stage tracing
+
+Views decorated with `@traced(name)` record a trace: one span for the whole
+request and one per `with span(stage):` block run while it is active. The
+mark path uses it for JWT verification, the session, student and enrollment
+lookups, the duplicate check, the insert and commit, and serialization.
+
+A trace is written when it is sampled (TRACE_SAMPLE_RATE, 0-1), or when the
+request took at least TRACE_SLOW_MS, so tail-latency outliers are always
+kept. Traces are appended to TRACE_FILE in the Chrome trace event format,
+which chrome://tracing, Perfetto and speedscope open directly. The file
+rotates at TRACE_MAX_BYTES, keeping TRACE_BACKUP_COUNT old files. A `{pid}`
+in the path gives every worker process its own file.
+
+With neither setting, `traced` calls the view directly and `span` returns a
+shared no-op context manager.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from functools import wraps
+from flask import g, has_app_context, request
+
+class _Span:
+    __slots__ = ('trace', 'name', 'start')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.spans.append((self.name, self.start, time.perf_counter(), exc_type.__name__ if exc_type else None))
+        return False
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class Trace:
+    """Spans recorded for one request"""
+    def __init__(self, name):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex
+        self.spans = []
+        self.start = time.perf_counter()
+
+class TraceWriter:
+    """Appends trace events to a size-rotated JSON file"""
+    def __init__(self, path, max_bytes, backup_count):
+        self.path_template = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        # Resolved on every write: gunicorn forks workers after configuration
+        return self.path_template.format(pid=os.getpid())
+
+    def _rotate(self, path):
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f'{path}.{index}'
+            if os.path.exists(source):
+                os.replace(source, f'{path}.{index + 1}')
+        if self.backup_count > 0:
+            os.replace(path, f'{path}.1')
+        else:
+            os.remove(path)
+
+    def write(self, events):
+        # The JSON array format allows the closing bracket to be left out, so
+        # every file stays loadable while it is being appended to
+        lines = ''.join(json.dumps(event, separators=(',', ':')) + ',\n' for event in events)
+        path = self.path
+        with self._lock:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) >= self.max_bytes:
+                self._rotate(path)
+            with open(path, 'a', encoding='utf-8') as handle:
+                if handle.tell() == 0:
+                    handle.write('[\n')
+                handle.write(lines)
+
+class Tracer:
+    """Sampling decision and export for traced views"""
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.slow_seconds = None
+        self.writer = None
+        # perf_counter has no fixed epoch; anchor it to wall time once
+        self._epoch = time.time() - time.perf_counter()
+
+    def configure(self, sample_rate, slow_ms, path, max_bytes, backup_count):
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_ms / 1000 if slow_ms else None
+        self.writer = TraceWriter(path, max_bytes, backup_count)
+        self.enabled = sample_rate > 0 or self.slow_seconds is not None
+
+    def _microseconds(self, perf_time):
+        return int((self._epoch + perf_time) * 1_000_000)
+
+    def export(self, trace, end, status):
+        """Write the trace if it was sampled or slow"""
+        duration = end - trace.start
+        sampled = random.random() < self.sample_rate
+        slow = self.slow_seconds is not None and duration >= self.slow_seconds
+        if not (sampled or slow):
+            return False
+
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [{
+            'name': trace.name,
+            'cat': 'request',
+            'ph': 'X',
+            'ts': self._microseconds(trace.start),
+            'dur': int(duration * 1_000_000),
+            'pid': pid,
+            'tid': tid,
+            'args': {
+                'trace_id': trace.trace_id,
+                'method': request.method,
+                'path': request.path,
+                'status': status,
+                'sampled': sampled,
+                'slow': slow
+            }
+        }]
+        for name, start, stop, error in trace.spans:
+            event = {
+                'name': name,
+                'cat': 'stage',
+                'ph': 'X',
+                'ts': self._microseconds(start),
+                'dur': int((stop - start) * 1_000_000),
+                'pid': pid,
+                'tid': tid,
+                'args': {'trace_id': trace.trace_id}
+            }
+            if error:
+                event['args']['error'] = error
+            events.append(event)
+
+        self.writer.write(events)
+        return True
+
+tracer = Tracer()
+
+def span(name):
+    """Time a stage of the active trace (a no-op outside a sampled view)"""
+    trace = g.get('_trace') if has_app_context() else None
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, name)
+
+def traced(name):
+    """Decorator that records a trace of the view when tracing is enabled"""
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            if tracer.enabled:
+                # Exported once the final response exists, so a 401 or 422
+                # built by an error handler is recorded as such
+                g._trace = Trace(name)
+            return fn(*args, **kwargs)
+        return decorator
+    return wrapper
+
+def _export_trace(response):
+    trace = g.pop('_trace', None)
+    if trace is not None:
+        tracer.export(trace, time.perf_counter(), response.status_code)
+    return response
+
+def _export_unfinished_trace(exc):
+    # Only left when no response was made, e.g. an after_request hook failed
+    trace = g.pop('_trace', None)
+    if trace is not None:
+        tracer.export(trace, time.perf_counter(), 500)
+
+def init_tracing(app):
+    """Configure the tracer from the app config; return whether tracing is on"""
+    app.after_request(_export_trace)
+    app.teardown_request(_export_unfinished_trace)
+    tracer.configure(
+        app.config.get('TRACE_SAMPLE_RATE', 0.0),
+        app.config.get('TRACE_SLOW_MS', 0),
+        app.config.get('TRACE_FILE', 'traces/trace-{pid}.json'),
+        app.config.get('TRACE_MAX_BYTES', 10 * 1024 * 1024),
+        app.config.get('TRACE_BACKUP_COUNT', 5)
+    )
+    return tracer.enabled
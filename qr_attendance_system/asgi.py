@@ -0,0 +1,6 @@
+from app.asgi import create_asgi_app
+
+app = create_asgi_app()
+
+if __name__ == '__main__':
+    app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,192 @@
+"""
+Shared helpers for the benchmark scripts
+
+Benchmarks run from the qr_attendance_system directory, e.g.
+``python -m benchmarks.asgi_vs_wsgi``. Each one seeds its own SQLite file so
+it never touches the development database.
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def seed_database(db_path, students=500, password='benchmark'):
+    """
+    Create a database with one faculty, one course, `students` enrolled
+    students and one open attendance session.
+
+    Returns the QR token of the session and an access token per student.
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.models.models import db, hash_password, User, Student, Faculty, Course, Enrollment, Session
+    from app.utils.summary import rebuild_summaries
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+
+        # One hash shared by every account keeps seeding fast
+        password_hash = hash_password(password)
+
+        faculty_user = User(username='bench_faculty', email='bench_faculty@example.com', password_hash=password_hash, role='faculty')
+        db.session.add(faculty_user)
+        db.session.flush()
+        faculty = Faculty(user_id=faculty_user.id, faculty_id='BF1', full_name='Benchmark Faculty')
+        db.session.add(faculty)
+        db.session.flush()
+        course = Course(course_code='BENCH101', course_name='Benchmarking', faculty_id=faculty.id)
+        db.session.add(course)
+        db.session.flush()
+
+        users = [
+            User(username=f'bench_{i}', email=f'bench_{i}@example.com', password_hash=password_hash, role='student')
+            for i in range(students)
+        ]
+        db.session.add_all(users)
+        db.session.flush()
+        profiles = [
+            Student(user_id=user.id, student_id=f'B{i:06d}', full_name=f'Student {i}')
+            for i, user in enumerate(users)
+        ]
+        db.session.add_all(profiles)
+        db.session.flush()
+        db.session.add_all([Enrollment(student_id=p.id, course_id=course.id) for p in profiles])
+
+        qr_token = 'bench-session-token'
+        db.session.add(Session(
+            course_id=course.id,
+            faculty_id=faculty_user.id,
+            qr_code_token=qr_token,
+            qr_expiration=datetime.utcnow() + timedelta(days=1)
+        ))
+        db.session.commit()
+        rebuild_summaries()
+
+        tokens = [
+            create_access_token(identity=user.id, additional_claims={'role': 'student', 'user_id': user.id})
+            for user in users
+        ]
+
+        # Closing every connection checkpoints the WAL into the main file,
+        # so the database can be copied as a single file
+        db.session.remove()
+        db.engine.dispose()
+
+    return qr_token, tokens
+
+def start_server(args, port, env=None, timeout=30):
+    """Start a server subprocess and wait until it accepts connections"""
+    process = subprocess.Popen(
+        args,
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server exited with code {process.returncode}: {" ".join(args)}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.2)
+
+    stop_server(process)
+    raise RuntimeError(f'Server did not start within {timeout}s: {" ".join(args)}')
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def run_load(base_url, requests, concurrency):
+    """
+    Send `requests` (a list of (method, path, headers, json) tuples) with at
+    most `concurrency` in flight; return the timing summary
+    """
+    import httpx
+
+    queue = asyncio.Queue()
+    for item in requests:
+        queue.put_nowait(item)
+
+    latencies = []
+    errors = 0
+
+    async def worker(client):
+        nonlocal errors
+        while True:
+            try:
+                method, path, headers, body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, headers=headers, json=body)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[worker(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+
+    return summarize(latencies, elapsed, errors)
+
+def summarize(latencies, elapsed, errors=0):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'elapsed': elapsed,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000
+    }
+
+def print_table(title, rows):
+    """Print {label: summary} as an aligned table"""
+    print(f'\n{title}')
+    print(f'{"":<24}{"requests":>10}{"errors":>8}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+    for label, result in rows.items():
+        print(
+            f'{label:<24}{result["requests"]:>10}{result["errors"]:>8}{result["rps"]:>10.1f}'
+            f'{result["p50_ms"]:>10.1f}{result["p95_ms"]:>10.1f}{result["p99_ms"]:>10.1f}'
+        )
+
+def python_module(*args):
+    """Command line running `python -m <args>` with the current interpreter"""
+    return [sys.executable, '-m', *args]
@@ -0,0 +1,86 @@
+"""
+Side-by-side benchmark of the Flask (WSGI) and Quart (ASGI) API servers
+
+Seeds a SQLite database with enrolled students and an open session, then for
+each server:
+
+* mark:    every student marks attendance once (the class-start burst)
+* profile: students repeatedly fetch their profile (read-only traffic)
+
+Usage (from qr_attendance_system/):
+
+    python -m benchmarks.asgi_vs_wsgi --students 1000 --concurrency 200
+
+Both servers run as a single process so the numbers compare the serving
+models, not the worker count. Requires httpx and uvicorn.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+from benchmarks._common import free_port, seed_database, start_server, stop_server, run_load, print_table, python_module
+
+SERVERS = {
+    'flask (run.py)': lambda port: python_module('flask', '--app', 'run', 'run', '--port', str(port), '--no-reload', '--no-debugger'),
+    'quart (asgi.py)': lambda port: python_module('uvicorn', 'asgi:app', '--port', str(port), '--log-level', 'warning')
+}
+
+def build_requests(qr_token, tokens, profile_rounds):
+    marks = [
+        ('POST', '/api/attendance/student/attendance/mark', {'Authorization': f'Bearer {token}'}, {'qr_token': qr_token})
+        for token in tokens
+    ]
+    profiles = [
+        ('GET', '/api/auth/profile', {'Authorization': f'Bearer {token}'}, None)
+        for _ in range(profile_rounds)
+        for token in tokens
+    ]
+    return marks, profiles
+
+def benchmark_server(name, db_path, qr_token, tokens, args):
+    port = free_port()
+    process = start_server(SERVERS[name](port), port, env={'DATABASE_URL': f'sqlite:///{db_path}'})
+    try:
+        marks, profiles = build_requests(qr_token, tokens, args.profile_rounds)
+        base_url = f'http://127.0.0.1:{port}'
+        return {
+            'mark': asyncio.run(run_load(base_url, marks, args.concurrency)),
+            'profile': asyncio.run(run_load(base_url, profiles, args.concurrency))
+        }
+    finally:
+        stop_server(process)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--students', type=int, default=500, help='Students marking attendance (one mark each).')
+    parser.add_argument('--concurrency', type=int, default=100, help='Requests in flight at once.')
+    parser.add_argument('--profile-rounds', type=int, default=2, help='Profile fetches per student.')
+    parser.add_argument('--servers', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='qr-bench-')
+    try:
+        seed_path = os.path.join(workdir, 'seed.db')
+        print(f'Seeding {args.students} students...')
+        qr_token, tokens = seed_database(seed_path, students=args.students)
+
+        results = {}
+        for index, name in enumerate(args.servers):
+            # Every server starts from an identical copy of the seeded data
+            db_path = os.path.join(workdir, f'server{index}.db')
+            shutil.copy(seed_path, db_path)
+            print(f'Benchmarking {name}...')
+            results[name] = benchmark_server(name, db_path, qr_token, tokens, args)
+
+        for scenario in ('mark', 'profile'):
+            print_table(
+                f'{scenario} (concurrency {args.concurrency})',
+                {name: result[scenario] for name, result in results.items()}
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
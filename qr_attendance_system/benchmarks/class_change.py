@@ -0,0 +1,416 @@
+"""
+Load test reproducing a campus-wide class change
+
+At the start of a period every faculty member opens a session at the same
+moment and their students scan the QR code within the next few minutes.
+This harness reproduces that spike:
+
+1. seed ``--students`` students spread over ``--courses`` courses, each
+   course with its own faculty member and a stale session left over from
+   the previous period
+2. every faculty member opens a session simultaneously
+3. each student scans their course's code on the chosen arrival curve;
+   some tap twice (``--duplicate-rate``), scan the neighbouring class's
+   code (``--stray-rate``) or scan last period's code (``--late-rate``)
+
+Usage (from qr_attendance_system/):
+
+    python -m benchmarks.class_change --target api --students 2000 --courses 40
+    python -m benchmarks.class_change --target simple --mode http --curve spike --duration 30
+
+``--mode inprocess`` drives the app through Flask's test client on a thread
+pool; ``--mode http`` starts a local ``flask run`` server and sends real
+requests with httpx. Latency is measured from each scan's scheduled arrival
+time, so queueing under overload shows up in the percentiles.
+
+The web demo (``--target simple``) enrolls students on their first scan, so
+stray scans are accepted there instead of failing as not enrolled.
+"""
+
+import argparse
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from benchmarks._common import free_port, start_server, stop_server, summarize, print_table, python_module
+
+PATHS = {
+    'api': {
+        'session': '/api/attendance/faculty/session/create',
+        'mark': '/api/attendance/student/attendance/mark'
+    },
+    'simple': {
+        'session': '/faculty/session/create',
+        'mark': '/student/attendance/mark'
+    }
+}
+
+CURVES = ('burst', 'uniform', 'ramp', 'spike', 'poisson')
+
+PASSWORD = 'loadtest'
+
+def course_code(index):
+    return f'LT{index:04d}'
+
+def stale_token(index):
+    """QR token of the expired session from the previous period"""
+    return f'stale-{course_code(index)}'
+
+def classify(status, body):
+    """Outcome of a mark request from its status code and message"""
+    if status == 201:
+        return 'marked'
+    msg = ((body or {}).get('msg') or '').lower()
+    if 'already marked' in msg:
+        return 'duplicate'
+    if 'not enrolled' in msg:
+        return 'not_enrolled'
+    if 'expired' in msg:
+        return 'expired'
+    if 'invalid qr' in msg:
+        return 'invalid'
+    return f'http_{status}'
+
+def arrival_times(curve, count, duration, rng):
+    """Offsets in seconds at which `count` scans arrive within `duration`"""
+    if curve == 'burst' or duration <= 0:
+        return [0.0] * count
+    if curve == 'uniform':
+        return [duration * i / count for i in range(count)]
+    if curve == 'ramp':
+        # The arrival rate grows linearly from zero
+        return [duration * math.sqrt(i / count) for i in range(count)]
+    if curve == 'spike':
+        # Most students arrive around the middle of the window
+        return sorted(min(max(rng.gauss(duration / 2, duration / 6), 0.0), duration) for _ in range(count))
+    if curve == 'poisson':
+        offsets, t = [], 0.0
+        for _ in range(count):
+            t += rng.expovariate(count / duration)
+            offsets.append(min(t, duration))
+        return offsets
+    raise ValueError(f'Unknown arrival curve {curve!r}')
+
+# Clients
+
+class InProcessClient:
+    """Flask test client without a cookie jar, shared by every thread"""
+    def __init__(self, app):
+        self.client = app.test_client(use_cookies=False)
+
+    def request(self, method, path, headers=None, json=None):
+        response = self.client.open(path, method=method, headers=headers, json=json)
+        return response.status_code, response.get_json(silent=True), response.headers
+
+    def close(self):
+        pass
+
+class HttpClient:
+    """Pooled httpx client against a running server"""
+    def __init__(self, base_url, connections):
+        import httpx
+
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        self.client = httpx.Client(base_url=base_url, limits=limits, timeout=60)
+
+    def request(self, method, path, headers=None, json=None):
+        response = self.client.request(method, path, headers=headers, json=json)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body, response.headers
+
+    def close(self):
+        self.client.close()
+
+# Campus seeding
+
+class Campus:
+    """Who takes part in the load test and how they authenticate"""
+    def __init__(self, course_ids, faculty_headers, student_headers):
+        self.course_ids = course_ids
+        self.faculty_headers = faculty_headers
+        self.student_headers = student_headers  # student i attends course i % len(course_ids)
+
+def seed_api(db_path, students, courses):
+    """Seed a SQLite database for create_app(); return the app and the campus"""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.models.models import db, hash_password, User, Student, Faculty, Course, Enrollment, Session
+    from app.utils.summary import rebuild_summaries
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+
+        # One hash shared by every account keeps seeding fast
+        password_hash = hash_password(PASSWORD)
+
+        faculty_users = [
+            User(username=f'lt_faculty_{c}', email=f'lt_faculty_{c}@example.com', password_hash=password_hash, role='faculty')
+            for c in range(courses)
+        ]
+        db.session.add_all(faculty_users)
+        db.session.flush()
+        faculties = [
+            Faculty(user_id=user.id, faculty_id=f'LF{c:04d}', full_name=f'Faculty {c}')
+            for c, user in enumerate(faculty_users)
+        ]
+        db.session.add_all(faculties)
+        db.session.flush()
+        course_rows = [
+            Course(course_code=course_code(c), course_name=f'Course {c}', faculty_id=faculty.id)
+            for c, faculty in enumerate(faculties)
+        ]
+        db.session.add_all(course_rows)
+        db.session.flush()
+
+        student_users = [
+            User(username=f'lt_student_{i}', email=f'lt_student_{i}@example.com', password_hash=password_hash, role='student')
+            for i in range(students)
+        ]
+        db.session.add_all(student_users)
+        db.session.flush()
+        profiles = [
+            Student(user_id=user.id, student_id=f'L{i:06d}', full_name=f'Student {i}')
+            for i, user in enumerate(student_users)
+        ]
+        db.session.add_all(profiles)
+        db.session.flush()
+        db.session.add_all([
+            Enrollment(student_id=profile.id, course_id=course_rows[i % courses].id)
+            for i, profile in enumerate(profiles)
+        ])
+
+        # Last period's sessions, whose codes have expired
+        db.session.add_all([
+            Session(
+                course_id=course.id,
+                faculty_id=faculty_users[c].id,
+                qr_code_token=stale_token(c),
+                qr_expiration=datetime.utcnow() - timedelta(hours=1)
+            )
+            for c, course in enumerate(course_rows)
+        ])
+        db.session.commit()
+        rebuild_summaries()
+
+        def bearer(user, role):
+            token = create_access_token(identity=user.id, additional_claims={'role': role, 'user_id': user.id})
+            return {'Authorization': f'Bearer {token}'}
+
+        campus = Campus(
+            [course.id for course in course_rows],
+            [bearer(user, 'faculty') for user in faculty_users],
+            [bearer(user, 'student') for user in student_users]
+        )
+        db.session.remove()
+
+    return app, campus
+
+def seed_simple(repository, students, courses):
+    """Seed the web demo's in-memory repository (demo passwords are stored as given)"""
+    course_ids = []
+    for c in range(courses):
+        user = repository.create_user(f'lt_faculty_{c}', f'lt_faculty_{c}@example.com', PASSWORD, 'faculty')
+        faculty = repository.create_faculty(user['id'], f'LF{c:04d}', f'Faculty {c}')
+        course = repository.create_course(course_code(c), f'Course {c}', faculty_id=faculty['id'])
+        repository.create_session(course['id'], user['id'], stale_token(c), datetime.now() - timedelta(hours=1))
+        course_ids.append(course['id'])
+
+    for i in range(students):
+        user = repository.create_user(f'lt_student_{i}', f'lt_student_{i}@example.com', PASSWORD, 'student')
+        student = repository.create_student(user['id'], f'L{i:06d}', f'Student {i}')
+        repository.enroll(student['id'], course_ids[i % courses])
+
+def simple_campus_app(students, courses):
+    """The web demo seeded with the load test campus (served by --mode http)"""
+    import simple_app
+
+    seed_simple(simple_app.repository, students, courses)
+    return simple_app.app
+
+def login_simple(client, students, courses, concurrency):
+    """Log every seeded account in to the web demo and collect the session cookies"""
+    def login(username):
+        status, body, headers = client.request('POST', '/login', json={'username': username, 'password': PASSWORD})
+        if status != 200:
+            raise RuntimeError(f'Login of {username} failed with {status}: {body}')
+        return {'Cookie': headers.get('Set-Cookie').split(';', 1)[0]}
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        faculty_headers = list(pool.map(login, [f'lt_faculty_{c}' for c in range(courses)]))
+        student_headers = list(pool.map(login, [f'lt_student_{i}' for i in range(students)]))
+
+    course_ids = []
+    for headers in faculty_headers:
+        status, body, _ = client.request('GET', '/faculty/courses', headers=headers)
+        course_ids.append(body['courses'][0]['id'])
+
+    return Campus(course_ids, faculty_headers, student_headers)
+
+# The class change
+
+def open_sessions(client, target, campus, app, concurrency):
+    """Every faculty member opens a session at once; return the QR tokens and timings"""
+    path = PATHS[target]['session']
+
+    def open_session(course_index):
+        start = time.perf_counter()
+        status, body, _ = client.request(
+            'POST', path,
+            headers=campus.faculty_headers[course_index],
+            json={'course_id': campus.course_ids[course_index]}
+        )
+        latency = time.perf_counter() - start
+        if status != 201:
+            return None, latency
+        if target == 'simple':
+            return body['qr_code_token'], latency
+
+        # Students decode the token from the QR image; read it from the
+        # database instead of decoding the PNG
+        from app.repositories import get_repository
+        with app.app_context():
+            return get_repository().get_session(body['session_id'])['qr_code_token'], latency
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(min(concurrency, len(campus.course_ids))) as pool:
+        opened = list(pool.map(open_session, range(len(campus.course_ids))))
+    elapsed = time.perf_counter() - start
+
+    failures = sum(1 for token, _ in opened if token is None)
+    if failures == len(opened):
+        raise RuntimeError('No session could be opened')
+    return [token for token, _ in opened], summarize([latency for _, latency in opened], elapsed, failures)
+
+def plan_scans(campus, tokens, args, rng):
+    """(headers, qr_token) for every scan, in arrival order"""
+    courses = len(campus.course_ids)
+    scans = []
+    for i, headers in enumerate(campus.student_headers):
+        course = i % courses
+        scans.append((headers, tokens[course]))
+        if rng.random() < args.duplicate_rate:
+            scans.append((headers, tokens[course]))
+        if courses > 1 and rng.random() < args.stray_rate:
+            scans.append((headers, tokens[(course + 1) % courses]))
+        if rng.random() < args.late_rate:
+            scans.append((headers, stale_token(course)))
+
+    # Sessions that failed to open have no code to scan
+    scans = [(headers, token) for headers, token in scans if token]
+    rng.shuffle(scans)
+    return scans
+
+def fire_scans(client, path, scans, offsets, concurrency):
+    """Send each scan at its arrival offset; return [(outcome, latency)] and the elapsed time"""
+    results = []
+
+    def scan(headers, token, scheduled):
+        try:
+            status, body, _ = client.request('POST', path, headers=headers, json={'qr_token': token})
+            outcome = classify(status, body)
+        except Exception as e:
+            outcome = f'transport_{type(e).__name__}'
+        results.append((outcome, time.perf_counter() - scheduled))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for (headers, token), offset in zip(scans, offsets):
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(scan, headers, token, scheduled)
+    return results, time.perf_counter() - start
+
+def report(target, args, session_summary, results, elapsed):
+    outcomes = Counter(outcome for outcome, _ in results)
+    rows = {
+        'open sessions': session_summary,
+        'all scans': summarize([latency for _, latency in results], elapsed, len(results) - outcomes['marked'])
+    }
+    for outcome in sorted(outcomes):
+        latencies = [latency for result, latency in results if result == outcome]
+        rows[f'  {outcome}'] = summarize(latencies, elapsed, 0 if outcome == 'marked' else len(latencies))
+
+    print_table(
+        f'{target} ({args.mode}): {args.students} students, {args.courses} courses, '
+        f'{args.curve} arrivals over {args.duration:g}s, {args.concurrency} threads',
+        rows
+    )
+    print('\nOutcomes: ' + ', '.join(f'{outcome} {count}' for outcome, count in outcomes.most_common()))
+
+def run(args):
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='qr-loadtest-')
+    process = None
+    client = None
+    try:
+        app = None
+        print(f'Seeding {args.students} students in {args.courses} courses...')
+        if args.target == 'api':
+            app, campus = seed_api(os.path.join(workdir, 'loadtest.db'), args.students, args.courses)
+        elif args.mode == 'inprocess':
+            app = simple_campus_app(args.students, args.courses)
+
+        if args.mode == 'inprocess':
+            client = InProcessClient(app)
+        else:
+            port = free_port()
+            app_spec = 'run' if args.target == 'api' else f'benchmarks.class_change:simple_campus_app({args.students}, {args.courses})'
+            # seed_api() exported DATABASE_URL, so the API server opens the seeded file
+            process = start_server(
+                python_module('flask', '--app', app_spec, 'run', '--port', str(port), '--no-reload', '--no-debugger'),
+                port,
+                timeout=120
+            )
+            client = HttpClient(f'http://127.0.0.1:{port}', args.concurrency)
+
+        if args.target == 'simple':
+            campus = login_simple(client, args.students, args.courses, args.concurrency)
+
+        print(f'Opening {args.courses} sessions at once...')
+        tokens, session_summary = open_sessions(client, args.target, campus, app, args.concurrency)
+
+        scans = plan_scans(campus, tokens, args, rng)
+        offsets = arrival_times(args.curve, len(scans), args.duration, rng)
+        print(f'Firing {len(scans)} scans...')
+        results, elapsed = fire_scans(client, PATHS[args.target]['mark'], scans, offsets, args.concurrency)
+
+        report(args.target, args, session_summary, results, elapsed)
+    finally:
+        if client:
+            client.close()
+        if process:
+            stop_server(process)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate the attendance spike of a campus-wide class change')
+    parser.add_argument('--target', choices=list(PATHS), default='api', help='create_app() API or the simple_app demo.')
+    parser.add_argument('--mode', choices=['inprocess', 'http'], default='inprocess')
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--courses', type=int, default=20)
+    parser.add_argument('--curve', choices=CURVES, default='spike', help='Arrival curve of the scans.')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds over which the scans arrive.')
+    parser.add_argument('--concurrency', type=int, default=32, help='Requests in flight at once.')
+    parser.add_argument('--duplicate-rate', type=float, default=0.05, help='Fraction of students who scan twice.')
+    parser.add_argument('--stray-rate', type=float, default=0.02, help="Fraction who also scan another class's code.")
+    parser.add_argument('--late-rate', type=float, default=0.02, help="Fraction who also scan last period's expired code.")
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for arrivals and the scan mix.')
+    run(parser.parse_args())
+
+if __name__ == '__main__':
+    main()
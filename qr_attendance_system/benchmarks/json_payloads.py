@@ -0,0 +1,166 @@
+"""
+JSON serialization of large list responses by provider
+
+Seeds the API and the web demo with `--items` users and as many attendance
+records for one student, then times the admin user list and the attendance
+history under each JSON provider:
+
+    python -m benchmarks.json_payloads --items 10000
+
+Providers: Flask's default, FastJSONProvider on the standard library, and
+FastJSONProvider on orjson (when installed). With the fast providers, lists
+of at least JSON_STREAM_THRESHOLD items are streamed. The `serialize` rows
+time encoding the same payloads without a request, so the encoding cost
+can be told apart from the query cost of the endpoints.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from flask.json.provider import DefaultJSONProvider
+from app.utils.json_provider import FastJSONProvider, orjson
+from benchmarks._common import seed_database
+
+PROVIDERS = {
+    'flask-default': lambda app: DefaultJSONProvider(app),
+    'fast-stdlib': lambda app: FastJSONProvider(app, use_orjson=False),
+    'fast-orjson': lambda app: FastJSONProvider(app, use_orjson=True)
+}
+
+def available_providers():
+    return [name for name in PROVIDERS if name != 'fast-orjson' or orjson is not None]
+
+def time_get(client, path, headers, repeats):
+    """Median milliseconds and body size of GET path, reading the whole body"""
+    times = []
+    size = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        body = response.get_data()
+        times.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, (path, response.status_code, body[:200])
+        size = len(body)
+    return statistics.median(times), size
+
+def time_serialize(app, payload, repeats):
+    times = []
+    with app.app_context():
+        for _ in range(repeats):
+            start = time.perf_counter()
+            app.json.response(payload).get_data()
+            times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def seed_api(workdir, items):
+    """API app with `items` students and `items` attendances for the first one"""
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.models.models import db, User, Student, Course, Session, Attendance
+    from app.repositories import get_repository
+
+    seed_database(os.path.join(workdir, 'json.db'), students=items)
+    app = create_app()
+    with app.app_context():
+        admin = User(username='json_admin', email='json_admin@example.com', password_hash='-', role='admin')
+        db.session.add(admin)
+        db.session.flush()
+
+        student = Student.query.filter_by(student_id='B000000').one()
+        course = Course.query.filter_by(course_code='BENCH101').one()
+        start = datetime.utcnow() - timedelta(days=items)
+        sessions = [
+            Session(course_id=course.id, faculty_id=admin.id, qr_code_token=f'json-{i}', session_date=start + timedelta(hours=i), qr_expiration=start + timedelta(hours=i, minutes=3))
+            for i in range(items)
+        ]
+        db.session.add_all(sessions)
+        db.session.flush()
+        db.session.add_all([Attendance(session_id=s.id, student_id=student.id, marked_at=s.session_date) for s in sessions])
+        db.session.commit()
+
+        # The records the endpoints serialize, datetimes included
+        repository = get_repository()
+        payloads = {
+            'admin users': {'users': repository.list_users()},
+            'history': {'attendance_history': repository.student_history(student.id)}
+        }
+
+        admin_token = create_access_token(identity=admin.id, additional_claims={'role': 'admin', 'user_id': admin.id})
+        student_token = create_access_token(identity=student.user_id, additional_claims={'role': 'student', 'user_id': student.user_id})
+
+    paths = {
+        'admin users': ('/api/admin/admin/users', {'Authorization': f'Bearer {admin_token}'}),
+        'history': ('/api/attendance/student/attendance/history', {'Authorization': f'Bearer {student_token}'})
+    }
+    return app, paths, payloads
+
+def seed_simple(items):
+    """simple_app with `items` students and `items` attendances for the first one"""
+    from simple_app import app, repository
+
+    admin = repository.create_user('json_admin', 'json_admin@example.com', 'pw', 'admin')
+    students = []
+    for i in range(items):
+        user = repository.create_user(f'json_{i}', f'json_{i}@example.com', 'pw', 'student')
+        students.append(repository.create_student(user['id'], f'J{i:06d}', f'Student {i}'))
+    faculty_user = repository.create_user('json_faculty', 'json_faculty@example.com', 'pw', 'faculty')
+    faculty = repository.create_faculty(faculty_user['id'], 'JF1', 'Faculty')
+    course = repository.create_course('JSON101', 'Payloads', None, None, faculty['id'])
+
+    start = datetime.now() - timedelta(days=items)
+    for i in range(items):
+        session = repository.create_session(course['id'], faculty_user['id'], f'json-{i}', start + timedelta(hours=i, minutes=3))
+        repository.mark_attendance(session, students[0]['id'], start + timedelta(hours=i))
+
+    def login(username):
+        client = app.test_client()
+        client.post('/login', json={'username': username, 'password': 'pw'})
+        return client
+
+    payloads = {
+        'admin users': {'users': repository.list_users()},
+        'history': {'attendance_history': repository.student_history(students[0]['id'])}
+    }
+    clients = {'admin users': login('json_admin'), 'history': login('json_0')}
+    paths = {'admin users': ('/admin/users', {}), 'history': ('/student/attendance/history', {})}
+    return app, paths, payloads, clients
+
+def main():
+    parser = argparse.ArgumentParser(description='Large JSON list responses by provider')
+    parser.add_argument('--items', type=int, default=10000, help='Users and history records to seed.')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--target', choices=['api', 'simple', 'both'], default='both')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='qr-json-')
+    rows = []
+    try:
+        targets = []
+        if args.target in ('api', 'both'):
+            app, paths, payloads = seed_api(workdir, args.items)
+            client = app.test_client()
+            targets.append(('api', app, paths, payloads, {name: client for name in paths}))
+        if args.target in ('simple', 'both'):
+            app, paths, payloads, clients = seed_simple(args.items)
+            targets.append(('simple', app, paths, payloads, clients))
+
+        for target, app, paths, payloads, clients in targets:
+            for provider in available_providers():
+                app.json = PROVIDERS[provider](app)
+                for name, (path, headers) in paths.items():
+                    median, size = time_get(clients[name], path, headers, args.repeats)
+                    rows.append((target, name, provider, median, size))
+                    rows.append((target, f'{name} (serialize)', provider, time_serialize(app, payloads[name], args.repeats), None))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f'\n{"target":<8}{"payload":<26}{"provider":<15}{"median ms":>11}{"bytes":>12}')
+    for target, name, provider, median, size in rows:
+        print(f'{target:<8}{name:<26}{provider:<15}{median:>11.1f}{size if size is not None else "":>12}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,410 @@
+"""
+Microbenchmarks for the hot paths, with regression tracking
+
+Each benchmark times one operation with ``timeit`` (loop count calibrated to
+about 0.2 s per repeat) and records the per-operation median, minimum and
+standard deviation. Results are saved as ``benchmarks/results/<commit>.json``
+so two commits can be compared:
+
+    python -m benchmarks.micro run                      # everything
+    python -m benchmarks.micro run --filter memory.     # a subset
+    python -m benchmarks.micro compare 1a2b3c4          # that commit vs HEAD
+    python -m benchmarks.micro compare 1a2b3c4 5d6e7f8 --threshold 0.05
+    python -m benchmarks.micro list
+
+``compare`` exits with status 1 when any benchmark's median got slower by
+more than the threshold (10% by default), so it can gate CI. Run both sides
+on the same machine; timings are not comparable across hosts.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from benchmarks._common import ROOT, seed_database
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+PASSWORD = 'benchmark'
+
+# Each benchmark is a context manager factory that yields the operation to
+# time and cleans up after it
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+# In-memory repository
+
+_memory_repositories = {}
+
+def memory_repository(size):
+    """MemoryRepository with `size` students in one course, built once per size"""
+    if size not in _memory_repositories:
+        from app.repositories.memory import MemoryRepository
+
+        repository = MemoryRepository()
+        faculty_user = repository.create_user('bench_faculty', 'bench_faculty@example.com', PASSWORD, 'faculty')
+        faculty = repository.create_faculty(faculty_user['id'], 'BF1', 'Benchmark Faculty')
+        course = repository.create_course('BENCH101', 'Benchmarking', faculty_id=faculty['id'])
+
+        for i in range(size):
+            user = repository.create_user(f'bench_{i}', f'bench_{i}@example.com', PASSWORD, 'student')
+            student = repository.create_student(user['id'], f'B{i:06d}', f'Student {i}')
+            repository.enroll(student['id'], course['id'])
+
+        # Ten past sessions, each attended by every other student
+        students = list(repository.students.values())
+        for n in range(10):
+            session = repository.create_session(course['id'], faculty_user['id'], f'bench-token-{n}', datetime.now() + timedelta(days=1))
+            repository.mark_attendance_batch([(session, student['id'], datetime.now()) for student in students[n % 2::2]])
+
+        _memory_repositories[size] = (repository, course)
+    return _memory_repositories[size]
+
+def _lookup(size, method, keys):
+    @contextmanager
+    def setup():
+        repository, _ = memory_repository(size)
+        sample = keys(repository)
+        random.Random(size).shuffle(sample)
+        cycle = itertools.cycle(sample[:1000])
+        lookup = getattr(repository, method)
+        yield lambda: lookup(next(cycle))
+    return setup
+
+def _course_report(size):
+    @contextmanager
+    def setup():
+        repository, course = memory_repository(size)
+        yield lambda: repository.course_report(course['id'])
+    return setup
+
+def _enrolled_lookup(size):
+    @contextmanager
+    def setup():
+        repository, course = memory_repository(size)
+        student_ids = list(repository.students)[:1000]
+        cycle = itertools.cycle(student_ids)
+        yield lambda: repository.is_enrolled(next(cycle), course['id'])
+    return setup
+
+def register_memory_benchmarks(sizes):
+    """Add the lookup and report benchmarks for each repository size"""
+    lookups = {
+        'get_user_by_username': lambda repository: [user['username'] for user in repository.users.values()],
+        'get_student_by_user_id': lambda repository: [student['user_id'] for student in repository.students.values()],
+        'get_session_by_token': lambda repository: [session['qr_code_token'] for session in repository.sessions.values()]
+    }
+    for size in sizes:
+        for method, keys in lookups.items():
+            BENCHMARKS[f'memory.{method}[{size}]'] = _lookup(size, method, keys)
+        BENCHMARKS[f'memory.is_enrolled[{size}]'] = _enrolled_lookup(size)
+        BENCHMARKS[f'memory.course_report[{size}]'] = _course_report(size)
+
+@benchmark('memory.mark_attendance')
+@contextmanager
+def memory_mark_attendance():
+    from app.repositories.memory import MemoryRepository
+
+    repository = MemoryRepository()
+    course = repository.create_course('BENCH101', 'Benchmarking')
+    students = [repository.create_student(f'user-{i}', f'B{i:06d}', f'Student {i}')['id'] for i in range(1000)]
+
+    def new_session():
+        return repository.create_session(course['id'], 'faculty', str(uuid.uuid4()), datetime.now() + timedelta(days=1))
+
+    marks = _rolling(students, new_session)
+    yield lambda: repository.mark_attendance(*next(marks), datetime.now())
+
+def _rolling(items, new_session):
+    """(session, item) pairs; a fresh session once every item was used"""
+    while True:
+        session = new_session()
+        for item in items:
+            yield session, item
+
+# QR codes, passwords and tokens
+
+@benchmark('qr.generate_qr_code')
+@contextmanager
+def qr_generate():
+    from app.utils.helpers import generate_qr_code
+
+    yield lambda: generate_qr_code(str(uuid.uuid4()))
+
+@benchmark('bcrypt.check_password')
+@contextmanager
+def bcrypt_check_password():
+    from app.models.models import User, hash_password
+
+    user = User(username='bench', email='bench@example.com', password_hash=hash_password(PASSWORD), role='student')
+    yield lambda: user.check_password(PASSWORD)
+
+class ApiFixture:
+    """create_app() on a seeded SQLite file, shared by the API benchmarks"""
+    _instance = None
+
+    @classmethod
+    def get(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def close(cls):
+        if cls._instance is not None:
+            shutil.rmtree(cls._instance.workdir, ignore_errors=True)
+            cls._instance = None
+
+    def __init__(self, students=200):
+        self.workdir = tempfile.mkdtemp(prefix='qr-micro-')
+        self.qr_token, self.student_tokens = seed_database(os.path.join(self.workdir, 'bench.db'), students=students, password=PASSWORD)
+
+        from flask_jwt_extended import create_access_token
+        from app import create_app
+        from app.models.models import User, Course
+
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            faculty_user = User.query.filter_by(username='bench_faculty').one()
+            self.faculty_user_id = faculty_user.id
+            self.course_id = Course.query.filter_by(course_code='BENCH101').one().id
+            self.faculty_token = create_access_token(
+                identity=faculty_user.id,
+                additional_claims={'role': 'faculty', 'user_id': faculty_user.id}
+            )
+
+    def auth(self, token):
+        return {'Authorization': f'Bearer {token}'}
+
+@benchmark('jwt.create_access_token')
+@contextmanager
+def jwt_create():
+    from flask_jwt_extended import create_access_token
+
+    fixture = ApiFixture.get()
+    with fixture.app.app_context():
+        yield lambda: create_access_token(identity=1, additional_claims={'role': 'student', 'user_id': 1})
+
+@benchmark('jwt.role_required')
+@contextmanager
+def jwt_role_required():
+    from app.utils.helpers import role_required
+
+    fixture = ApiFixture.get()
+    view = role_required('student')(lambda: 'ok')
+    headers = fixture.auth(fixture.student_tokens[0])
+
+    def verify():
+        with fixture.app.test_request_context(headers=headers):
+            return view()
+
+    yield verify
+
+@benchmark('api.login')
+@contextmanager
+def api_login():
+    fixture = ApiFixture.get()
+    yield lambda: fixture.client.post('/api/auth/login', json={'username': 'bench_0', 'password': PASSWORD})
+
+@benchmark('api.mark_attendance')
+@contextmanager
+def api_mark_attendance():
+    from app.repositories import get_repository
+
+    fixture = ApiFixture.get()
+
+    def new_session():
+        with fixture.app.app_context():
+            session = get_repository().create_session(
+                fixture.course_id,
+                fixture.faculty_user_id,
+                str(uuid.uuid4()),
+                datetime.utcnow() + timedelta(days=1)
+            )
+        return session['qr_code_token']
+
+    marks = _rolling(fixture.student_tokens, new_session)
+
+    def mark():
+        qr_token, token = next(marks)
+        return fixture.client.post(
+            '/api/attendance/student/attendance/mark',
+            headers=fixture.auth(token),
+            json={'qr_token': qr_token}
+        )
+
+    yield mark
+
+@benchmark('api.course_report')
+@contextmanager
+def api_course_report():
+    fixture = ApiFixture.get()
+    path = f'/api/attendance/faculty/attendance/report?course_id={fixture.course_id}'
+    headers = fixture.auth(fixture.faculty_token)
+    yield lambda: fixture.client.get(path, headers=headers)
+
+# Running and comparing
+
+def current_commit():
+    """Short hash of HEAD, with -dirty if tracked files have changes"""
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+        dirty = subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{commit}-dirty' if dirty else commit
+
+def measure(operation, repeats):
+    """Per-operation timings in microseconds"""
+    timer = timeit.Timer(operation)
+    loops, _ = timer.autorange()
+    times = [elapsed / loops * 1e6 for elapsed in timer.repeat(repeat=repeats, number=loops)]
+    return {
+        'median_us': statistics.median(times),
+        'min_us': min(times),
+        'stdev_us': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'loops': loops,
+        'repeats': repeats
+    }
+
+def results_path(output, key):
+    return os.path.join(output, f'{key}.json')
+
+def run(args):
+    register_memory_benchmarks(args.sizes)
+    names = [name for name in BENCHMARKS if not args.filter or any(f in name for f in args.filter)]
+    if not names:
+        sys.exit(f'No benchmark matches {args.filter}')
+
+    commit = current_commit()
+    path = results_path(args.output, commit)
+
+    # Runs of different subsets on the same commit are merged
+    results = {'commit': commit, 'benchmarks': {}}
+    if os.path.exists(path):
+        with open(path) as f:
+            results = json.load(f)
+    results.update(
+        created=datetime.now().isoformat(timespec='seconds'),
+        python=platform.python_version(),
+        machine=platform.platform()
+    )
+
+    print(f'{"benchmark":<44}{"median":>14}{"min":>14}{"stdev":>12}')
+    try:
+        for name in names:
+            with BENCHMARKS[name]() as operation:
+                result = measure(operation, args.repeat)
+            results['benchmarks'][name] = result
+            print(f'{name:<44}{format_time(result["median_us"]):>14}{format_time(result["min_us"]):>14}{format_time(result["stdev_us"]):>12}')
+    finally:
+        ApiFixture.close()
+
+    os.makedirs(args.output, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f'\nSaved {path}')
+
+def format_time(us):
+    if us >= 1e6:
+        return f'{us / 1e6:.2f} s'
+    if us >= 1e3:
+        return f'{us / 1e3:.2f} ms'
+    return f'{us:.2f} us'
+
+def load_results(output, ref):
+    """Results for a file path, a saved key or any git revision"""
+    if os.path.isfile(ref):
+        candidates = [ref]
+    else:
+        candidates = [results_path(output, ref)]
+        try:
+            commit = subprocess.check_output(['git', 'rev-parse', '--short', ref], cwd=ROOT, text=True, stderr=subprocess.DEVNULL).strip()
+            candidates += [results_path(output, commit), results_path(output, f'{commit}-dirty')]
+        except (OSError, subprocess.CalledProcessError):
+            pass
+
+    for path in candidates:
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+    sys.exit(f'No saved results for {ref!r} in {output}')
+
+def compare(args):
+    base = load_results(args.output, args.base)
+    head = load_results(args.output, args.head or current_commit())
+
+    print(f'{base["commit"]} -> {head["commit"]} (threshold {args.threshold:.0%})\n')
+    print(f'{"benchmark":<44}{"base":>14}{"head":>14}{"change":>10}')
+
+    regressions = 0
+    for name in sorted(set(base['benchmarks']) & set(head['benchmarks'])):
+        before = base['benchmarks'][name]['median_us']
+        after = head['benchmarks'][name]['median_us']
+        change = after / before - 1 if before else 0.0
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        elif change < -args.threshold:
+            flag = '  faster'
+        print(f'{name:<44}{format_time(before):>14}{format_time(after):>14}{change:>+10.1%}{flag}')
+
+    only = sorted(set(base['benchmarks']) ^ set(head['benchmarks']))
+    if only:
+        print(f'\nNot in both runs: {", ".join(only)}')
+
+    if regressions:
+        print(f'\n{regressions} regression(s) beyond {args.threshold:.0%}')
+        sys.exit(1)
+
+def list_benchmarks(args):
+    register_memory_benchmarks(args.sizes)
+    for name in BENCHMARKS:
+        print(name)
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks with per-commit results')
+    parser.add_argument('--output', default=RESULTS_DIR, help='Directory of the saved results.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run benchmarks and save the results for the current commit.')
+    run_parser.add_argument('--filter', nargs='+', help='Only run benchmarks whose name contains one of these.')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='Repository sizes for the lookup benchmarks.')
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser('compare', help='Compare two saved runs.')
+    compare_parser.add_argument('base', help='Commit, results key or JSON file of the baseline.')
+    compare_parser.add_argument('head', nargs='?', help='Commit, results key or JSON file to check (default: current commit).')
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help='Slowdown that counts as a regression (0.10 = 10%%).')
+    compare_parser.set_defaults(handler=compare)
+
+    list_parser = subparsers.add_parser('list', help='List benchmark names.')
+    list_parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    list_parser.set_defaults(handler=list_benchmarks)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == '__main__':
+    main()
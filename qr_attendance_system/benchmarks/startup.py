@@ -0,0 +1,151 @@
+"""
+Import and startup time of the servers, checked against a budget
+
+Every scenario runs in fresh interpreters, the way a worker cold start or a
+test run pays for it:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 20 --budget create_app=600 --importtime
+
+It reports the median time of each scenario and exits non-zero when one is
+over its budget (milliseconds), or when a dependency that should load on
+first use (qrcode/PIL, bcrypt, the supabase SDK, pyarrow) was imported
+during startup. --importtime adds the slowest modules from
+``python -X importtime`` to help find the culprit.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'import_app': 'import app',
+    'create_app': 'from app import create_app; create_app()',
+    'simple_app': 'import simple_app',
+    'asgi_app': 'from app.asgi import create_asgi_app; create_asgi_app()'
+}
+
+# Milliseconds on a typical development machine, with headroom
+DEFAULT_BUDGETS = {
+    'import_app': 900,
+    'create_app': 1000,
+    'simple_app': 900,
+    'asgi_app': 1500
+}
+
+# Imported on first use; none of these may load while the app starts
+LAZY_MODULES = ('qrcode', 'PIL', 'bcrypt', 'supabase', 'pyarrow')
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+def child_env(workdir):
+    env = dict(os.environ)
+    env['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'startup.db')}"
+    env['PYTHONPATH'] = PROJECT_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    # Measure the default boot path, whatever the shell has switched on
+    for name in ('AUTO_CREATE_TABLES', 'METRICS_ENABLED', 'PROFILER_ENABLED', 'TRACE_SAMPLE_RATE', 'TRACE_SLOW_MS'):
+        env.pop(name, None)
+    return env
+
+def run_once(statement, env):
+    """Time one statement in a fresh interpreter; return (seconds, eagerly loaded modules)"""
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD.format(statement=statement, lazy=LAZY_MODULES)],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'child failed')
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return report['seconds'], report['loaded']
+
+def slowest_imports(statement, env, top=10):
+    """(microseconds, module) of the modules that took longest to import themselves"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        # Self time, so a package is not blamed for what its imports cost
+        rows.append((int(self_us), module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+def print_report(rows):
+    print(f'{"scenario":<14}{"median ms":>11}{"min ms":>9}{"max ms":>9}{"budget ms":>11}  {"eager imports":<20}result')
+    for name, median, fastest, slowest, budget, loaded, result in rows:
+        print(f'{name:<14}{median:>11.1f}{fastest:>9.1f}{slowest:>9.1f}{budget:>11.0f}  {loaded:<20}{result}')
+
+def parse_budgets(values):
+    budgets = dict(DEFAULT_BUDGETS)
+    for value in values or []:
+        name, _, limit = value.partition('=')
+        if name not in SCENARIOS or not limit:
+            raise SystemExit(f'Budgets look like create_app=800; scenarios: {", ".join(SCENARIOS)}')
+        budgets[name] = float(limit)
+    return budgets
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup time of the QR attendance servers against a budget')
+    parser.add_argument('--runs', type=int, default=7, help='Fresh interpreters per scenario.')
+    parser.add_argument('--scenario', choices=list(SCENARIOS), action='append', help='Run only these scenarios.')
+    parser.add_argument('--budget', action='append', metavar='SCENARIO=MS', help='Override a budget.')
+    parser.add_argument('--importtime', action='store_true', help='Show the slowest imports of each scenario.')
+    args = parser.parse_args()
+
+    budgets = parse_budgets(args.budget)
+    workdir = tempfile.mkdtemp(prefix='qr-startup-')
+    env = child_env(workdir)
+    failures = []
+    rows = []
+    try:
+        for name in args.scenario or SCENARIOS:
+            statement = SCENARIOS[name]
+            try:
+                samples = [run_once(statement, env) for _ in range(args.runs)]
+            except RuntimeError as e:
+                print(f'{name}: skipped ({e})')
+                continue
+
+            times = [seconds * 1000 for seconds, _ in samples]
+            loaded = sorted({module for _, modules in samples for module in modules})
+            median = statistics.median(times)
+            ok = median <= budgets[name] and not loaded
+            rows.append((name, median, min(times), max(times), budgets[name], ', '.join(loaded) or '-', 'ok' if ok else 'FAIL'))
+            if median > budgets[name]:
+                failures.append(f'{name}: {median:.0f} ms is over the {budgets[name]:.0f} ms budget')
+            if loaded:
+                failures.append(f'{name}: imported {", ".join(loaded)} at startup')
+
+            if args.importtime:
+                print(f'\nSlowest imports for {name}:')
+                for self_us, module in slowest_imports(statement, env):
+                    print(f'  {self_us / 1000:8.1f} ms  {module}')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print_report(rows)
+    if failures:
+        print()
+        for failure in failures:
+            print(failure)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Requests per second of the production launcher by worker count
+
+Starts ``serve.py`` with each worker count in turn against the same seeded
+database and drives authenticated profile reads through it:
+
+    python -m benchmarks.worker_scaling --workers 1 2 4 8 --concurrency 64
+
+Throughput should grow roughly linearly until the worker count reaches the
+number of CPU cores.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+from benchmarks._common import free_port, seed_database, start_server, stop_server, run_load, print_table
+
+def benchmark_workers(app, workers, db_path, tokens, args):
+    port = free_port()
+    command = [sys.executable, 'serve.py', '--app', app, '--workers', str(workers), '--bind', f'127.0.0.1:{port}']
+    process = start_server(command, port, env={'DATABASE_URL': f'sqlite:///{db_path}', 'GUNICORN_LOG_LEVEL': 'warning'})
+    try:
+        requests = [
+            ('GET', '/api/auth/profile', {'Authorization': f'Bearer {token}'}, None)
+            for _ in range(args.rounds)
+            for token in tokens
+        ]
+        base_url = f'http://127.0.0.1:{port}'
+        # Warm every worker up before measuring
+        asyncio.run(run_load(base_url, requests[:args.concurrency * 2], args.concurrency))
+        return asyncio.run(run_load(base_url, requests, args.concurrency))
+    finally:
+        stop_server(process)
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure requests per second by gunicorn worker count')
+    parser.add_argument('--app', choices=['api', 'asgi'], default='api')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=10, help='Profile reads per student.')
+    parser.add_argument('--concurrency', type=int, default=64)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='qr-bench-')
+    try:
+        db_path = os.path.join(workdir, 'bench.db')
+        print(f'Seeding {args.students} students ({os.cpu_count()} CPU cores available)...')
+        _, tokens = seed_database(db_path, students=args.students)
+
+        results = {}
+        for workers in args.workers:
+            print(f'Benchmarking {workers} worker(s)...')
+            results[f'{workers} worker(s)'] = benchmark_workers(args.app, workers, db_path, tokens, args)
+
+        print_table(f'{args.app}: GET /api/auth/profile (concurrency {args.concurrency})', results)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -5,5 +5,95 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///attendance.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Create missing tables when the app boots. Off by default so workers
+    # start without touching the schema; run `flask --app run init-db` once
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', '0') == '1'
+    
+    # JSON responses (app/utils/json_provider.py): orjson when installed, and
+    # list payloads of at least JSON_STREAM_THRESHOLD items are streamed
+    JSON_USE_ORJSON = os.environ.get('JSON_USE_ORJSON', '1') == '1'
+    JSON_STREAM_THRESHOLD = int(os.environ.get('JSON_STREAM_THRESHOLD', 1000))
+    JSON_STREAM_CHUNK_SIZE = int(os.environ.get('JSON_STREAM_CHUNK_SIZE', 500))
+    # Stored datetimes are naive UTC; write them with a +00:00 offset
+    JSON_NAIVE_UTC = os.environ.get('JSON_NAIVE_UTC', '1') == '1'
+    
+    # Response compression (app/utils/compression.py): brotli when installed,
+    # else gzip, for JSON/HTML/text bodies of at least COMPRESS_MIN_SIZE bytes
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    
+    # Database connection pool (see app/utils/database.py)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+    
+    # SQLite connection pragmas
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    
+    # PostgreSQL session settings
+    PG_STATEMENT_TIMEOUT_MS = int(os.environ.get('PG_STATEMENT_TIMEOUT_MS', 15000))
+    PG_PREPARE_THRESHOLD = int(os.environ.get('PG_PREPARE_THRESHOLD', 5))
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-string'
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
\ No newline at end of file
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    # Seconds a live feed stream token (?token= for EventSource) can be used to connect
+    LIVE_STREAM_TOKEN_EXPIRES = int(os.environ.get('LIVE_STREAM_TOKEN_EXPIRES', 60))
+    
+    # Bulk CSV import
+    BULK_IMPORT_CHUNK_SIZE = int(os.environ.get('BULK_IMPORT_CHUNK_SIZE', 500))
+    BULK_IMPORT_HASH_WORKERS = int(os.environ.get('BULK_IMPORT_HASH_WORKERS', os.cpu_count() or 1))
+    
+    # Attendance export
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 10000))
+    
+    # Offline scans uploaded to /student/attendance/mark/batch: seconds after the
+    # QR window closed during which they are still accepted, and the largest
+    # device clock offset a batch may have
+    OFFLINE_SCAN_MAX_DELAY = int(os.environ.get('OFFLINE_SCAN_MAX_DELAY', 600))
+    OFFLINE_SCAN_MAX_CLOCK_SKEW = int(os.environ.get('OFFLINE_SCAN_MAX_CLOCK_SKEW', 300))
+    
+    # Admin dashboard statistics are served from memory for at most this many seconds
+    STATS_MAX_STALENESS = int(os.environ.get('STATS_MAX_STALENESS', 60))
+    
+    # Request metrics on GET /metrics (app/utils/metrics.py); optional bearer token
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '0') == '1'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # Sampling profiler behind GET /api/admin/admin/profile (app/utils/profiler.py)
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', '0') == '1'
+    PROFILER_MAX_SECONDS = float(os.environ.get('PROFILER_MAX_SECONDS', 30))
+    
+    # Slow-query log and N+1 detector (app/utils/sql_diagnostics.py); 0 disables
+    SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', 0))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', 0))
+    SQL_LOG_PARAM_LENGTH = int(os.environ.get('SQL_LOG_PARAM_LENGTH', 200))
+    
+    # Stage traces of the mark path (app/utils/tracing.py): sampled share of
+    # requests, plus every request slower than TRACE_SLOW_MS; 0 disables both
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', 0))
+    TRACE_SLOW_MS = float(os.environ.get('TRACE_SLOW_MS', 0))
+    TRACE_FILE = os.environ.get('TRACE_FILE', 'traces/trace-{pid}.json')
+    TRACE_MAX_BYTES = int(os.environ.get('TRACE_MAX_BYTES', 10 * 1024 * 1024))
+    TRACE_BACKUP_COUNT = int(os.environ.get('TRACE_BACKUP_COUNT', 5))
+    
+    # Storage behind the repository routes: sqlalchemy, supabase or memory
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'sqlalchemy')
+    
+    # Supabase REST backend (app/repositories/supabase.py)
+    SUPABASE_URL = os.environ.get('SUPABASE_URL')
+    SUPABASE_KEY = os.environ.get('SUPABASE_KEY')
+    SUPABASE_TIMEOUT = float(os.environ.get('SUPABASE_TIMEOUT', 10))
+    SUPABASE_MAX_RETRIES = int(os.environ.get('SUPABASE_MAX_RETRIES', 3))
+    SUPABASE_POOL_SIZE = int(os.environ.get('SUPABASE_POOL_SIZE', 20))
+    # Rows per page when reading lists; at most the project's PostgREST max-rows
+    SUPABASE_PAGE_SIZE = int(os.environ.get('SUPABASE_PAGE_SIZE', 1000))
+    
+    # Connection pool of the async (ASGI) server
+    ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', 20))
+    ASYNC_DB_MAX_OVERFLOW = int(os.environ.get('ASYNC_DB_MAX_OVERFLOW', 30))
\ No newline at end of file
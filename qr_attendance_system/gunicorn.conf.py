@@ -0,0 +1,64 @@
+"""
+Gunicorn settings for the QR Attendance System
+
+Used by serve.py (or directly: ``gunicorn -c gunicorn.conf.py run:app``).
+Every setting can be overridden from the environment.
+
+The app is imported once in the master and forked into the workers, so code
+and read-only data are shared between them. Reload code and workers without
+dropping requests with ``kill -HUP $(cat $GUNICORN_PIDFILE)``.
+"""
+
+import multiprocessing
+import os
+import sys
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# One worker per core, each with a pool of threads. The threaded worker is
+# required: a sync worker is killed once a response runs past `timeout`, which
+# cuts off the live feed (Server-Sent Events) and streamed exports. With
+# gthread, `timeout` only bounds an unresponsive worker, not a response.
+#
+# Every open live feed or export still holds one thread for as long as it
+# runs, so at most workers * threads of them (plus ordinary requests) are
+# served at once. Raise GUNICORN_THREADS for many faculty viewers, or use
+# GUNICORN_WORKER_CLASS=gevent (pip install gevent) to serve them on greenlets.
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = max(2, int(os.environ.get('GUNICORN_THREADS', 8)))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Import the app before forking
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+backlog = int(os.environ.get('GUNICORN_BACKLOG', 2048))
+
+# Recycle workers after this many requests (0 disables) to cap slow leaks
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+pidfile = os.environ.get('GUNICORN_PIDFILE')
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+def post_fork(server, worker):
+    """Give every worker its own database connection pool"""
+    # Connections opened in the master while preloading (table creation,
+    # stats reconcile) must not be shared across processes. close=False
+    # leaves the master's sockets alone and just starts a fresh pool.
+    application = server.app.wsgi()
+
+    if 'sqlalchemy' in getattr(application, 'extensions', {}):
+        db = application.extensions['sqlalchemy']
+        with application.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+    async_database = sys.modules.get('app.asgi.database')
+    if async_database and async_database.db.engine is not None:
+        async_database.db.engine.sync_engine.dispose(close=False)
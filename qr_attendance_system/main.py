@@ -17,12 +17,14 @@ from kivy.core.window import Window
 from kivy.metrics import dp
 from kivy.clock import Clock
 from kivy.graphics import Color, Rectangle, RoundedRectangle
-import requests
-import json
-import qrcode
+from kivy.core.image import Image as CoreImage
 import io
+import os
 import base64
+import threading
 from datetime import datetime
+from api_client import ApiClient
+from scan_queue import ScanQueue, ScanSync
 
 # Configure window for mobile
 Window.clearcolor = (0.4, 0.49, 0.92, 1)  # Purple gradient color
@@ -35,6 +37,11 @@ class QRAttendanceApp(App):
         super().__init__(**kwargs)
         self.current_user = None
         self.token = None
+        # One pooled session for every screen; calls run off the UI thread
+        self.api = ApiClient(API_BASE_URL)
+        # Scans wait on the phone until they are uploaded (student logins)
+        self.scan_queue = None
+        self.scan_sync = None
     
     def build(self):
         self.title = "QR Attendance System"
@@ -47,33 +54,52 @@ class QRAttendanceApp(App):
         self.sm.add_widget(FacultyDashboard(name='faculty_dashboard'))
         self.sm.add_widget(AdminDashboard(name='admin_dashboard'))
         self.sm.add_widget(ProfileScreen(name='profile'))
+        self.sm.add_widget(ScanScreen(name='scan'))
         
         return self.sm
     
-    def login(self, username, password):
-        """Handle user login"""
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/login",
-                json={'username': username, 'password': password},
-                headers={'Content-Type': 'application/json'}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
+    def login(self, username, password, callback):
+        """Handle user login; callback(success, role or error) runs on the UI thread"""
+        def on_result(status, data):
+            if status == 200:
                 self.current_user = data
                 self.token = data.get('access_token')
-                return True, data.get('role')
+                self.api.set_token(self.token)
+                if data.get('role') == 'student':
+                    self.start_scan_sync(username)
+                callback(True, data.get('role'))
             else:
-                return False, response.json().get('msg', 'Login failed')
-        except Exception as e:
-            return False, f"Connection error: {str(e)}"
+                callback(False, data.get('msg', 'Login failed'))
+        
+        self.api.post(
+            '/login',
+            json={'username': username, 'password': password},
+            on_result=on_result,
+            on_error=lambda message: callback(False, message)
+        )
     
     def logout(self):
         """Handle user logout"""
         self.current_user = None
         self.token = None
+        if self.scan_sync:
+            self.scan_sync.stop()
+            self.scan_sync = None
+            self.scan_queue = None
+        self.api.reset()
         self.sm.current = 'login'
+    
+    def start_scan_sync(self, username):
+        """Upload this student's queued scans, including any left from earlier runs"""
+        # One queue per user, so nobody uploads another student's scans
+        path = os.path.join(self.user_data_dir, f'scan_queue_{username}.json')
+        self.scan_queue = ScanQueue(path)
+        dashboard = self.sm.get_screen('student_dashboard')
+        self.scan_sync = ScanSync(self.api, self.scan_queue, on_update=dashboard.on_sync)
+        self.scan_sync.start()
+    
+    def on_stop(self):
+        self.api.close()
 
 
 class LoginScreen(Screen):
@@ -169,6 +195,7 @@ class LoginScreen(Screen):
         )
         login_btn.bind(on_press=self.do_login)
         form_layout.add_widget(login_btn)
+        self.login_btn = login_btn
         
         # Error message
         self.error_label = Label(
@@ -202,8 +229,14 @@ class LoginScreen(Screen):
             self.error_label.text = 'Please enter username and password'
             return
         
+        self.login_btn.disabled = True
+        self.error_label.text = 'Signing in...'
+        App.get_running_app().login(username, password, self.on_login)
+    
+    def on_login(self, success, result):
         app = App.get_running_app()
-        success, result = app.login(username, password)
+        self.login_btn.disabled = False
+        self.error_label.text = ''
         
         if success:
             # Navigate to appropriate dashboard
@@ -378,11 +411,22 @@ class StudentDashboard(Screen):
         scan_btn.bind(on_press=self.scan_qr)
         layout.add_widget(scan_btn)
         
+        # Offline queue status
+        self.sync_label = Label(
+            text='',
+            size_hint=(1, 0.05),
+            font_size='14sp',
+            color=(1, 1, 1, 1)
+        )
+        layout.add_widget(self.sync_label)
+        
         # Stats
         stats_layout = GridLayout(cols=2, spacing=dp(10), size_hint=(1, 0.2))
         
-        stats_layout.add_widget(self.create_stat_card('Total\nAttendance', '0'))
-        stats_layout.add_widget(self.create_stat_card('This\nMonth', '0'))
+        self.total_card = self.create_stat_card('Total\nAttendance', '0')
+        self.month_card = self.create_stat_card('This\nMonth', '0')
+        stats_layout.add_widget(self.total_card)
+        stats_layout.add_widget(self.month_card)
         
         layout.add_widget(stats_layout)
         
@@ -395,7 +439,7 @@ class StudentDashboard(Screen):
         )
         layout.add_widget(history_label)
         
-        self.history_scroll = ScrollView(size_hint=(1, 0.47))
+        self.history_scroll = ScrollView(size_hint=(1, 0.42))
         self.history_layout = GridLayout(
             cols=1,
             spacing=dp(5),
@@ -428,23 +472,203 @@ class StudentDashboard(Screen):
             font_size='14sp',
             color=(0.4, 0.49, 0.92, 1)
         ))
-        card.add_widget(Label(
+        card.value_label = Label(
             text=value_text,
             font_size='32sp',
             bold=True,
             color=(0.4, 0.49, 0.92, 1)
-        ))
+        )
+        card.add_widget(card.value_label)
         
         return card
     
+    def on_enter(self):
+        self.show_sync_status()
+        # Served from the client cache when it was loaded moments ago
+        App.get_running_app().api.get(
+            '/student/attendance/history',
+            on_result=self.show_history,
+            on_error=lambda message: print(f"Error loading history: {message}"),
+            cache=True
+        )
+    
+    def show_history(self, status, data):
+        if status != 200:
+            return
+        
+        history = data.get('attendance_history', [])
+        this_month = datetime.now().strftime('%Y-%m')
+        self.total_card.value_label.text = str(data.get('total_attendances', len(history)))
+        self.month_card.value_label.text = str(sum(1 for att in history if str(att.get('marked_at', '')).startswith(this_month)))
+        
+        self.history_layout.clear_widgets()
+        for att in history:
+            self.history_layout.add_widget(Label(
+                text=f"{att.get('marked_at', '')}  -  {att.get('session_id', '')}",
+                size_hint=(1, None),
+                height=dp(30),
+                color=(1, 1, 1, 1)
+            ))
+    
     def scan_qr(self, instance):
-        # QR scanning implementation
-        pass
+        self.manager.current = 'scan'
+    
+    def on_sync(self, results):
+        """Called on the UI thread after each upload attempt"""
+        self.show_sync_status()
+        if any(result.get('status') == 'marked' for result in results) and self.manager.current == self.name:
+            self.on_enter()
+    
+    def show_sync_status(self):
+        app = App.get_running_app()
+        if not app.scan_queue:
+            self.sync_label.text = ''
+            return
+        pending = len(app.scan_queue)
+        status = app.scan_sync.last_status or ''
+        if pending:
+            self.sync_label.text = f'{pending} scan(s) waiting to upload' + (f' - {status}' if status else '')
+        else:
+            self.sync_label.text = status
     
     def do_logout(self, instance):
         App.get_running_app().logout()
 
 
+class ScanScreen(Screen):
+    """Camera scanner; scans go to the offline queue, never straight to the server"""
+    SCAN_INTERVAL = 0.3
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.camera = None
+        self._scan_event = None
+        self._decoding = False
+        
+        layout = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
+        
+        layout.add_widget(Label(
+            text='📷 Scan QR Code',
+            font_size='24sp',
+            size_hint=(1, 0.08),
+            bold=True,
+            color=(1, 1, 1, 1)
+        ))
+        
+        # Camera preview, created while the screen is shown
+        self.camera_box = BoxLayout(size_hint=(1, 0.5))
+        layout.add_widget(self.camera_box)
+        
+        self.status_label = Label(
+            text='Point the camera at the QR code',
+            size_hint=(1, 0.08),
+            font_size='16sp',
+            color=(1, 1, 1, 1)
+        )
+        layout.add_widget(self.status_label)
+        
+        # Manual token entry
+        self.token_input = TextInput(
+            hint_text='Or paste the QR token here',
+            multiline=False,
+            size_hint=(1, None),
+            height=dp(50)
+        )
+        layout.add_widget(self.token_input)
+        
+        save_btn = Button(
+            text='Save Token',
+            size_hint=(1, 0.1),
+            background_color=(0.16, 0.65, 0.27, 1)
+        )
+        save_btn.bind(on_press=self.save_manual)
+        layout.add_widget(save_btn)
+        
+        back_btn = Button(
+            text='Back',
+            size_hint=(1, 0.1),
+            background_color=(0.86, 0.21, 0.27, 1)
+        )
+        back_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'student_dashboard'))
+        layout.add_widget(back_btn)
+        
+        self.add_widget(layout)
+    
+    def on_enter(self):
+        self.status_label.text = 'Point the camera at the QR code'
+        try:
+            from kivy.uix.camera import Camera
+            self.camera = Camera(play=True, resolution=(640, 480))
+            self.camera_box.add_widget(self.camera)
+        except Exception as e:
+            self.camera = None
+            self.status_label.text = 'Camera not available - enter the token below'
+            print(f"Camera error: {e}")
+            return
+        self._scan_event = Clock.schedule_interval(self.scan_frame, self.SCAN_INTERVAL)
+    
+    def on_leave(self):
+        if self._scan_event:
+            self._scan_event.cancel()
+            self._scan_event = None
+        if self.camera:
+            self.camera.play = False
+            self.camera_box.remove_widget(self.camera)
+            self.camera = None
+    
+    def scan_frame(self, dt):
+        # Copy the frame here; decode it on a worker thread
+        if self._decoding or not self.camera or not self.camera.texture:
+            return
+        texture = self.camera.texture
+        self._decoding = True
+        threading.Thread(target=self._decode, args=(texture.size, texture.pixels), daemon=True).start()
+    
+    def _decode(self, size, pixels):
+        token = None
+        try:
+            from PIL import Image as PILImage
+            from pyzbar.pyzbar import decode
+            
+            # Kivy textures are bottom-up; zbar wants the image upright
+            frame = PILImage.frombytes('RGBA', size, pixels).convert('L').transpose(PILImage.FLIP_TOP_BOTTOM)
+            codes = decode(frame)
+            if codes:
+                token = codes[0].data.decode('utf-8')
+        except Exception as e:
+            print(f"QR decode failed: {e}")
+        Clock.schedule_once(lambda dt: self._on_decoded(token))
+    
+    def _on_decoded(self, token):
+        self._decoding = False
+        if token and self.camera:
+            self.save_scan(token)
+    
+    def save_manual(self, instance):
+        token = self.token_input.text.strip()
+        if token:
+            self.token_input.text = ''
+            self.save_scan(token)
+    
+    def save_scan(self, token):
+        """Queue the scan with the phone's time; it is uploaded in the background"""
+        app = App.get_running_app()
+        if not app.scan_queue:
+            self.status_label.text = 'Please login as a student first'
+            return
+        
+        if app.scan_queue.add(token, datetime.now().astimezone()):
+            self.status_label.text = 'Scan saved - it will be sent automatically'
+            app.scan_sync.sync_soon()
+            # One scan per visit: stop the camera and head back
+            if self._scan_event:
+                self._scan_event.cancel()
+                self._scan_event = None
+            Clock.schedule_once(lambda dt: setattr(self.manager, 'current', 'student_dashboard'), 1)
+        else:
+            self.status_label.text = 'This QR code is already saved'
+
+
 class FacultyDashboard(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -477,6 +701,7 @@ class FacultyDashboard(Screen):
         )
         generate_btn.bind(on_press=self.generate_qr)
         layout.add_widget(generate_btn)
+        self.generate_btn = generate_btn
         
         # QR Code display
         self.qr_image = Image(
@@ -507,24 +732,39 @@ class FacultyDashboard(Screen):
         self.add_widget(layout)
     
     def generate_qr(self, instance):
-        # Generate QR code
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/faculty/session/create",
-                json={'course_id': 'C001'},
-                headers={'Content-Type': 'application/json'}
+        # Generate QR code for the first of the faculty's courses
+        api = App.get_running_app().api
+        self.generate_btn.disabled = True
+        
+        def on_error(message):
+            self.generate_btn.disabled = False
+            print(f"Error generating QR: {message}")
+        
+        def on_courses(status, data):
+            courses = data.get('courses', []) if status == 200 else []
+            if not courses:
+                on_error(data.get('msg', 'No courses found'))
+                return
+            api.post(
+                '/faculty/session/create',
+                json={'course_id': courses[0]['id']},
+                on_result=on_session,
+                on_error=on_error
             )
+        
+        def on_session(status, data):
+            self.generate_btn.disabled = False
+            if status not in (200, 201):
+                on_error(data.get('msg', 'Failed to create session'))
+                return
             
-            if response.status_code == 200:
-                data = response.json()
-                qr_data = data.get('qr_code')
-                
-                # Display QR code
-                if qr_data:
-                    # Decode base64 QR code
-                    self.qr_image.source = qr_data
-        except Exception as e:
-            print(f"Error generating QR: {e}")
+            # Display QR code from its base64 PNG data URL
+            qr_data = data.get('qr_code_image')
+            if qr_data:
+                png = base64.b64decode(qr_data.split(',', 1)[-1])
+                self.qr_image.texture = CoreImage(io.BytesIO(png), ext='png').texture
+        
+        api.get('/faculty/courses', on_result=on_courses, on_error=on_error, cache=True)
     
     def do_logout(self, instance):
         App.get_running_app().logout()
@@ -651,10 +891,16 @@ class ProfileScreen(Screen):
             size_hint=(1, 0.1),
             background_color=(0.86, 0.21, 0.27, 1)
         )
-        back_btn.bind(on_press=lambda x: self.manager.transition.direction = 'right')
+        back_btn.bind(on_press=self.go_back)
         layout.add_widget(back_btn)
         
         self.add_widget(layout)
+    
+    def go_back(self, instance):
+        role = (App.get_running_app().current_user or {}).get('role')
+        self.manager.transition.direction = 'right'
+        self.manager.current = f'{role}_dashboard' if role else 'login'
+        self.manager.transition.direction = 'left'
 
 
 if __name__ == '__main__':
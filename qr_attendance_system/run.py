@@ -1,6 +1,12 @@
+import os
 from app import create_app
+from app.models.models import db
 
 app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # The development server sets up a fresh database by itself
+    with app.app_context():
+        db.create_all()
+
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
\ No newline at end of file
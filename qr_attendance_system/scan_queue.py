@@ -0,0 +1,200 @@
+"""
+Offline scan queue for the Kivy mobile app
+
+A scan is saved on the phone first, with the phone's time, and uploaded
+later. When 300 phones scan at once and the classroom Wi-Fi gives out,
+nothing is lost:
+
+- `ScanQueue` keeps pending scans in a JSON file under the app's data
+  directory, one entry per QR token, with the phone's time and UTC offset.
+  Scanning the same code twice keeps the first capture time.
+- `ScanSync` uploads the queue to POST /student/attendance/mark/batch in
+  batches. The first upload after a scan waits a random few seconds, so a
+  class's worth of phones does not hit the server in the same instant.
+  Failed uploads are retried with exponential backoff and jitter.
+
+The server checks each scan against the QR window at capture time (see
+app/utils/offline_scans.py). Every answer it gives is final, so those scans
+leave the queue, except a refusal of the whole batch because the phone's
+clock is off: those scans stay queued until the clock is fixed. Network errors and 5xx/429 responses are retried with
+backoff; a 401 keeps the queue until the student logs in again.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from kivy.clock import Clock
+
+BATCH_PATH = '/student/attendance/mark/batch'
+
+class ScanQueue:
+    """Pending scans persisted to a JSON file, deduplicated by token"""
+    def __init__(self, path):
+        self.path = path
+        self._scans = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                scans = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._scans = {scan['qr_token']: scan for scan in scans if scan.get('qr_token')}
+
+    def _save(self):
+        # Write a temporary file and swap it in, so a crash mid-write
+        # cannot corrupt the queue
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(list(self._scans.values()), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def add(self, qr_token, scanned_at=None):
+        """Queue a scan; False when the token is already queued"""
+        qr_token = qr_token.strip()
+        with self._lock:
+            if not qr_token or qr_token in self._scans:
+                return False
+            self._scans[qr_token] = {
+                'qr_token': qr_token,
+                'scanned_at': (scanned_at or datetime.now().astimezone()).isoformat()
+            }
+            self._save()
+            return True
+
+    def peek(self, limit):
+        """The oldest `limit` scans, without removing them"""
+        with self._lock:
+            return list(self._scans.values())[:limit]
+
+    def remove(self, tokens):
+        with self._lock:
+            removed = [token for token in tokens if self._scans.pop(token, None)]
+            if removed:
+                self._save()
+
+    def __len__(self):
+        return len(self._scans)
+
+class ScanSync:
+    """Uploads a ScanQueue in batches, backing off while the server is unreachable"""
+    def __init__(self, api, queue, on_update=None, batch_size=20, spread=10, base_delay=2, max_delay=300):
+        self.api = api
+        self.queue = queue
+        self.on_update = on_update
+        self.batch_size = batch_size
+        self.spread = spread
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failures = 0
+        self.last_status = None
+        self._event = None
+        self._due_at = None
+        self._in_flight = False
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self.failures = 0
+        if len(self.queue):
+            self.schedule(random.uniform(0, self.spread))
+
+    def stop(self):
+        self._running = False
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+            self._due_at = None
+
+    def schedule(self, delay):
+        """Upload after delay seconds, unless an earlier upload is already due"""
+        if not self._running or self._in_flight:
+            return
+        due_at = time.monotonic() + delay
+        if self._event is not None:
+            if self._due_at <= due_at:
+                return
+            self._event.cancel()
+        self._due_at = due_at
+        self._event = Clock.schedule_once(lambda dt: self.sync(), delay)
+
+    def sync_soon(self):
+        """Called after a scan: upload within the spread window"""
+        if self.failures == 0:
+            self.schedule(random.uniform(0, self.spread))
+
+    def sync(self):
+        self._event = None
+        self._due_at = None
+        scans = self.queue.peek(self.batch_size)
+        if not self._running or self._in_flight or not scans:
+            return
+
+        self._in_flight = True
+        self.api.post(
+            BATCH_PATH,
+            json={'sent_at': datetime.now().astimezone().isoformat(), 'scans': scans},
+            on_result=lambda status, data: self._on_result(scans, status, data),
+            on_error=lambda message: self._on_error(message)
+        )
+
+    def _on_result(self, scans, status, data):
+        self._in_flight = False
+        if status == 200:
+            # Every per-scan answer is final, marked or rejected, except a
+            # batch refused because the phone's clock is off
+            results = data.get('results', [])
+            skewed = [result for result in results if result.get('status') == 'clock_skew']
+            pending = len(self.queue)
+            self.queue.remove([result.get('qr_token') for result in results if result.get('status') != 'clock_skew'])
+            self.failures = 0
+            if skewed:
+                # Keep the scans and try again later, once the clock may be fixed
+                message = skewed[0].get('msg', 'Phone clock is off')
+                self.last_status = f"{message}; set the phone's clock to upload {len(self.queue)} scan(s)"
+                self.schedule(self.max_delay)
+            else:
+                self.last_status = f"{data.get('marked', 0)} of {len(scans)} scans marked"
+            self._notify(results)
+            if len(self.queue) and len(self.queue) < pending:
+                self.schedule(0)
+        elif status in (401, 403):
+            # Logged out; the queue waits for the next login
+            self.last_status = data.get('msg', 'Please login again')
+            self._notify([])
+        elif status in (400, 413) and len(scans) > 1:
+            # Shrink batches the server will not take in one piece
+            self.batch_size = max(1, len(scans) // 2)
+            self.schedule(0)
+        elif status in (400, 413):
+            self.queue.remove([scans[0]['qr_token']])
+            self.last_status = data.get('msg', 'Scan rejected')
+            self._notify([])
+            self.schedule(0)
+        else:
+            self._backoff(data.get('msg', f'Server error {status}'))
+
+    def _on_error(self, message):
+        self._in_flight = False
+        self._backoff(message)
+
+    def _backoff(self, message):
+        self.failures += 1
+        delay = min(self.max_delay, self.base_delay * 2 ** (self.failures - 1))
+        # Jitter keeps phones that failed together from retrying together
+        delay = random.uniform(delay / 2, delay)
+        self.last_status = f'{message}; retrying in {delay:.0f}s'
+        self._notify([])
+        self.schedule(delay)
+
+    def _notify(self, results):
+        if self.on_update:
+            self.on_update(results)
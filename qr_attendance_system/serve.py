@@ -0,0 +1,83 @@
+"""
+Production launcher for the QR Attendance System
+
+Starts a pre-fork gunicorn server configured by gunicorn.conf.py:
+
+    python serve.py                 # JSON API (run.py), one worker per core
+    python serve.py --app asgi      # async API (asgi.py) on uvicorn workers
+    python serve.py --app simple    # web demo (simple_app.py)
+    python serve.py --workers 4 --bind 0.0.0.0:8000
+
+The web demo keeps its data in process memory, so it always runs a single
+(threaded) worker. Use ``python run.py`` for local development.
+
+Before starting the API (either flavour) the launcher creates any missing
+database tables, like ``flask --app run init-db``. Pass --skip-init-db when
+the schema is managed elsewhere.
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+APPS = {
+    'api': 'run:app',
+    'asgi': 'asgi:app',
+    'simple': 'simple_app:create_demo_app()'
+}
+
+def gunicorn_args(app, workers=None, bind=None):
+    """Build the gunicorn command line for one of APPS"""
+    args = ['gunicorn', '--config', os.path.join(ROOT, 'gunicorn.conf.py'), '--chdir', ROOT]
+
+    if bind:
+        args += ['--bind', bind]
+
+    if app == 'asgi':
+        args += ['--worker-class', 'uvicorn.workers.UvicornWorker']
+    elif app == 'simple':
+        # In-memory storage cannot be shared between processes
+        workers = 1
+        args += ['--threads', os.environ.get('GUNICORN_THREADS', '8')]
+
+    if workers:
+        args += ['--workers', str(workers)]
+
+    return args + [APPS[app]]
+
+def init_db(app_name):
+    """Create any missing tables before the workers start"""
+    from app import create_app
+    from app.models.models import db
+
+    app = create_app()
+    # The ASGI server always uses the database; the API only with its default backend
+    if app_name == 'api' and app.config['STORAGE_BACKEND'] != 'sqlalchemy':
+        return
+    with app.app_context():
+        db.create_all()
+        # Workers open their own connections after the fork
+        for engine in db.engines.values():
+            engine.dispose()
+    print('Database tables are in place')
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the QR Attendance System with gunicorn')
+    parser.add_argument('--app', choices=list(APPS), default='api')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: WEB_CONCURRENCY or CPU count).')
+    parser.add_argument('--bind', help='Address to listen on (default: GUNICORN_BIND or 0.0.0.0:5000).')
+    parser.add_argument('--skip-init-db', action='store_true', help='Do not create missing database tables first.')
+    args = parser.parse_args()
+
+    if args.app != 'simple' and not args.skip_init_db:
+        init_db(args.app)
+
+    from gunicorn.app.wsgiapp import run
+
+    sys.argv = gunicorn_args(args.app, workers=args.workers, bind=args.bind)
+    sys.exit(run())
+
+if __name__ == '__main__':
+    main()
@@ -3,18 +3,61 @@ Simple QR Attendance System API
 Demonstrates core functionality without external dependencies
 """
 
-from flask import Flask, request, jsonify, render_template
-from app.models.simple_models import User, Student, Faculty, Course, Session, Attendance, storage
+import os
+from flask import Flask, request, jsonify, render_template, session as login_session
+from app.repositories.memory import MemoryRepository
+from app.utils.live import publish_attendance, live_response
+from app.utils.metrics import init_metrics, timer
+from app.utils.tracing import init_tracing, traced, span
+from app.utils.memprofile import repository_footprint, tracker as memory_tracker
+from app.utils.json_provider import init_json, json_list_response
+from app.utils.etags import ResourceVersions, is_fresh, not_modified, with_etag
+from app.utils.compression import init_compression
+from app.utils.assets import init_assets, build_assets
+from app.utils.offline_scans import MAX_BATCH_SIZE, validate_scans
 import uuid
 from datetime import datetime, timedelta
-import qrcode
 import io
 import base64
 
 app = Flask(__name__)
+init_json(app)
 
-# Simple authentication storage (in production, use proper JWT)
-current_user = None
+# gzip/brotli for responses over COMPRESS_MIN_SIZE bytes; registered first so it runs last
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+init_compression(app)
+
+# The page's CSS and JS: sources in development, hashed copies once built
+init_assets(app)
+
+# The demo keeps its data in process memory
+repository = MemoryRepository()
+
+# Bumped on writes; read views answer 304 while their versions are unchanged
+resource_versions = ResourceVersions()
+
+# Each browser keeps its own login in a signed session cookie
+app.secret_key = os.environ.get('SECRET_KEY') or os.urandom(24)
+
+def get_current_user():
+    """The user logged in on this browser, if any"""
+    user_id = login_session.get('user_id')
+    return repository.get_user(user_id) if user_id else None
+
+# Request metrics on GET /metrics when METRICS_ENABLED=1
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '0') == '1'
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+init_metrics(app)
+
+# Offline scans are accepted for this many seconds after their QR window closed
+app.config['OFFLINE_SCAN_MAX_DELAY'] = int(os.environ.get('OFFLINE_SCAN_MAX_DELAY', 600))
+app.config['OFFLINE_SCAN_MAX_CLOCK_SKEW'] = int(os.environ.get('OFFLINE_SCAN_MAX_CLOCK_SKEW', 300))
+
+# Stage traces of the mark path when TRACE_SAMPLE_RATE or TRACE_SLOW_MS is set
+app.config['TRACE_SAMPLE_RATE'] = float(os.environ.get('TRACE_SAMPLE_RATE', 0))
+app.config['TRACE_SLOW_MS'] = float(os.environ.get('TRACE_SLOW_MS', 0))
+app.config['TRACE_FILE'] = os.environ.get('TRACE_FILE', 'traces/trace-{pid}.json')
+init_tracing(app)
 
 @app.route('/')
 def index():
@@ -28,7 +71,9 @@ def api_info():
         "POST /login",
         "POST /faculty/session/create",
         "POST /student/attendance/mark",
-        "GET /student/attendance/history"
+        "GET /student/attendance/history",
+        "GET /dashboard/bootstrap",
+        "POST /student/attendance/mark/batch"
     ]})
 
 @app.route('/register/student', methods=['POST'])
@@ -38,31 +83,28 @@ def register_student():
         data = request.get_json()
         
         # Check if username already exists
-        if storage.get_user_by_username(data['username']):
+        if repository.get_user_by_username(data['username']):
             return jsonify({'msg': 'Username already exists'}), 400
         
         # Create user
-        user = User(
+        user = repository.create_user(
             username=data['username'],
             email=data['email'],
-            password=data['password'],  # In real app, this would be hashed
+            password_hash=data['password'],  # In real app, this would be hashed
             role='student'
         )
         
-        storage.add_user(user)
-        
         # Create student profile
-        student = Student(
-            user_id=user.id,
+        repository.create_student(
+            user_id=user['id'],
             student_id=data['student_id'],
             full_name=data['full_name'],
             department=data.get('department'),
             semester=data.get('semester')
         )
         
-        storage.add_student(student)
-        
-        return jsonify({'msg': 'Student registered successfully', 'user_id': user.id}), 201
+        resource_versions.bump('stats')
+        return jsonify({'msg': 'Student registered successfully', 'user_id': user['id']}), 201
     except Exception as e:
         return jsonify({'msg': 'Registration failed', 'error': str(e)}), 500
 
@@ -73,30 +115,27 @@ def register_faculty():
         data = request.get_json()
         
         # Check if username already exists
-        if storage.get_user_by_username(data['username']):
+        if repository.get_user_by_username(data['username']):
             return jsonify({'msg': 'Username already exists'}), 400
         
         # Create user
-        user = User(
+        user = repository.create_user(
             username=data['username'],
             email=data['email'],
-            password=data['password'],  # In real app, this would be hashed
+            password_hash=data['password'],  # In real app, this would be hashed
             role='faculty'
         )
         
-        storage.add_user(user)
-        
         # Create faculty profile
-        faculty = Faculty(
-            user_id=user.id,
+        repository.create_faculty(
+            user_id=user['id'],
             faculty_id=data['faculty_id'],
             full_name=data['full_name'],
             department=data.get('department')
         )
         
-        storage.add_faculty(faculty)
-        
-        return jsonify({'msg': 'Faculty registered successfully', 'user_id': user.id}), 201
+        resource_versions.bump('stats')
+        return jsonify({'msg': 'Faculty registered successfully', 'user_id': user['id']}), 201
     except Exception as e:
         return jsonify({'msg': 'Registration failed', 'error': str(e)}), 500
 
@@ -116,21 +155,20 @@ def register_admin():
             return jsonify({'msg': f'Invalid admin code. Expected: {expected_code}'}), 403
         
         # Check if username already exists
-        if storage.get_user_by_username(data['username']):
+        if repository.get_user_by_username(data['username']):
             return jsonify({'msg': 'Username already exists'}), 400
         
         # Create admin user
-        user = User(
+        user = repository.create_user(
             username=data['username'],
             email=data['email'],
-            password=data['password'],
+            password_hash=data['password'],
             role='admin'
         )
+        print(f"Admin user created successfully: {user['username']}")
         
-        storage.add_user(user)
-        print(f"Admin user created successfully: {user.username}")
-        
-        return jsonify({'msg': 'Admin registered successfully', 'user_id': user.id}), 201
+        resource_versions.bump('stats')
+        return jsonify({'msg': 'Admin registered successfully', 'user_id': user['id']}), 201
     except Exception as e:
         print(f"Admin registration error: {str(e)}")
         return jsonify({'msg': 'Registration failed', 'error': str(e)}), 500
@@ -139,7 +177,6 @@ def register_admin():
 def login():
     """Authenticate user"""
     try:
-        global current_user
         data = request.get_json()
         username = data.get('username')
         password = data.get('password')
@@ -147,14 +184,15 @@ def login():
         if not username or not password:
             return jsonify({'msg': 'Missing username or password'}), 400
         
-        user = storage.get_user_by_username(username)
+        user = repository.get_user_by_username(username)
         
-        if user and user.check_password(password):
-            current_user = user
+        # The demo stores passwords as given
+        if user and user['password_hash'] == password:
+            login_session['user_id'] = user['id']
             return jsonify({
                 'msg': 'Login successful',
-                'user_id': user.id,
-                'role': user.role
+                'user_id': user['id'],
+                'role': user['role']
             }), 200
         else:
             return jsonify({'msg': 'Invalid credentials'}), 401
@@ -164,12 +202,12 @@ def login():
 @app.route('/faculty/session/create', methods=['POST'])
 def create_session():
     """Create a new attendance session with QR code"""
-    global current_user
+    current_user = get_current_user()
     if not current_user:
         return jsonify({'msg': 'Please login first'}), 401
     
-    if current_user.role != 'faculty':
-        return jsonify({'msg': 'Access Denied: Faculty access required. You are logged in as ' + current_user.role}), 403
+    if current_user['role'] != 'faculty':
+        return jsonify({'msg': 'Access Denied: Faculty access required. You are logged in as ' + current_user['role']}), 403
     
     try:
         data = request.get_json()
@@ -178,42 +216,52 @@ def create_session():
         if not course_id:
             return jsonify({'msg': 'Course ID is required'}), 400
         
-        # Create session
-        session = Session(course_id, current_user.id)
-        storage.add_session(session)
-        
-        # Generate QR code image
-        qr = qrcode.QRCode(
-            version=1,
-            box_size=10,
-            border=4,
+        # Create session with a fresh token valid for 3 minutes
+        session = repository.create_session(
+            course_id,
+            current_user['id'],
+            str(uuid.uuid4()),
+            datetime.now() + timedelta(minutes=3)
         )
-        qr.add_data(session.qr_code_token)
-        qr.make(fit=True)
         
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to base64
-        buffer = io.BytesIO()
-        img.save(buffer, 'PNG')
-        buffer.seek(0)
-        img_base64 = base64.b64encode(buffer.getvalue()).decode()
+        # qrcode pulls in PIL; import it on first use, not at startup
+        import qrcode
+        with timer('qr_render_seconds'):
+            # Generate QR code image
+            qr = qrcode.QRCode(
+                version=1,
+                box_size=10,
+                border=4,
+            )
+            qr.add_data(session['qr_code_token'])
+            qr.make(fit=True)
+            
+            img = qr.make_image(fill_color="black", back_color="white")
+            
+            # Convert to base64
+            buffer = io.BytesIO()
+            img.save(buffer, 'PNG')
+            buffer.seek(0)
+            img_base64 = base64.b64encode(buffer.getvalue()).decode()
         
+        resource_versions.bump('stats')
         return jsonify({
             'msg': 'Session created successfully',
-            'session_id': session.id,
-            'qr_code_token': session.qr_code_token,
+            'session_id': session['id'],
+            'qr_code_token': session['qr_code_token'],
             'qr_code_image': f'data:image/png;base64,{img_base64}',
-            'expiration': session.qr_expiration
+            'expiration': session['qr_expiration']
         }), 201
     except Exception as e:
         return jsonify({'msg': 'Failed to create session', 'error': str(e)}), 500
 
 @app.route('/student/attendance/mark', methods=['POST'])
+@traced('mark_attendance')
 def mark_attendance():
     """Mark attendance using QR code token"""
-    global current_user
-    if not current_user or current_user.role != 'student':
+    with span('auth.session'):
+        current_user = get_current_user()
+    if not current_user or current_user['role'] != 'student':
         return jsonify({'msg': 'Unauthorized'}), 401
     
     try:
@@ -224,89 +272,263 @@ def mark_attendance():
             return jsonify({'msg': 'QR token is required'}), 400
         
         # Find the session with the QR token
-        session = storage.get_session_by_token(qr_token)
+        with span('session.lookup'):
+            session = repository.get_session_by_token(qr_token)
         
         if not session:
             return jsonify({'msg': 'Invalid QR code'}), 400
         
         # Check if session is still active
-        expiration = datetime.fromisoformat(session.qr_expiration)
-        if not session.is_active or expiration < datetime.now():
+        if not session['is_active'] or session['qr_expiration'] < datetime.now():
             return jsonify({'msg': 'QR code has expired'}), 400
         
         # Get student profile
-        student = storage.get_student_by_user_id(current_user.id)
+        with span('student.lookup'):
+            student = repository.get_student_by_user_id(current_user['id'])
         
         if not student:
             return jsonify({'msg': 'Student profile not found'}), 404
         
-        # Mark attendance
-        attendance = Attendance(session.id, student.id)
-        storage.add_attendance(attendance)
+        # Mark attendance; the repository rejects a second mark for the session
+        marked_at = datetime.now()
+        with span('attendance.mark'):
+            marked = repository.mark_attendance(session, student['id'], marked_at)
+        if not marked:
+            return jsonify({'msg': 'Attendance already marked for this session'}), 400
+        
+        # The demo has no enrollment screen; scanning a course's QR code enrolls
+        # the student so the course report lists them
+        with span('enrollment.update'):
+            repository.enroll(student['id'], session['course_id'])
+        with span('live.publish'):
+            publish_attendance(session['id'], student['student_id'], student['full_name'], marked_at)
+        resource_versions.bump(f"history:{current_user['id']}", 'stats')
+        
+        with span('serialize'):
+            response = jsonify({
+                'msg': 'Attendance marked successfully',
+                'session_id': session['id'],
+                'marked_at': marked_at
+            })
+        return response, 201
+    except Exception as e:
+        return jsonify({'msg': 'Failed to mark attendance', 'error': str(e)}), 500
+
+@app.route('/student/attendance/mark/batch', methods=['POST'])
+def mark_attendance_batch():
+    """Mark attendance for scans the mobile app queued while offline"""
+    current_user = get_current_user()
+    if not current_user or current_user['role'] != 'student':
+        return jsonify({'msg': 'Unauthorized'}), 401
+    
+    try:
+        data = request.get_json() or {}
+        scans = data.get('scans')
         
-        return jsonify({
-            'msg': 'Attendance marked successfully',
-            'session_id': session.id,
-            'marked_at': attendance.marked_at
-        }), 201
+        if not isinstance(scans, list) or not scans:
+            return jsonify({'msg': 'scans must be a non-empty list'}), 400
+        if len(scans) > MAX_BATCH_SIZE:
+            return jsonify({'msg': f'At most {MAX_BATCH_SIZE} scans per batch'}), 413
+        
+        student = repository.get_student_by_user_id(current_user['id'])
+        if not student:
+            return jsonify({'msg': 'Student profile not found'}), 404
+        
+        # Check every scan against its session's window at capture time
+        accepted, results = validate_scans(
+            repository, scans, data.get('sent_at'), datetime.now(),
+            max_delay=timedelta(seconds=app.config['OFFLINE_SCAN_MAX_DELAY']),
+            max_skew=timedelta(seconds=app.config['OFFLINE_SCAN_MAX_CLOCK_SKEW']),
+            server_tz=None
+        )
+        
+        # One repository call for the whole batch
+        marked = repository.mark_attendance_batch([(session, student['id'], marked_at) for _, session, marked_at in accepted])
+        for (index, session, marked_at), ok in zip(accepted, marked):
+            if not ok:
+                results[index].update(status='already_marked', msg='Attendance already marked for this session')
+                continue
+            results[index].update(status='marked', session_id=session['id'], marked_at=marked_at)
+            repository.enroll(student['id'], session['course_id'])
+            publish_attendance(session['id'], student['student_id'], student['full_name'], marked_at)
+        
+        total = sum(marked)
+        if total:
+            resource_versions.bump(f"history:{current_user['id']}", 'stats')
+        
+        return jsonify({'marked': total, 'results': results}), 200
     except Exception as e:
         return jsonify({'msg': 'Failed to mark attendance', 'error': str(e)}), 500
 
+@app.route('/faculty/session/<session_id>/live', methods=['GET'])
+def live_session_attendances(session_id):
+    """Stream newly marked attendances for a session as Server-Sent Events"""
+    current_user = get_current_user()
+    if not current_user or current_user['role'] != 'faculty':
+        return jsonify({'msg': 'Unauthorized'}), 401
+    
+    session = repository.get_session(session_id)
+    if not session or session['faculty_id'] != current_user['id']:
+        return jsonify({'msg': 'Session not found or unauthorized'}), 404
+    
+    count = repository.session_attendance_count(session_id)
+    return live_response(session_id, count)
+
+# Payloads shared by the read views and /dashboard/bootstrap
+
+def history_items(student):
+    """Attendance history rows of a student"""
+    return [
+        {'session_id': att['session_id'], 'marked_at': att['marked_at'], 'course_id': att['course_id']}
+        for att in repository.student_history(student['id'])
+    ]
+
+def student_profile(user, student):
+    return {
+        'username': user['username'],
+        'email': user['email'],
+        'student_id': student['student_id'],
+        'full_name': student['full_name'],
+        'department': student['department'],
+        'semester': student['semester']
+    }
+
+def faculty_profile(user, faculty):
+    return {
+        'username': user['username'],
+        'email': user['email'],
+        'faculty_id': faculty['faculty_id'],
+        'full_name': faculty['full_name'],
+        'department': faculty['department']
+    }
+
+def faculty_course_items(faculty):
+    """Courses assigned to a faculty member"""
+    return [
+        {
+            'id': course['id'],
+            'course_code': course['course_code'],
+            'course_name': course['course_name'],
+            'department': course['department'],
+            'semester': course['semester']
+        }
+        for course in repository.list_courses(faculty_id=faculty['id'])
+    ]
+
+def user_items():
+    """Every user, with the name and department of their profile"""
+    users_data = []
+    for user in repository.list_users():
+        user_info = {
+            'id': user['id'],
+            'username': user['username'],
+            'email': user['email'],
+            'role': user['role']
+        }
+        
+        if user['role'] == 'student':
+            student = repository.get_student_by_user_id(user['id'])
+            if student:
+                user_info['full_name'] = student['full_name']
+                user_info['student_id'] = student['student_id']
+                user_info['department'] = student['department']
+        elif user['role'] == 'faculty':
+            faculty = repository.get_faculty_by_user_id(user['id'])
+            if faculty:
+                user_info['full_name'] = faculty['full_name']
+                user_info['faculty_id'] = faculty['faculty_id']
+                user_info['department'] = faculty['department']
+                
+        users_data.append(user_info)
+    return users_data
+
+def course_items():
+    """Every course with the name of its faculty"""
+    courses_data = []
+    for course in repository.list_courses():
+        faculty = repository.get_faculty(course['faculty_id']) if course['faculty_id'] else None
+        courses_data.append({
+            'id': course['id'],
+            'course_code': course['course_code'],
+            'course_name': course['course_name'],
+            'department': course['department'],
+            'semester': course['semester'],
+            'faculty_name': faculty['full_name'] if faculty else 'Not assigned'
+        })
+    return courses_data
+
+def session_items():
+    """Every session with its course name and attendance count"""
+    sessions_data = []
+    for session in repository.list_sessions():
+        course = repository.get_course(session['course_id'])
+        sessions_data.append({
+            'id': session['id'],
+            'course': course['course_name'] if course else 'Unknown',
+            'session_date': session['session_date'],
+            'is_active': session['is_active'],
+            'total_attendances': repository.session_attendance_count(session['id'])
+        })
+    return sessions_data
+
+def admin_stats():
+    # Row totals without materializing the records
+    counts = repository.counts()
+    return {
+        'total_students': counts['students'],
+        'total_faculty': counts['faculties'],
+        'total_courses': counts['courses'],
+        'total_sessions': counts['sessions'],
+        'total_attendances': counts['attendances']
+    }
+
 @app.route('/student/attendance/history', methods=['GET'])
 def get_student_attendance_history():
     """Get attendance history for the logged-in student"""
-    global current_user
-    if not current_user or current_user.role != 'student':
+    current_user = get_current_user()
+    if not current_user or current_user['role'] != 'student':
         return jsonify({'msg': 'Unauthorized'}), 401
     
+    etag = resource_versions.etag(current_user['id'], f"history:{current_user['id']}")
+    if is_fresh(etag):
+        return not_modified(etag)
+    
     try:
         # Get student profile
-        student = storage.get_student_by_user_id(current_user.id)
+        student = repository.get_student_by_user_id(current_user['id'])
         
         if not student:
             return jsonify({'msg': 'Student profile not found'}), 404
         
-        # Get all attendances for this student
-        attendances = storage.get_attendances_by_student(student.id)
-        
         # Prepare attendance data
-        attendance_data = []
-        for att in attendances:
-            session = storage.get_session(att.session_id)
-            attendance_data.append({
-                'session_id': att.session_id,
-                'marked_at': att.marked_at,
-                'course_id': session.course_id if session else None
-            })
-        
-        return jsonify({
-            'student_name': student.full_name,
-            'total_attendances': len(attendance_data),
-            'attendance_history': attendance_data
-        }), 200
+        attendance_data = history_items(student)
+        
+        return with_etag(json_list_response(
+            'attendance_history',
+            attendance_data,
+            student_name=student['full_name'],
+            total_attendances=len(attendance_data)
+        ), etag)
     except Exception as e:
         return jsonify({'msg': 'Failed to retrieve attendance history', 'error': str(e)}), 500
 
 @app.route('/student/profile', methods=['GET'])
 def get_student_profile():
     """Get student profile information"""
-    global current_user
-    if not current_user or current_user.role != 'student':
+    current_user = get_current_user()
+    if not current_user or current_user['role'] != 'student':
         return jsonify({'msg': 'Unauthorized'}), 401
     
+    etag = resource_versions.etag(current_user['id'], 'profile')
+    if is_fresh(etag):
+        return not_modified(etag)
+    
     try:
-        student = storage.get_student_by_user_id(current_user.id)
+        student = repository.get_student_by_user_id(current_user['id'])
         if not student:
             return jsonify({'msg': 'Student profile not found'}), 404
         
-        return jsonify({
-            'username': current_user.username,
-            'email': current_user.email,
-            'student_id': student.student_id,
-            'full_name': student.full_name,
-            'department': student.department,
-            'semester': student.semester
-        }), 200
+        return with_etag(jsonify(student_profile(current_user, student)), etag)
     except Exception as e:
         return jsonify({'msg': 'Failed to retrieve profile', 'error': str(e)}), 500
 
@@ -314,70 +536,63 @@ def get_student_profile():
 @app.route('/faculty/courses', methods=['GET'])
 def get_faculty_courses():
     """Get courses assigned to the logged-in faculty"""
-    global current_user
+    current_user = get_current_user()
     if not current_user:
         return jsonify({'msg': 'Please login first'}), 401
     
-    if current_user.role != 'faculty':
+    if current_user['role'] != 'faculty':
         return jsonify({'msg': 'Access Denied: Faculty access required'}), 403
     
+    etag = resource_versions.etag(current_user['id'], 'courses')
+    if is_fresh(etag):
+        return not_modified(etag)
+    
     try:
-        faculty = storage.get_faculty_by_user_id(current_user.id)
+        faculty = repository.get_faculty_by_user_id(current_user['id'])
         if not faculty:
             return jsonify({'msg': 'Faculty profile not found'}), 404
         
         # Get courses assigned to this faculty
-        courses_data = []
-        for course in storage.courses.values():
-            if course.faculty_id == faculty.id:
-                courses_data.append({
-                    'id': course.id,
-                    'course_code': course.course_code,
-                    'course_name': course.course_name,
-                    'department': course.department,
-                    'semester': course.semester
-                })
+        courses_data = faculty_course_items(faculty)
         
-        return jsonify({
+        return with_etag(jsonify({
             'total_courses': len(courses_data),
             'courses': courses_data
-        }), 200
+        }), etag)
     except Exception as e:
         return jsonify({'msg': 'Failed to retrieve courses', 'error': str(e)}), 500
 
 @app.route('/faculty/course/create', methods=['POST'])
 def create_course():
     """Create a new course (Faculty)"""
-    global current_user
-    if not current_user or current_user.role != 'faculty':
+    current_user = get_current_user()
+    if not current_user or current_user['role'] != 'faculty':
         return jsonify({'msg': 'Unauthorized'}), 401
     
     try:
         data = request.get_json()
-        faculty = storage.get_faculty_by_user_id(current_user.id)
+        faculty = repository.get_faculty_by_user_id(current_user['id'])
         
         if not faculty:
             return jsonify({'msg': 'Faculty profile not found'}), 404
         
         # Check if course code already exists
-        for course in storage.courses.values():
-            if course.course_code == data['course_code']:
-                return jsonify({'msg': 'Course code already exists'}), 400
+        if repository.get_course_by_code(data['course_code']):
+            return jsonify({'msg': 'Course code already exists'}), 400
         
         # Create course
-        course = Course(
+        course = repository.create_course(
             course_code=data['course_code'],
             course_name=data['course_name'],
             department=data.get('department'),
             semester=data.get('semester'),
-            faculty_id=faculty.id
+            faculty_id=faculty['id']
         )
-        
-        storage.add_course(course)
+        resource_versions.bump('courses', 'stats')
         
         return jsonify({
             'msg': 'Course created successfully',
-            'course_id': course.id
+            'course_id': course['id']
         }), 201
     except Exception as e:
         return jsonify({'msg': 'Failed to create course', 'error': str(e)}), 500
@@ -385,25 +600,26 @@ def create_course():
 @app.route('/faculty/course/<course_id>', methods=['DELETE'])
 def delete_course(course_id):
     """Delete a course (Faculty - only their own courses)"""
-    global current_user
-    if not current_user or current_user.role != 'faculty':
+    current_user = get_current_user()
+    if not current_user or current_user['role'] != 'faculty':
         return jsonify({'msg': 'Unauthorized'}), 401
     
     try:
-        faculty = storage.get_faculty_by_user_id(current_user.id)
+        faculty = repository.get_faculty_by_user_id(current_user['id'])
         if not faculty:
             return jsonify({'msg': 'Faculty profile not found'}), 404
         
-        course = storage.get_course(course_id)
+        course = repository.get_course(course_id)
         if not course:
             return jsonify({'msg': 'Course not found'}), 404
         
         # Check if course belongs to this faculty
-        if course.faculty_id != faculty.id:
+        if course['faculty_id'] != faculty['id']:
             return jsonify({'msg': 'Unauthorized - not your course'}), 403
         
         # Delete course
-        del storage.courses[course_id]
+        repository.delete_course(course_id)
+        resource_versions.bump('courses', 'stats')
         
         return jsonify({'msg': 'Course deleted successfully'}), 200
     except Exception as e:
@@ -412,33 +628,27 @@ def delete_course(course_id):
 @app.route('/faculty/profile', methods=['GET'])
 def get_faculty_profile():
     """Get faculty profile information"""
-    global current_user
-    if not current_user or current_user.role != 'faculty':
+    current_user = get_current_user()
+    if not current_user or current_user['role'] != 'faculty':
         return jsonify({'msg': 'Unauthorized'}), 401
     
     try:
-        faculty = storage.get_faculty_by_user_id(current_user.id)
+        faculty = repository.get_faculty_by_user_id(current_user['id'])
         if not faculty:
             return jsonify({'msg': 'Faculty profile not found'}), 404
         
-        return jsonify({
-            'username': current_user.username,
-            'email': current_user.email,
-            'faculty_id': faculty.faculty_id,
-            'full_name': faculty.full_name,
-            'department': faculty.department
-        }), 200
+        return jsonify(faculty_profile(current_user, faculty)), 200
     except Exception as e:
         return jsonify({'msg': 'Failed to retrieve profile', 'error': str(e)}), 500
 
 @app.route('/faculty/attendance/report', methods=['GET'])
 def get_attendance_report():
     """Get attendance report for a specific course (Faculty only)"""
-    global current_user
+    current_user = get_current_user()
     if not current_user:
         return jsonify({'msg': 'Please login first'}), 401
     
-    if current_user.role != 'faculty':
+    if current_user['role'] != 'faculty':
         return jsonify({'msg': 'Access Denied: Faculty access required'}), 403
     
     try:
@@ -446,41 +656,10 @@ def get_attendance_report():
         if not course_id:
             return jsonify({'msg': 'Course ID is required'}), 400
         
-        # Get all students
-        all_students = storage.students
-        
-        # Sample data - In production, this would query actual attendance records
-        # For now, generating sample data based on course
-        students_data = []
-        total_sessions = 20  # Sample: assume 20 sessions per course
+        # Attendance totals are maintained incrementally by the repository
+        report = repository.course_report(course_id)
         
-        for student in all_students:
-            # Generate sample attendance (in production, query actual records)
-            import random
-            classes_attended = random.randint(10, 20)
-            attendance_percentage = round((classes_attended / total_sessions) * 100, 1)
-            
-            students_data.append({
-                'student_id': student.student_id,
-                'student_name': student.full_name,
-                'classes_attended': classes_attended,
-                'total_classes': total_sessions,
-                'attendance_percentage': attendance_percentage
-            })
-        
-        # Calculate average attendance
-        if students_data:
-            avg_attendance = round(sum(s['attendance_percentage'] for s in students_data) / len(students_data), 1)
-        else:
-            avg_attendance = 0
-        
-        return jsonify({
-            'course_id': course_id,
-            'total_students': len(students_data),
-            'total_sessions': total_sessions,
-            'average_attendance': avg_attendance,
-            'students': students_data
-        }), 200
+        return jsonify(report), 200
         
     except Exception as e:
         print(f"Attendance report error: {str(e)}")
@@ -490,67 +669,32 @@ def get_attendance_report():
 @app.route('/admin/users', methods=['GET'])
 def get_all_users():
     """Get all users (Admin only)"""
-    global current_user
+    current_user = get_current_user()
     if not current_user:
         return jsonify({'msg': 'Please login first'}), 401
     
-    if current_user.role != 'admin':
+    if current_user['role'] != 'admin':
         return jsonify({'msg': 'Access Denied: Administrator access required'}), 403
     
     try:
-        users_data = []
-        for user in storage.users.values():
-            user_info = {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'role': user.role
-            }
-            
-            if user.role == 'student':
-                student = storage.get_student_by_user_id(user.id)
-                if student:
-                    user_info['full_name'] = student.full_name
-                    user_info['student_id'] = student.student_id
-                    user_info['department'] = student.department
-            elif user.role == 'faculty':
-                faculty = storage.get_faculty_by_user_id(user.id)
-                if faculty:
-                    user_info['full_name'] = faculty.full_name
-                    user_info['faculty_id'] = faculty.faculty_id
-                    user_info['department'] = faculty.department
-                    
-            users_data.append(user_info)
+        users_data = user_items()
         
-        return jsonify({
-            'total_users': len(users_data),
-            'users': users_data
-        }), 200
+        return json_list_response('users', users_data, total_users=len(users_data))
     except Exception as e:
         return jsonify({'msg': 'Failed to retrieve users', 'error': str(e)}), 500
 
 @app.route('/admin/courses', methods=['GET'])
 def get_all_courses():
     """Get all courses (Admin only)"""
-    global current_user
+    current_user = get_current_user()
     if not current_user:
         return jsonify({'msg': 'Please login first'}), 401
     
-    if current_user.role != 'admin':
+    if current_user['role'] != 'admin':
         return jsonify({'msg': 'Access Denied: Administrator access required'}), 403
     
     try:
-        courses_data = []
-        for course in storage.courses.values():
-            faculty = storage.get_faculty(course.faculty_id) if course.faculty_id else None
-            courses_data.append({
-                'id': course.id,
-                'course_code': course.course_code,
-                'course_name': course.course_name,
-                'department': course.department,
-                'semester': course.semester,
-                'faculty_name': faculty.full_name if faculty else 'Not assigned'
-            })
+        courses_data = course_items()
         
         return jsonify({
             'total_courses': len(courses_data),
@@ -562,25 +706,15 @@ def get_all_courses():
 @app.route('/admin/sessions', methods=['GET'])
 def get_all_sessions():
     """Get all sessions (Admin only)"""
-    global current_user
+    current_user = get_current_user()
     if not current_user:
         return jsonify({'msg': 'Please login first'}), 401
     
-    if current_user.role != 'admin':
+    if current_user['role'] != 'admin':
         return jsonify({'msg': 'Access Denied: Administrator access required'}), 403
     
     try:
-        sessions_data = []
-        for session in storage.sessions.values():
-            course = storage.get_course(session.course_id)
-            attendances = storage.get_attendances_by_session(session.id)
-            sessions_data.append({
-                'id': session.id,
-                'course': course.course_name if course else 'Unknown',
-                'session_date': session.session_date.isoformat() if hasattr(session.session_date, 'isoformat') else str(session.session_date),
-                'is_active': session.is_active,
-                'total_attendances': len(attendances)
-            })
+        sessions_data = session_items()
         
         return jsonify({
             'total_sessions': len(sessions_data),
@@ -592,74 +726,170 @@ def get_all_sessions():
 @app.route('/admin/stats', methods=['GET'])
 def get_admin_stats():
     """Get dashboard statistics (Admin only)"""
-    global current_user
+    current_user = get_current_user()
     if not current_user:
         return jsonify({'msg': 'Please login first'}), 401
     
-    if current_user.role != 'admin':
+    if current_user['role'] != 'admin':
         return jsonify({'msg': 'Access Denied: Administrator access required'}), 403
     
+    etag = resource_versions.etag(current_user['id'], 'stats')
+    if is_fresh(etag):
+        return not_modified(etag)
+    
     try:
-        total_students = len([s for s in storage.students.values()])
-        total_faculty = len([f for f in storage.faculties.values()])
-        total_courses = len([c for c in storage.courses.values()])
-        total_sessions = len([s for s in storage.sessions.values()])
-        total_attendances = len([a for a in storage.attendances.values()])
-        
-        return jsonify({
-            'total_students': total_students,
-            'total_faculty': total_faculty,
-            'total_courses': total_courses,
-            'total_sessions': total_sessions,
-            'total_attendances': total_attendances
-        }), 200
+        return with_etag(jsonify(admin_stats()), etag)
     except Exception as e:
         return jsonify({'msg': 'Failed to retrieve statistics', 'error': str(e)}), 500
 
 @app.route('/admin/profile', methods=['GET'])
 def get_admin_profile():
     """Get admin profile information"""
-    global current_user
-    if not current_user or current_user.role != 'admin':
+    current_user = get_current_user()
+    if not current_user or current_user['role'] != 'admin':
         return jsonify({'msg': 'Unauthorized'}), 401
     
     try:
         return jsonify({
-            'username': current_user.username,
-            'email': current_user.email,
-            'role': current_user.role
+            'username': current_user['username'],
+            'email': current_user['email'],
+            'role': current_user['role']
         }), 200
     except Exception as e:
         return jsonify({'msg': 'Failed to retrieve profile', 'error': str(e)}), 500
 
-if __name__ == '__main__':
-    # Add sample data for testing
+# Version counters each role's first screen depends on. 'stats' is bumped by
+# every write the admin lists show (users, courses, sessions, attendances)
+BOOTSTRAP_RESOURCES = {
+    'student': lambda user_id: ('profile', f'history:{user_id}'),
+    'faculty': lambda user_id: ('profile', 'courses'),
+    'admin': lambda user_id: ('profile', 'stats')
+}
+
+@app.route('/dashboard/bootstrap', methods=['GET'])
+def get_dashboard_bootstrap():
+    """Everything the first screen of the logged-in role shows, in one response"""
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({'msg': 'Please login first'}), 401
+    
+    role = current_user['role']
+    if role not in BOOTSTRAP_RESOURCES:
+        return jsonify({'msg': 'Unknown role'}), 403
+    
+    etag = resource_versions.etag(current_user['id'], *BOOTSTRAP_RESOURCES[role](current_user['id']))
+    if is_fresh(etag):
+        return not_modified(etag)
+    
+    try:
+        # Each section has the shape of the endpoint it replaces, and all of
+        # them reuse the user and profile looked up once here
+        payload = {'role': role}
+        if role == 'student':
+            student = repository.get_student_by_user_id(current_user['id'])
+            if not student:
+                return jsonify({'msg': 'Student profile not found'}), 404
+            history = history_items(student)
+            payload['profile'] = student_profile(current_user, student)
+            payload['history'] = {
+                'student_name': student['full_name'],
+                'total_attendances': len(history),
+                'attendance_history': history
+            }
+        elif role == 'faculty':
+            faculty = repository.get_faculty_by_user_id(current_user['id'])
+            if not faculty:
+                return jsonify({'msg': 'Faculty profile not found'}), 404
+            courses = faculty_course_items(faculty)
+            payload['profile'] = faculty_profile(current_user, faculty)
+            payload['courses'] = {'total_courses': len(courses), 'courses': courses}
+        else:
+            users, courses, sessions = user_items(), course_items(), session_items()
+            payload['profile'] = {
+                'username': current_user['username'],
+                'email': current_user['email'],
+                'role': role
+            }
+            payload['stats'] = admin_stats()
+            payload['users'] = {'total_users': len(users), 'users': users}
+            payload['courses'] = {'total_courses': len(courses), 'courses': courses}
+            payload['sessions'] = {'total_sessions': len(sessions), 'sessions': sessions}
+        
+        return with_etag(jsonify(payload), etag)
+    except Exception as e:
+        return jsonify({'msg': 'Failed to load dashboard', 'error': str(e)}), 500
+
+@app.route('/admin/memory', methods=['GET'])
+def get_memory_report():
+    """Estimate memory held per collection and per record (Admin only)"""
+    current_user = get_current_user()
+    if not current_user or current_user['role'] != 'admin':
+        return jsonify({'msg': 'Unauthorized'}), 401
+    
+    try:
+        limit_mb = request.args.get('limit_mb', type=float)
+        report = repository_footprint(
+            repository,
+            sample_size=request.args.get('sample', 1000, type=int),
+            limit_bytes=int(limit_mb * 1024 * 1024) if limit_mb else None
+        )
+        report['tracemalloc'] = memory_tracker.status()
+        return jsonify(report), 200
+    except Exception as e:
+        return jsonify({'msg': 'Failed to measure memory', 'error': str(e)}), 500
+
+@app.route('/admin/memory/snapshot', methods=['POST', 'DELETE'])
+def memory_snapshot():
+    """Take a tracemalloc snapshot and diff it, or stop tracing (Admin only)"""
+    current_user = get_current_user()
+    if not current_user or current_user['role'] != 'admin':
+        return jsonify({'msg': 'Unauthorized'}), 401
+    
+    try:
+        if request.method == 'DELETE':
+            memory_tracker.stop()
+            return jsonify({'msg': 'Memory tracing stopped'}), 200
+        
+        # The first call starts tracing and records the baseline
+        return jsonify(memory_tracker.snapshot(
+            frames=request.args.get('frames', 1, type=int),
+            top=request.args.get('top', 20, type=int),
+            key_type=request.args.get('group', 'lineno')
+        )), 200
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+    except Exception as e:
+        return jsonify({'msg': 'Failed to take memory snapshot', 'error': str(e)}), 500
+
+def seed_sample_data():
+    """Add sample data for testing"""
     # Create admin user
-    admin_user = User('admin', 'admin@college.edu', 'admin123', 'admin')
-    storage.add_user(admin_user)
+    repository.create_user('admin', 'admin@college.edu', 'admin123', 'admin')
     
     # Create a faculty user
-    faculty_user = User('prof_smith', 'smith@college.edu', 'password123', 'faculty')
-    storage.add_user(faculty_user)
-    
-    faculty = Faculty(faculty_user.id, 'F001', 'Professor Smith', 'Computer Science')
-    storage.add_faculty(faculty)
+    faculty_user = repository.create_user('prof_smith', 'smith@college.edu', 'password123', 'faculty')
+    faculty = repository.create_faculty(faculty_user['id'], 'F001', 'Professor Smith', 'Computer Science')
     
     # Create a course
-    course = Course('CS101', 'Introduction to Computer Science', 'Computer Science', 1, faculty.id)
-    storage.add_course(course)
+    repository.create_course('CS101', 'Introduction to Computer Science', 'Computer Science', 1, faculty['id'])
     
     # Create a student user
-    student_user = User('john_doe', 'john@student.edu', 'password123', 'student')
-    storage.add_user(student_user)
-    
-    student = Student(student_user.id, 'S001', 'John Doe', 'Computer Science', 1)
-    storage.add_student(student)
+    student_user = repository.create_user('john_doe', 'john@student.edu', 'password123', 'student')
+    repository.create_student(student_user['id'], 'S001', 'John Doe', 'Computer Science', 1)
     
     print("Sample data created:")
     print("- Admin: admin / admin123")
     print("- Faculty: prof_smith / password123")
     print("- Student: john_doe / password123")
     print("- Course: CS101")
+
+def create_demo_app():
+    """Entry point for production servers (e.g. gunicorn 'simple_app:create_demo_app()')"""
+    build_assets(app)
+    seed_sample_data()
+    return app
+
+if __name__ == '__main__':
+    seed_sample_data()
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,1271 @@
+let currentUser = null;
+
+// Last body and ETag per URL; the server answers 304 while they are current
+const etagCache = new Map();
+
+async function cachedFetch(url) {
+    const cached = etagCache.get(url);
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+    const response = await fetch(url, { headers, cache: 'no-store' });
+    if (response.status === 304 && cached) {
+        return new Response(cached.body, { status: 200, headers: { 'Content-Type': 'application/json' } });
+    }
+    const etag = response.headers.get('ETag');
+    if (response.ok && etag) {
+        etagCache.set(url, { etag, body: await response.clone().text() });
+    } else {
+        etagCache.delete(url);
+    }
+    return response;
+}
+
+// Toggle Mobile Menu
+function toggleMobileMenu() {
+    const sidebar = document.getElementById('sidebar');
+    const overlay = document.getElementById('mobile-overlay');
+    sidebar.classList.toggle('active');
+    overlay.classList.toggle('active');
+}
+
+// Close mobile menu when navigation item is clicked
+function closeMobileMenu() {
+    if (window.innerWidth <= 768) {
+        const sidebar = document.getElementById('sidebar');
+        const overlay = document.getElementById('mobile-overlay');
+        sidebar.classList.remove('active');
+        overlay.classList.remove('active');
+    }
+}
+
+// Show/Hide Login and Signup
+function showSignup(event) {
+    event.preventDefault();
+    document.getElementById('login-screen').style.display = 'none';
+    document.getElementById('signup-screen').style.display = 'flex';
+}
+
+function showLogin(event) {
+    event.preventDefault();
+    document.getElementById('signup-screen').style.display = 'none';
+    document.getElementById('login-screen').style.display = 'flex';
+    // Reset signup forms
+    document.getElementById('signup-role').value = '';
+    document.querySelectorAll('#signup-screen form').forEach(form => {
+        form.style.display = 'none';
+        form.reset();
+    });
+}
+
+// Handle role selection in signup
+function handleRoleChange() {
+    const role = document.getElementById('signup-role').value;
+
+    // Hide all forms
+    document.getElementById('student-signup-form').style.display = 'none';
+    document.getElementById('faculty-signup-form').style.display = 'none';
+    document.getElementById('admin-signup-form').style.display = 'none';
+
+    // Show selected form
+    if (role === 'student') {
+        document.getElementById('student-signup-form').style.display = 'block';
+    } else if (role === 'faculty') {
+        document.getElementById('faculty-signup-form').style.display = 'block';
+    } else if (role === 'admin') {
+        document.getElementById('admin-signup-form').style.display = 'block';
+    }
+}
+
+// Student Signup Handler
+async function handleStudentSignup(event) {
+    event.preventDefault();
+
+    const password = document.getElementById('student-signup-password').value;
+    const confirm = document.getElementById('student-signup-confirm').value;
+
+    if (password !== confirm) {
+        showAlert('student-signup-alert', 'Passwords do not match!', 'error');
+        return;
+    }
+
+    if (password.length < 6) {
+        showAlert('student-signup-alert', 'Password must be at least 6 characters!', 'error');
+        return;
+    }
+
+    const data = {
+        username: document.getElementById('student-signup-username').value,
+        email: document.getElementById('student-signup-email').value,
+        password: password,
+        student_id: document.getElementById('student-signup-id').value,
+        full_name: document.getElementById('student-signup-name').value,
+        department: document.getElementById('student-signup-dept').value,
+        semester: parseInt(document.getElementById('student-signup-sem').value) || null
+    };
+
+    try {
+        const response = await fetch('/register/student', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+
+        const result = await response.json();
+
+        if (response.ok) {
+            showAlert('student-signup-alert', result.msg + ' - Redirecting to login...', 'success');
+            setTimeout(() => {
+                showLogin({ preventDefault: () => {} });
+            }, 2000);
+        } else {
+            showAlert('student-signup-alert', result.msg, 'error');
+        }
+    } catch (error) {
+        showAlert('student-signup-alert', 'Registration failed: ' + error.message, 'error');
+    }
+}
+
+// Faculty Signup Handler
+async function handleFacultySignup(event) {
+    event.preventDefault();
+
+    const password = document.getElementById('faculty-signup-password').value;
+    const confirm = document.getElementById('faculty-signup-confirm').value;
+
+    if (password !== confirm) {
+        showAlert('faculty-signup-alert', 'Passwords do not match!', 'error');
+        return;
+    }
+
+    if (password.length < 6) {
+        showAlert('faculty-signup-alert', 'Password must be at least 6 characters!', 'error');
+        return;
+    }
+
+    const data = {
+        username: document.getElementById('faculty-signup-username').value,
+        email: document.getElementById('faculty-signup-email').value,
+        password: password,
+        faculty_id: document.getElementById('faculty-signup-id').value,
+        full_name: document.getElementById('faculty-signup-name').value,
+        department: document.getElementById('faculty-signup-dept').value
+    };
+
+    try {
+        const response = await fetch('/register/faculty', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+
+        const result = await response.json();
+
+        if (response.ok) {
+            showAlert('faculty-signup-alert', result.msg + ' - Redirecting to login...', 'success');
+            setTimeout(() => {
+                showLogin({ preventDefault: () => {} });
+            }, 2000);
+        } else {
+            showAlert('faculty-signup-alert', result.msg, 'error');
+        }
+    } catch (error) {
+        showAlert('faculty-signup-alert', 'Registration failed: ' + error.message, 'error');
+    }
+}
+
+// Admin Signup Handler
+async function handleAdminSignup(event) {
+    event.preventDefault();
+
+    const password = document.getElementById('admin-signup-password').value;
+    const confirm = document.getElementById('admin-signup-confirm').value;
+    const adminCode = document.getElementById('admin-signup-code').value;
+
+    console.log('Admin signup attempt with code:', adminCode);
+
+    if (password !== confirm) {
+        showAlert('admin-signup-alert', 'Passwords do not match!', 'error');
+        return;
+    }
+
+    if (password.length < 6) {
+        showAlert('admin-signup-alert', 'Password must be at least 6 characters!', 'error');
+        return;
+    }
+
+    const data = {
+        username: document.getElementById('admin-signup-username').value,
+        email: document.getElementById('admin-signup-email').value,
+        password: password,
+        admin_code: adminCode
+    };
+
+    console.log('Sending admin registration data:', { ...data, password: '***', admin_code: '***' });
+
+    try {
+        const response = await fetch('/register/admin', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+
+        const result = await response.json();
+        console.log('Admin registration response:', response.status, result);
+
+        if (response.ok) {
+            showAlert('admin-signup-alert', result.msg + ' - Redirecting to login...', 'success');
+            setTimeout(() => {
+                showLogin({ preventDefault: () => {} });
+            }, 2000);
+        } else {
+            showAlert('admin-signup-alert', result.msg || 'Registration failed', 'error');
+        }
+    } catch (error) {
+        console.error('Admin registration error:', error);
+        showAlert('admin-signup-alert', 'Registration failed: ' + error.message, 'error');
+    }
+}
+
+// Navigation Configuration
+const navigation = {
+    student: [
+        { id: 'student-dashboard', label: '🏠 Dashboard', icon: '🏠' },
+        { id: 'profile-screen', label: '👤 Profile', icon: '👤' }
+    ],
+    faculty: [
+        { id: 'faculty-dashboard', label: '🏠 Dashboard', icon: '🏠' },
+        { id: 'faculty-courses', label: '📚 My Courses', icon: '📚' },
+        { id: 'register-screen', label: '➕ Register Student', icon: '➕' },
+        { id: 'profile-screen', label: '👤 Profile', icon: '👤' }
+    ],
+    admin: [
+        { id: 'admin-dashboard', label: '🏠 Dashboard', icon: '🏠' },
+        { id: 'users-screen', label: '👥 Users', icon: '👥' },
+        { id: 'courses-screen', label: '📚 Courses', icon: '📚' },
+        { id: 'sessions-screen', label: '📝 Sessions', icon: '📝' },
+        { id: 'register-screen', label: '➕ Register Student', icon: '➕' },
+        { id: 'profile-screen', label: '👤 Profile', icon: '👤' }
+    ]
+};
+
+// Allowed screens per role
+const allowedScreens = {
+    student: ['student-dashboard', 'profile-screen'],
+    faculty: ['faculty-dashboard', 'faculty-courses', 'register-screen', 'profile-screen'],
+    admin: ['admin-dashboard', 'users-screen', 'courses-screen', 'sessions-screen', 'register-screen', 'profile-screen']
+};
+
+// Initialize navigation
+function initNavigation(role) {
+    const navMenu = document.getElementById('nav-menu');
+    navMenu.innerHTML = '';
+
+    const items = navigation[role] || [];
+    items.forEach((item, index) => {
+        const navItem = document.createElement('div');
+        navItem.className = 'nav-item' + (index === 0 ? ' active' : '');
+        navItem.innerHTML = `<span class="nav-icon">${item.icon}</span> ${item.label}`;
+        navItem.onclick = () => showScreen(item.id);
+        navMenu.appendChild(navItem);
+    });
+}
+
+// Show specific screen
+function showScreen(screenId) {
+    // Close mobile menu
+    closeMobileMenu();
+
+    // Check if user has access to this screen
+    if (currentUser && allowedScreens[currentUser.role]) {
+        if (!allowedScreens[currentUser.role].includes(screenId)) {
+            showAlert('login-alert', 'Access Denied: You do not have permission to view this screen.', 'error');
+            return;
+        }
+    }
+
+    // Hide all screens
+    document.querySelectorAll('.screen').forEach(screen => {
+        screen.classList.remove('active');
+    });
+
+    // Show selected screen
+    const screen = document.getElementById(screenId);
+    if (screen) {
+        screen.classList.add('active');
+    }
+
+    // Update navigation
+    document.querySelectorAll('.nav-item').forEach(item => {
+        item.classList.remove('active');
+    });
+    event.target.closest('.nav-item')?.classList.add('active');
+
+    // Load profile data if profile screen is opened
+    if (screenId === 'profile-screen') {
+        loadProfileData();
+    }
+}
+
+// Alert helper
+function showAlert(elementId, message, type = 'success') {
+    const alert = document.getElementById(elementId);
+    alert.textContent = message;
+    alert.className = `alert alert-${type} show`;
+    setTimeout(() => alert.classList.remove('show'), 5000);
+}
+
+// Login Handler
+async function handleLogin(event) {
+    event.preventDefault();
+    const username = document.getElementById('login-username').value;
+    const password = document.getElementById('login-password').value;
+
+    try {
+        const response = await fetch('/login', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ username, password })
+        });
+
+        const data = await response.json();
+
+        if (response.ok) {
+            currentUser = data;
+
+            // Hide login screen
+            document.getElementById('login-screen').style.display = 'none';
+            document.getElementById('app-container').style.display = 'flex';
+
+            // Set user info
+            document.getElementById('user-name').textContent = username;
+            document.getElementById('user-role').textContent = data.role.toUpperCase();
+
+            // Set mobile header info
+            document.getElementById('mobile-user-name').textContent = username;
+            document.getElementById('mobile-user-role').textContent = data.role.toUpperCase();
+
+            // Initialize navigation and show sidebar
+            initNavigation(data.role);
+            document.getElementById('sidebar').classList.add('active');
+
+            // Hide all screens first
+            document.querySelectorAll('.screen').forEach(screen => {
+                screen.classList.remove('active');
+            });
+
+            // Show default screen based on role
+            const defaultScreen = {
+                'student': 'student-dashboard',
+                'faculty': 'faculty-dashboard',
+                'admin': 'admin-dashboard'
+            };
+
+            const screenToShow = defaultScreen[data.role];
+            if (screenToShow) {
+                document.getElementById(screenToShow)?.classList.add('active');
+            }
+
+            // Load the first screen of the role in one request
+            loadDashboard();
+        } else {
+            showAlert('login-alert', data.msg, 'error');
+        }
+    } catch (error) {
+        showAlert('login-alert', 'Login failed: ' + error.message, 'error');
+    }
+}
+
+// Logout Handler
+function handleLogout() {
+    stopLiveFeed();
+    etagCache.clear();
+    currentUser = null;
+    document.getElementById('app-container').style.display = 'none';
+    document.getElementById('login-screen').style.display = 'flex';
+    document.getElementById('login-username').value = '';
+    document.getElementById('login-password').value = '';
+}
+
+// Register Student
+async function registerStudent(event) {
+    event.preventDefault();
+
+    const data = {
+        username: document.getElementById('reg-username').value,
+        email: document.getElementById('reg-email').value,
+        password: document.getElementById('reg-password').value,
+        student_id: document.getElementById('reg-student-id').value,
+        full_name: document.getElementById('reg-fullname').value,
+        department: document.getElementById('reg-department').value,
+        semester: parseInt(document.getElementById('reg-semester').value) || null
+    };
+
+    try {
+        const response = await fetch('/register/student', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+
+        const result = await response.json();
+        showAlert('register-alert', result.msg, response.ok ? 'success' : 'error');
+
+        if (response.ok) {
+            event.target.reset();
+        }
+    } catch (error) {
+        showAlert('register-alert', 'Registration failed: ' + error.message, 'error');
+    }
+}
+
+// Create Session (Faculty)
+async function createSession(event) {
+    event.preventDefault();
+
+    if (!currentUser || currentUser.role !== 'faculty') {
+        showAlert('session-alert', 'Unauthorized', 'error');
+        return;
+    }
+
+    const courseId = document.getElementById('course-id').value;
+
+    try {
+        const response = await fetch('/faculty/session/create', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ course_id: courseId })
+        });
+
+        const data = await response.json();
+
+        if (response.ok) {
+            showAlert('session-alert', data.msg, 'success');
+            document.getElementById('qr-image').src = data.qr_code_image;
+            document.getElementById('qr-token-display').textContent = data.qr_code_token;
+            document.getElementById('qr-expiry').textContent = 'Expires: ' + data.expiration;
+            document.getElementById('qr-code-display').style.display = 'block';
+            startLiveFeed(data.session_id);
+        } else {
+            showAlert('session-alert', data.msg, 'error');
+        }
+    } catch (error) {
+        showAlert('session-alert', 'Failed to create session: ' + error.message, 'error');
+    }
+}
+
+// Live attendance feed (Faculty projector view)
+let liveFeed = null;
+const LIVE_LIST_LIMIT = 50;
+
+function startLiveFeed(sessionId) {
+    stopLiveFeed();
+    const countEl = document.getElementById('live-count');
+    const listEl = document.getElementById('live-attendance-list');
+    countEl.textContent = '0';
+    listEl.innerHTML = '';
+
+    // The server pushes only new marks, coalesced during bursts
+    liveFeed = new EventSource(`/faculty/session/${encodeURIComponent(sessionId)}/live`);
+    liveFeed.addEventListener('snapshot', (event) => {
+        countEl.textContent = JSON.parse(event.data).count;
+    });
+    liveFeed.addEventListener('attendance', (event) => {
+        const data = JSON.parse(event.data);
+        countEl.textContent = data.count;
+        data.marked.forEach(mark => {
+            const item = document.createElement('li');
+            const time = new Date(mark.marked_at).toLocaleTimeString();
+            item.textContent = `✅ ${mark.student_name} (${mark.student_id}) at ${time}`;
+            listEl.prepend(item);
+        });
+        while (listEl.children.length > LIVE_LIST_LIMIT) {
+            listEl.lastElementChild.remove();
+        }
+    });
+}
+
+function stopLiveFeed() {
+    if (liveFeed) {
+        liveFeed.close();
+        liveFeed = null;
+    }
+}
+
+// Mark Attendance (Student)
+// Tokens already accepted on this page, and the one being submitted
+const submittedTokens = new Set();
+let submittingToken = null;
+
+async function markAttendance(event) {
+    event.preventDefault();
+    await submitAttendance(document.getElementById('qr-token-input').value);
+}
+
+async function submitAttendance(qrToken) {
+    if (!currentUser || currentUser.role !== 'student') {
+        showAlert('attendance-alert', 'Unauthorized', 'error');
+        return;
+    }
+
+    // A second scan or click must not send the same token again
+    if (qrToken === submittingToken) return;
+    if (submittedTokens.has(qrToken)) {
+        showAlert('attendance-alert', 'Attendance already marked for this session', 'success');
+        return;
+    }
+    submittingToken = qrToken;
+
+    try {
+        const response = await fetch('/student/attendance/mark', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ qr_token: qrToken })
+        });
+
+        const data = await response.json();
+        showAlert('attendance-alert', data.msg, response.ok ? 'success' : 'error');
+
+        if (response.ok) {
+            submittedTokens.add(qrToken);
+            document.getElementById('qr-token-input').value = '';
+            loadStudentHistory();
+        }
+    } catch (error) {
+        showAlert('attendance-alert', 'Failed to mark attendance: ' + error.message, 'error');
+    } finally {
+        submittingToken = null;
+    }
+}
+
+// Load Dashboard: every section the role's screens show, from one response
+async function loadDashboard() {
+    if (!currentUser) return;
+
+    try {
+        const response = await cachedFetch('/dashboard/bootstrap');
+        const data = await response.json();
+        if (!response.ok) return;
+
+        if (data.role === 'student') {
+            renderStudentHistory(data.history);
+            renderStudentProfile(data.profile, data.history);
+        } else if (data.role === 'faculty') {
+            renderFacultyCoursesCount(data.courses);
+            renderFacultyCourses(data.courses);
+            renderFacultyProfile(data.profile, data.courses);
+        } else if (data.role === 'admin') {
+            renderAdminStats(data.stats);
+            renderAllUsers(data.users);
+            renderAllCourses(data.courses);
+            renderAllSessions(data.sessions);
+            renderAdminProfile(data.profile, data.stats);
+        }
+    } catch (error) {
+        console.error('Failed to load dashboard:', error);
+    }
+}
+
+// Load Student History
+async function loadStudentHistory() {
+    if (!currentUser || currentUser.role !== 'student') return;
+
+    try {
+        const response = await cachedFetch('/student/attendance/history');
+        const data = await response.json();
+
+        if (response.ok) {
+            renderStudentHistory(data);
+        }
+    } catch (error) {
+        console.error('Failed to load history:', error);
+    }
+}
+
+function renderStudentHistory(data) {
+    const list = document.getElementById('student-history');
+    list.innerHTML = '';
+
+    document.getElementById('student-total').textContent = data.total_attendances;
+
+    data.attendance_history.forEach(att => {
+        const item = document.createElement('div');
+        item.className = 'list-item';
+        item.innerHTML = `
+            <strong>Session:</strong> ${att.session_id}<br>
+            <strong>Marked at:</strong> ${att.marked_at}
+        `;
+        list.appendChild(item);
+    });
+}
+
+// Load Faculty Sessions
+async function loadFacultySessions() {
+    // Placeholder - would fetch faculty's sessions
+    console.log('Loading faculty sessions...');
+}
+
+// Load Faculty Courses Count
+async function loadFacultyCoursesCount() {
+    try {
+        const response = await cachedFetch('/faculty/courses');
+        if (response.ok) {
+            renderFacultyCoursesCount(await response.json());
+        }
+    } catch (error) {
+        console.error('Failed to load courses count:', error);
+    }
+}
+
+function renderFacultyCoursesCount(data) {
+    document.getElementById('faculty-courses-count').textContent = data.total_courses || 0;
+}
+
+// Load Course Attendance Data
+let currentAttendanceData = [];
+
+async function loadCourseAttendance() {
+    const courseId = document.getElementById('report-course-id').value;
+    if (!courseId) {
+        alert('Please select a course first');
+        return;
+    }
+
+    try {
+        const response = await fetch(`/faculty/attendance/report?course_id=${courseId}`);
+        if (response.ok) {
+            const data = await response.json();
+            currentAttendanceData = data.students || [];
+            displayAttendanceReport(data);
+        } else {
+            const error = await response.json();
+            alert(error.msg || 'Failed to load attendance report');
+        }
+    } catch (error) {
+        console.error('Failed to load attendance:', error);
+        alert('Failed to load attendance report');
+    }
+}
+
+function displayAttendanceReport(data) {
+    // Show statistics
+    document.getElementById('attendance-stats').style.display = 'block';
+    document.getElementById('course-total-students').textContent = data.total_students || 0;
+    document.getElementById('course-total-sessions').textContent = data.total_sessions || 0;
+    document.getElementById('course-avg-attendance').textContent = (data.average_attendance || 0) + '%';
+
+    // Display table
+    document.getElementById('attendance-table-container').style.display = 'block';
+    const tbody = document.getElementById('attendance-table-body');
+    tbody.innerHTML = '';
+
+    if (data.students && data.students.length > 0) {
+        data.students.forEach(student => {
+            const percentage = student.attendance_percentage || 0;
+            let statusColor = '#dc3545'; // Red
+            let statusText = 'Poor';
+
+            if (percentage >= 75) {
+                statusColor = '#28a745'; // Green
+                statusText = 'Excellent';
+            } else if (percentage >= 60) {
+                statusColor = '#ffc107'; // Yellow
+                statusText = 'Good';
+            } else if (percentage >= 40) {
+                statusColor = '#fd7e14'; // Orange
+                statusText = 'Average';
+            }
+
+            const row = `
+                <tr style="border-bottom: 1px solid #ddd;">
+                    <td style="padding: 12px; border: 1px solid #ddd;">${student.student_id}</td>
+                    <td style="padding: 12px; border: 1px solid #ddd;">${student.student_name}</td>
+                    <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">${student.classes_attended}</td>
+                    <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">${student.total_classes}</td>
+                    <td style="padding: 12px; text-align: center; border: 1px solid #ddd; font-weight: bold; color: ${statusColor};">${percentage}%</td>
+                    <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">
+                        <span style="background: ${statusColor}; color: white; padding: 4px 12px; border-radius: 12px; font-size: 0.85em;">
+                            ${statusText}
+                        </span>
+                    </td>
+                </tr>
+            `;
+            tbody.innerHTML += row;
+        });
+    } else {
+        tbody.innerHTML = '<tr><td colspan="6" style="text-align: center; padding: 20px; color: #666;">No attendance data available for this course</td></tr>';
+    }
+}
+
+function exportAttendanceCSV() {
+    const courseId = document.getElementById('report-course-id').value;
+    if (!courseId) {
+        alert('Please select a course and load the report first');
+        return;
+    }
+
+    if (currentAttendanceData.length === 0) {
+        alert('No data to export. Please load the attendance report first.');
+        return;
+    }
+
+    // Create CSV content
+    let csv = 'Student ID,Student Name,Classes Attended,Total Classes,Attendance Percentage,Status\n';
+
+    currentAttendanceData.forEach(student => {
+        const percentage = student.attendance_percentage || 0;
+        let status = 'Poor';
+        if (percentage >= 75) status = 'Excellent';
+        else if (percentage >= 60) status = 'Good';
+        else if (percentage >= 40) status = 'Average';
+
+        csv += `${student.student_id},${student.student_name},${student.classes_attended},${student.total_classes},${percentage}%,${status}\n`;
+    });
+
+    // Create download link
+    const blob = new Blob([csv], { type: 'text/csv;charset=utf-8;' });
+    const link = document.createElement('a');
+    const url = URL.createObjectURL(blob);
+
+    const courseName = document.getElementById('report-course-id').selectedOptions[0].text.replace(/[^a-zA-Z0-9]/g, '_');
+    const filename = `attendance_${courseName}_${new Date().toISOString().split('T')[0]}.csv`;
+
+    link.setAttribute('href', url);
+    link.setAttribute('download', filename);
+    link.style.visibility = 'hidden';
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+
+    alert(`CSV file "${filename}" has been downloaded successfully!`);
+}
+
+// Faculty Course Management
+async function createFacultyCourse(event) {
+    event.preventDefault();
+
+    if (!currentUser || currentUser.role !== 'faculty') {
+        showAlert('create-course-alert', 'Unauthorized', 'error');
+        return;
+    }
+
+    const data = {
+        course_code: document.getElementById('new-course-code').value,
+        course_name: document.getElementById('new-course-name').value,
+        department: document.getElementById('new-course-dept').value,
+        semester: parseInt(document.getElementById('new-course-sem').value) || null
+    };
+
+    try {
+        const response = await fetch('/faculty/course/create', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+
+        const result = await response.json();
+
+        if (response.ok) {
+            showAlert('create-course-alert', result.msg, 'success');
+            event.target.reset();
+            loadFacultyCourses();
+        } else {
+            showAlert('create-course-alert', result.msg, 'error');
+        }
+    } catch (error) {
+        showAlert('create-course-alert', 'Failed to create course: ' + error.message, 'error');
+    }
+}
+
+async function loadFacultyCourses() {
+    if (!currentUser || currentUser.role !== 'faculty') return;
+
+    const spinner = document.getElementById('faculty-courses-spinner');
+    spinner.classList.add('show');
+
+    try {
+        const response = await cachedFetch('/faculty/courses');
+        const data = await response.json();
+
+        if (response.ok) {
+            renderFacultyCourses(data);
+        }
+    } catch (error) {
+        console.error('Failed to load courses:', error);
+    } finally {
+        spinner.classList.remove('show');
+    }
+}
+
+function renderFacultyCourses(data) {
+    const list = document.getElementById('faculty-courses-list');
+    list.innerHTML = '';
+
+    if (data.courses.length === 0) {
+        list.innerHTML = '<p style="text-align: center; color: #666; padding: 20px;">No courses found. Create your first course above!</p>';
+    } else {
+        data.courses.forEach(course => {
+            const item = document.createElement('div');
+            item.className = 'list-item';
+            item.innerHTML = `
+                <div style="display: flex; justify-content: space-between; align-items: start;">
+                    <div>
+                        <strong>Code:</strong> ${course.course_code}<br>
+                        <strong>Name:</strong> ${course.course_name}<br>
+                        ${course.department ? `<strong>Department:</strong> ${course.department}<br>` : ''}
+                        ${course.semester ? `<strong>Semester:</strong> ${course.semester}` : ''}
+                    </div>
+                    <button onclick="deleteFacultyCourse('${course.id}')" class="btn btn-danger" style="padding: 8px 15px; font-size: 0.9em;">
+                        Delete
+                    </button>
+                </div>
+            `;
+            list.appendChild(item);
+        });
+    }
+}
+
+async function deleteFacultyCourse(courseId) {
+    if (!confirm('Are you sure you want to delete this course? This action cannot be undone.')) {
+        return;
+    }
+
+    try {
+        const response = await fetch(`/faculty/course/${courseId}`, {
+            method: 'DELETE'
+        });
+
+        const result = await response.json();
+
+        if (response.ok) {
+            showAlert('create-course-alert', result.msg, 'success');
+            loadFacultyCourses();
+        } else {
+            alert(result.msg);
+        }
+    } catch (error) {
+        alert('Failed to delete course: ' + error.message);
+    }
+}
+
+// Admin Functions
+async function loadAdminStats() {
+    if (!currentUser || currentUser.role !== 'admin') return;
+
+    try {
+        const response = await cachedFetch('/admin/stats');
+        const data = await response.json();
+
+        if (response.ok) {
+            renderAdminStats(data);
+        }
+    } catch (error) {
+        console.error('Failed to load stats:', error);
+    }
+}
+
+function renderAdminStats(data) {
+    document.getElementById('admin-students').textContent = data.total_students;
+    document.getElementById('admin-faculty').textContent = data.total_faculty;
+    document.getElementById('admin-courses').textContent = data.total_courses;
+    document.getElementById('admin-sessions-count').textContent = data.total_sessions;
+    document.getElementById('admin-attendances').textContent = data.total_attendances;
+}
+
+async function loadAllUsers() {
+    if (!currentUser || currentUser.role !== 'admin') return;
+
+    const spinner = document.getElementById('users-spinner');
+    spinner.classList.add('show');
+
+    try {
+        const response = await fetch('/admin/users');
+        const data = await response.json();
+
+        if (response.ok) {
+            renderAllUsers(data);
+        }
+    } catch (error) {
+        console.error('Failed to load users:', error);
+    } finally {
+        spinner.classList.remove('show');
+    }
+}
+
+function renderAllUsers(data) {
+    const list = document.getElementById('users-list');
+    list.innerHTML = '';
+
+    data.users.forEach(user => {
+        const item = document.createElement('div');
+        item.className = 'list-item';
+        item.innerHTML = `
+            <strong>Username:</strong> ${user.username}<br>
+            <strong>Email:</strong> ${user.email}<br>
+            <strong>Role:</strong> ${user.role}<br>
+            ${user.full_name ? `<strong>Name:</strong> ${user.full_name}<br>` : ''}
+            ${user.department ? `<strong>Department:</strong> ${user.department}` : ''}
+        `;
+        list.appendChild(item);
+    });
+}
+
+async function loadAllCourses() {
+    if (!currentUser || currentUser.role !== 'admin') return;
+
+    const spinner = document.getElementById('courses-spinner');
+    spinner.classList.add('show');
+
+    try {
+        const response = await fetch('/admin/courses');
+        const data = await response.json();
+
+        if (response.ok) {
+            renderAllCourses(data);
+        }
+    } catch (error) {
+        console.error('Failed to load courses:', error);
+    } finally {
+        spinner.classList.remove('show');
+    }
+}
+
+function renderAllCourses(data) {
+    const list = document.getElementById('courses-list');
+    list.innerHTML = '';
+
+    data.courses.forEach(course => {
+        const item = document.createElement('div');
+        item.className = 'list-item';
+        item.innerHTML = `
+            <strong>Code:</strong> ${course.course_code}<br>
+            <strong>Name:</strong> ${course.course_name}<br>
+            <strong>Department:</strong> ${course.department || 'N/A'}<br>
+            <strong>Faculty:</strong> ${course.faculty_name}
+        `;
+        list.appendChild(item);
+    });
+}
+
+async function loadAllSessions() {
+    if (!currentUser || currentUser.role !== 'admin') return;
+
+    const spinner = document.getElementById('sessions-spinner');
+    spinner.classList.add('show');
+
+    try {
+        const response = await fetch('/admin/sessions');
+        const data = await response.json();
+
+        if (response.ok) {
+            renderAllSessions(data);
+        }
+    } catch (error) {
+        console.error('Failed to load sessions:', error);
+    } finally {
+        spinner.classList.remove('show');
+    }
+}
+
+function renderAllSessions(data) {
+    const list = document.getElementById('sessions-list');
+    list.innerHTML = '';
+
+    data.sessions.forEach(session => {
+        const item = document.createElement('div');
+        item.className = 'list-item';
+        item.innerHTML = `
+            <strong>ID:</strong> ${session.id}<br>
+            <strong>Course:</strong> ${session.course}<br>
+            <strong>Date:</strong> ${session.session_date}<br>
+            <strong>Status:</strong> ${session.is_active ? 'Active' : 'Inactive'}<br>
+            <strong>Attendances:</strong> ${session.total_attendances}
+        `;
+        list.appendChild(item);
+    });
+}
+
+// Load Profile Data
+async function loadProfileData() {
+    if (!currentUser) return;
+
+    // Hide all profile views
+    document.getElementById('student-profile-view').style.display = 'none';
+    document.getElementById('faculty-profile-view').style.display = 'none';
+    document.getElementById('admin-profile-view').style.display = 'none';
+
+    if (currentUser.role === 'student') {
+        document.getElementById('student-profile-view').style.display = 'block';
+        await loadStudentProfile();
+    } else if (currentUser.role === 'faculty') {
+        document.getElementById('faculty-profile-view').style.display = 'block';
+        await loadFacultyProfile();
+    } else if (currentUser.role === 'admin') {
+        document.getElementById('admin-profile-view').style.display = 'block';
+        await loadAdminProfile();
+    }
+}
+
+// Load Student Profile
+async function loadStudentProfile() {
+    try {
+        // Get student data and attendance stats
+        const [response, historyResponse] = await Promise.all([
+            cachedFetch('/student/profile'),
+            cachedFetch('/student/attendance/history')
+        ]);
+        if (response.ok && historyResponse.ok) {
+            renderStudentProfile(await response.json(), await historyResponse.json());
+        }
+    } catch (error) {
+        console.error('Failed to load student profile:', error);
+    }
+}
+
+function renderStudentProfile(data, historyData) {
+    document.getElementById('student-profile-name').textContent = data.full_name || 'Not provided';
+    document.getElementById('student-profile-id').textContent = data.student_id || 'N/A';
+    document.getElementById('student-profile-email').textContent = data.email || 'N/A';
+    document.getElementById('student-profile-username').textContent = data.username || 'N/A';
+    document.getElementById('student-profile-dept').textContent = data.department || 'Not specified';
+    document.getElementById('student-profile-sem').textContent = data.semester ? `Semester ${data.semester}` : 'Not specified';
+
+    document.getElementById('student-profile-attendance').textContent = historyData.total_attendances || 0;
+    // Calculate this month's attendance (simplified)
+    document.getElementById('student-profile-month-attendance').textContent = historyData.total_attendances || 0;
+}
+
+// Load Faculty Profile
+async function loadFacultyProfile() {
+    try {
+        // Get faculty data and courses count
+        const [response, coursesResponse] = await Promise.all([
+            fetch('/faculty/profile'),
+            cachedFetch('/faculty/courses')
+        ]);
+        if (response.ok && coursesResponse.ok) {
+            renderFacultyProfile(await response.json(), await coursesResponse.json());
+        }
+    } catch (error) {
+        console.error('Failed to load faculty profile:', error);
+    }
+}
+
+function renderFacultyProfile(data, coursesData) {
+    document.getElementById('faculty-profile-name').textContent = data.full_name || 'Not provided';
+    document.getElementById('faculty-profile-id').textContent = data.faculty_id || 'N/A';
+    document.getElementById('faculty-profile-email').textContent = data.email || 'N/A';
+    document.getElementById('faculty-profile-username').textContent = data.username || 'N/A';
+    document.getElementById('faculty-profile-dept').textContent = data.department || 'Not specified';
+    document.getElementById('faculty-profile-courses').textContent = coursesData.total_courses || 0;
+
+    // Sessions count (placeholder - would need backend endpoint)
+    document.getElementById('faculty-profile-sessions').textContent = '0';
+}
+
+// Load Admin Profile
+async function loadAdminProfile() {
+    try {
+        // Get admin data and system stats
+        const [response, statsResponse] = await Promise.all([
+            fetch('/admin/profile'),
+            cachedFetch('/admin/stats')
+        ]);
+        if (response.ok && statsResponse.ok) {
+            renderAdminProfile(await response.json(), await statsResponse.json());
+        }
+    } catch (error) {
+        console.error('Failed to load admin profile:', error);
+    }
+}
+
+function renderAdminProfile(data, statsData) {
+    document.getElementById('admin-profile-email').textContent = data.email || 'N/A';
+    document.getElementById('admin-profile-username').textContent = data.username || 'N/A';
+    document.getElementById('admin-profile-students').textContent = statsData.total_students || 0;
+    document.getElementById('admin-profile-faculty').textContent = statsData.total_faculty || 0;
+    document.getElementById('admin-profile-courses').textContent = statsData.total_courses || 0;
+    document.getElementById('admin-profile-sessions').textContent = statsData.total_sessions || 0;
+}
+
+// QR Code Scanner Functions
+// Frames are decoded off the main thread: by the browser's BarcodeDetector
+// where it has one, otherwise by jsQR in a Web Worker (static/js/qr-worker.js)
+// on downscaled frames. Scans run once per new video frame, one at a time.
+const SCAN_MAX_DIMENSION = 480; // Long side of the frames handed to jsQR
+const SCAN_MIN_INTERVAL_MS = 100;
+
+let qrStream = null;
+let qrScanner = null;
+
+// Native decoder when available, else the worker
+async function createQRDecoder(video) {
+    if ('BarcodeDetector' in window) {
+        try {
+            const formats = await BarcodeDetector.getSupportedFormats();
+            if (formats.includes('qr_code')) {
+                const detector = new BarcodeDetector({ formats: ['qr_code'] });
+                return {
+                    decode: async () => {
+                        const codes = await detector.detect(video);
+                        return codes.length ? codes[0].rawValue : null;
+                    },
+                    close: () => {}
+                };
+            }
+        } catch (error) {
+            console.warn('BarcodeDetector not usable, decoding in a worker:', error);
+        }
+    }
+
+    const worker = new Worker(video.dataset.worker);
+    let pending = null;
+    const settle = (text) => {
+        const resolve = pending;
+        pending = null;
+        if (resolve) resolve(text);
+    };
+    worker.onmessage = (event) => settle(event.data.text);
+    worker.onerror = (event) => {
+        console.error('QR worker error:', event.message);
+        settle(null);
+    };
+
+    // Hand the worker a resized bitmap when it can draw one itself; else
+    // read the pixels here from the small canvas
+    const transferBitmaps = typeof OffscreenCanvas !== 'undefined' && 'createImageBitmap' in window;
+    const canvas = document.getElementById('qr-canvas');
+
+    return {
+        decode: async () => {
+            const scale = Math.min(1, SCAN_MAX_DIMENSION / Math.max(video.videoWidth, video.videoHeight));
+            const width = Math.round(video.videoWidth * scale);
+            const height = Math.round(video.videoHeight * scale);
+
+            let message;
+            let transfer;
+            if (transferBitmaps) {
+                const bitmap = await createImageBitmap(video, { resizeWidth: width, resizeHeight: height, resizeQuality: 'low' });
+                message = { bitmap };
+                transfer = [bitmap];
+            } else {
+                if (canvas.width !== width || canvas.height !== height) {
+                    canvas.width = width;
+                    canvas.height = height;
+                }
+                const context = canvas.getContext('2d', { willReadFrequently: true });
+                context.drawImage(video, 0, 0, width, height);
+                const image = context.getImageData(0, 0, width, height);
+                message = { pixels: image.data.buffer, width, height };
+                transfer = [image.data.buffer];
+            }
+
+            const result = new Promise(resolve => { pending = resolve; });
+            worker.postMessage(message, transfer);
+            return result;
+        },
+        close: () => {
+            worker.terminate();
+            settle(null);
+        }
+    };
+}
+
+// Next video frame where supported, else next animation frame
+function scheduleScan(video, callback) {
+    if ('requestVideoFrameCallback' in video) {
+        video.requestVideoFrameCallback(callback);
+    } else {
+        requestAnimationFrame(callback);
+    }
+}
+
+async function startQRScanner() {
+    const video = document.getElementById('qr-video');
+    const startBtn = document.getElementById('start-scan-btn');
+    const stopBtn = document.getElementById('stop-scan-btn');
+    const scanResult = document.getElementById('scan-result');
+
+    if (qrScanner) return;
+
+    try {
+        // Request camera access
+        qrStream = await navigator.mediaDevices.getUserMedia({ 
+            video: { facingMode: 'environment' } // Use back camera on mobile
+        });
+
+        video.srcObject = qrStream;
+        video.setAttribute('playsinline', '');
+        await video.play();
+        video.style.display = 'block';
+        startBtn.style.display = 'none';
+        stopBtn.style.display = 'inline-block';
+        scanResult.style.display = 'none';
+
+        const scanner = { decoder: await createQRDecoder(video), active: true, lastScan: 0 };
+        qrScanner = scanner;
+
+        // Start scanning; the next scan is scheduled only after this one is decoded
+        const tick = async () => {
+            if (!scanner.active) return;
+
+            const now = performance.now();
+            if (now - scanner.lastScan >= SCAN_MIN_INTERVAL_MS && video.readyState >= video.HAVE_CURRENT_DATA && video.videoWidth) {
+                scanner.lastScan = now;
+                try {
+                    const text = await scanner.decoder.decode();
+                    if (text && scanner.active) {
+                        handleScannedQR(text);
+                        return;
+                    }
+                } catch (error) {
+                    console.error('QR decode failed:', error);
+                }
+            }
+
+            if (scanner.active) {
+                scheduleScan(video, tick);
+            }
+        };
+        scheduleScan(video, tick);
+
+    } catch (error) {
+        stopQRScanner();
+        alert('Camera access denied or not available. Please use manual token entry.');
+        console.error('Camera error:', error);
+    }
+}
+
+function stopQRScanner() {
+    const video = document.getElementById('qr-video');
+    const startBtn = document.getElementById('start-scan-btn');
+    const stopBtn = document.getElementById('stop-scan-btn');
+
+    if (qrScanner) {
+        qrScanner.active = false;
+        qrScanner.decoder?.close();
+        qrScanner = null;
+    }
+
+    if (qrStream) {
+        qrStream.getTracks().forEach(track => track.stop());
+        qrStream = null;
+    }
+
+    video.srcObject = null;
+    video.style.display = 'none';
+    startBtn.style.display = 'inline-block';
+    stopBtn.style.display = 'none';
+}
+
+function handleScannedQR(qrData) {
+    // Stop scanner: one scan, one submit
+    stopQRScanner();
+
+    // Display scanned result
+    document.getElementById('scanned-token').textContent = qrData;
+    document.getElementById('scan-result').style.display = 'block';
+
+    // Auto-fill the input field and submit it
+    document.getElementById('qr-token-input').value = qrData;
+    showAlert('attendance-alert', 'QR Code scanned successfully! Submitting attendance...', 'success');
+    submitAttendance(qrData);
+}
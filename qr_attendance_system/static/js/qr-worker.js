@@ -0,0 +1,29 @@
+// Decodes QR codes for the scanner in app.js, off the main thread. Receives
+// either a resized ImageBitmap or RGBA pixels and answers { text }, which is
+// null when no code was found.
+importScripts('https://cdn.jsdelivr.net/npm/jsqr@1.4.0/dist/jsQR.min.js');
+
+let canvas = null;
+let context = null;
+
+function bitmapPixels(bitmap) {
+    if (!canvas || canvas.width !== bitmap.width || canvas.height !== bitmap.height) {
+        canvas = new OffscreenCanvas(bitmap.width, bitmap.height);
+        context = canvas.getContext('2d', { willReadFrequently: true });
+    }
+    context.drawImage(bitmap, 0, 0);
+    bitmap.close();
+    return context.getImageData(0, 0, canvas.width, canvas.height);
+}
+
+self.onmessage = (event) => {
+    const { bitmap, pixels, width, height } = event.data;
+    const image = bitmap
+        ? bitmapPixels(bitmap)
+        : { data: new Uint8ClampedArray(pixels), width, height };
+
+    const code = jsQR(image.data, image.width, image.height, {
+        inversionAttempts: 'dontInvert',
+    });
+    self.postMessage({ text: code ? code.data : null });
+};
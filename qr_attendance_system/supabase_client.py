@@ -4,9 +4,12 @@ Handles connection to Supabase database
 """
 
 import os
-from supabase import create_client, Client
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 # Load environment variables
 load_dotenv()
 
@@ -14,9 +17,15 @@ load_dotenv()
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Created on first use and shared afterwards, so importing this module
+# neither needs credentials nor opens connections
+_supabase: 'Client' = None
 
-def get_supabase_client() -> Client:
+def get_supabase_client() -> 'Client':
     """Get Supabase client instance"""
-    return supabase
+    global _supabase
+    if _supabase is None:
+        # The supabase SDK is heavy; import it only when a client is needed
+        from supabase import create_client
+        _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _supabase
@@ -0,0 +1,32 @@
+"""
+Shared fixtures
+
+Run from qr_attendance_system with ``python -m pytest tests``.
+"""
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def api_app(tmp_path, monkeypatch):
+    """The API app on a fresh SQLite file, with its tables created"""
+    import bcrypt
+    from config.config import Config
+    from app import create_app
+
+    # Cheap hashes keep the tests fast
+    gensalt = bcrypt.gensalt
+    monkeypatch.setattr(bcrypt, 'gensalt', lambda *args, **kwargs: gensalt(4))
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'attendance.db'}")
+    monkeypatch.setattr(Config, 'AUTO_CREATE_TABLES', True)
+    app = create_app()
+    app.config['TESTING'] = True
+    yield app
+
+    from app.models.models import db
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
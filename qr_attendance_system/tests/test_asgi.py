@@ -0,0 +1,69 @@
+"""The ASGI API writes the same JSON as the Flask one and takes offline scan batches"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.models.models import Course, Enrollment, Session, Student
+
+@pytest.fixture
+def asgi_app(tmp_path, monkeypatch):
+    """The ASGI app on a fresh SQLite file"""
+    import bcrypt
+    from config.config import Config
+    from app.asgi import create_asgi_app
+
+    gensalt = bcrypt.gensalt
+    monkeypatch.setattr(bcrypt, 'gensalt', lambda *args, **kwargs: gensalt(4))
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'attendance.db'}")
+    monkeypatch.setattr(Config, 'AUTO_CREATE_TABLES', True)
+    return create_asgi_app()
+
+async def offline_batch(app):
+    from sqlalchemy import select
+    from app.asgi.database import db
+
+    async with app.test_app() as test_app:
+        client = test_app.test_client()
+        response = await client.post('/api/auth/register/student', json={
+            'username': 'student1',
+            'email': 'student1@example.com',
+            'password': 'secret',
+            'student_id': 'S001',
+            'full_name': 'Student One'
+        })
+        assert response.status_code == 201
+        response = await client.post('/api/auth/login', json={'username': 'student1', 'password': 'secret'})
+        headers = {'Authorization': f"Bearer {(await response.get_json())['access_token']}"}
+
+        # A session that opened four minutes ago, in a course the student takes
+        opened = datetime.utcnow() - timedelta(minutes=4)
+        async with db.session() as session:
+            student = (await session.execute(select(Student))).scalar()
+            course = Course(course_code='CS101', course_name='Programming')
+            session.add(course)
+            await session.flush()
+            session.add(Enrollment(student_id=student.id, course_id=course.id))
+            session.add(Session(course_id=course.id, qr_code_token='t', session_date=opened, qr_expiration=opened + timedelta(minutes=5)))
+            await session.commit()
+
+        # Sent from a phone on UTC+5
+        phone = timezone(timedelta(hours=5))
+        now = datetime.now(phone)
+        response = await client.post('/api/attendance/student/attendance/mark/batch', headers=headers, json={
+            'sent_at': now.isoformat(),
+            'scans': [
+                {'qr_token': 't', 'scanned_at': (now - timedelta(minutes=2)).isoformat()},
+                {'qr_token': 'unknown', 'scanned_at': now.isoformat()}
+            ]
+        })
+        return response.status_code, await response.get_json()
+
+def test_offline_batch_is_marked_with_iso_times(asgi_app):
+    status, body = asyncio.run(offline_batch(asgi_app))
+
+    assert status == 200
+    assert body['marked'] == 1
+    assert [result['status'] for result in body['results']] == ['marked', 'invalid']
+    # ISO 8601 in UTC, as from create_app(), not an HTTP date
+    marked_at = datetime.fromisoformat(body['results'][0]['marked_at'])
+    assert marked_at.utcoffset() == timedelta(0)
@@ -0,0 +1,75 @@
+"""Opening the API's live feed with a header JWT or a stream token"""
+
+from datetime import datetime, timedelta
+import pytest
+from app.models.models import hash_password
+from app.repositories import get_repository
+
+def login(client, username):
+    response = client.post('/api/auth/login', json={'username': username, 'password': 'secret'})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+@pytest.fixture
+def feed(api_app):
+    """A faculty member's session, plus another faculty's session"""
+    with api_app.app_context():
+        repository = get_repository()
+        sessions = []
+        for username in ('prof1', 'prof2'):
+            user = repository.create_user(username, f'{username}@example.com', hash_password('secret'), 'faculty')
+            repository.create_faculty(user['id'], username.upper(), username)
+            course = repository.create_course(f'{username}-101', 'Programming')
+            sessions.append(repository.create_session(course['id'], user['id'], f'{username}-token', datetime.utcnow() + timedelta(minutes=3)))
+    client = api_app.test_client()
+    return client, login(client, 'prof1'), sessions[0]['id'], sessions[1]['id']
+
+def open_feed(client, path, **kwargs):
+    response = client.get(path, buffered=False, **kwargs)
+    try:
+        frame = next(response.response) if response.status_code == 200 else b''
+    finally:
+        response.close()
+    return response, frame
+
+def test_header_token_opens_feed(feed):
+    client, headers, session_id, _ = feed
+    response, frame = open_feed(client, f'/api/attendance/faculty/session/{session_id}/live', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert frame.startswith(b'event: snapshot')
+
+def test_stream_token_opens_feed_from_query_string(feed):
+    client, headers, session_id, _ = feed
+    token = client.post(f'/api/attendance/faculty/session/{session_id}/live/token', headers=headers).get_json()['stream_token']
+
+    response, frame = open_feed(client, f'/api/attendance/faculty/session/{session_id}/live?token={token}')
+    assert response.status_code == 200
+    assert frame.startswith(b'event: snapshot')
+
+def test_stream_token_is_scoped_to_its_session(feed):
+    client, headers, session_id, other_session_id = feed
+    token = client.post(f'/api/attendance/faculty/session/{session_id}/live/token', headers=headers).get_json()['stream_token']
+
+    response, _ = open_feed(client, f'/api/attendance/faculty/session/{other_session_id}/live?token={token}')
+    assert response.status_code == 403
+    # Not usable as a bearer token on other routes
+    response = client.get(f'/api/attendance/faculty/session/{session_id}/attendances', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 403
+
+def test_access_token_is_not_accepted_in_query_string(feed):
+    client, headers, session_id, _ = feed
+    access_token = headers['Authorization'].split()[1]
+    response, _ = open_feed(client, f'/api/attendance/faculty/session/{session_id}/live?token={access_token}')
+    assert response.status_code == 403
+
+def test_token_for_another_faculty_session_is_refused(feed):
+    client, headers, _, other_session_id = feed
+    response = client.post(f'/api/attendance/faculty/session/{other_session_id}/live/token', headers=headers)
+    assert response.status_code == 404
+
+def test_expired_stream_token_is_refused(feed, api_app):
+    client, headers, session_id, _ = feed
+    api_app.config['LIVE_STREAM_TOKEN_EXPIRES'] = -1
+    token = client.post(f'/api/attendance/faculty/session/{session_id}/live/token', headers=headers).get_json()['stream_token']
+    response, _ = open_feed(client, f'/api/attendance/faculty/session/{session_id}/live?token={token}')
+    assert response.status_code == 401
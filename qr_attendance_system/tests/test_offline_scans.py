@@ -0,0 +1,103 @@
+"""Offline scan batches: back-dated and skewed scans must not get past QR expiry"""
+
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.utils.offline_scans import validate_scans
+
+class Sessions:
+    """Just enough repository for validate_scans"""
+    def __init__(self, *sessions):
+        self.sessions = {session['qr_code_token']: session for session in sessions}
+
+    def get_session_by_token(self, token):
+        return self.sessions.get(token)
+
+def make_session(token, opened, minutes=5):
+    return {'id': 1, 'course_id': 1, 'qr_code_token': token,
+            'session_date': opened, 'qr_expiration': opened + timedelta(minutes=minutes)}
+
+def scan(token, scanned_at):
+    return {'qr_token': token, 'scanned_at': scanned_at.isoformat()}
+
+def test_scan_inside_window_is_accepted():
+    now = datetime(2026, 10, 19, 10, 0)
+    session = make_session('t', now - timedelta(minutes=4))
+    accepted, results = validate_scans(Sessions(session), [scan('t', now - timedelta(minutes=2))], now.isoformat(), now)
+    assert [index for index, _, _ in accepted] == [0]
+    assert 'status' not in results[0]
+
+def test_back_dated_scan_of_long_expired_token_is_rejected():
+    now = datetime(2026, 10, 19, 10, 0)
+    # Window closed three hours ago; the client claims it scanned inside it
+    session = make_session('t', now - timedelta(hours=3, minutes=5))
+    accepted, results = validate_scans(Sessions(session), [scan('t', now - timedelta(hours=3, minutes=3))], now.isoformat(), now)
+    assert accepted == []
+    assert results[0]['status'] == 'expired'
+
+def test_upload_deadline_is_configurable():
+    now = datetime(2026, 10, 19, 10, 0)
+    session = make_session('t', now - timedelta(minutes=20))
+    scans = [scan('t', now - timedelta(minutes=18))]
+    accepted, _ = validate_scans(Sessions(session), scans, now.isoformat(), now, max_delay=timedelta(minutes=10))
+    assert accepted == []
+    accepted, _ = validate_scans(Sessions(session), scans, now.isoformat(), now, max_delay=timedelta(minutes=30))
+    assert len(accepted) == 1
+
+def test_implausible_clock_offset_rejects_the_batch():
+    now = datetime(2026, 10, 19, 10, 0)
+    session = make_session('t', now - timedelta(minutes=4))
+    # A phone clock two hours slow would move the scan into any window
+    sent_at = now - timedelta(hours=2)
+    accepted, results = validate_scans(Sessions(session), [scan('t', sent_at)], sent_at.isoformat(), now)
+    assert accepted == []
+    assert results[0]['status'] == 'clock_skew'
+
+def test_phone_in_another_time_zone_is_not_skewed():
+    now = datetime(2026, 10, 19, 10, 0)
+    session = make_session('t', now - timedelta(minutes=4))
+    # A phone on UTC+5 with a correct clock sends its local time and offset
+    phone = timezone(timedelta(hours=5))
+    scanned_at = (now - timedelta(minutes=2)).replace(tzinfo=timezone.utc).astimezone(phone)
+    sent_at = now.replace(tzinfo=timezone.utc).astimezone(phone)
+    accepted, results = validate_scans(Sessions(session), [scan('t', scanned_at)], sent_at.isoformat(), now)
+    assert 'status' not in results[0]
+    assert [marked_at for _, _, marked_at in accepted] == [now - timedelta(minutes=2)]
+
+@pytest.fixture
+def student_client(api_app):
+    """A logged-in student enrolled in a course, and a session of that course"""
+    from app.models.models import db, Session
+    from app.repositories import get_repository
+    from app.models.models import hash_password
+
+    with api_app.app_context():
+        repository = get_repository()
+        user = repository.create_user('student1', 'student1@example.com', hash_password('secret'), 'student')
+        student = repository.create_student(user['id'], 'S001', 'Student One')
+        course = repository.create_course('CS101', 'Programming')
+        repository.enroll(student['id'], course['id'])
+        opened = datetime.utcnow() - timedelta(hours=3, minutes=5)
+        session = repository.create_session(course['id'], None, 'leaked-token', opened + timedelta(minutes=5))
+        # Open the session three hours ago
+        db.session.get(Session, session['id']).session_date = opened
+        db.session.commit()
+
+    client = api_app.test_client()
+    response = client.post('/api/auth/login', json={'username': 'student1', 'password': 'secret'})
+    client.environ_base['HTTP_AUTHORIZATION'] = f"Bearer {response.get_json()['access_token']}"
+    return client, opened
+
+def test_expired_token_is_rejected_by_both_mark_routes(student_client):
+    client, opened = student_client
+
+    response = client.post('/api/attendance/student/attendance/mark', json={'qr_token': 'leaked-token'})
+    assert response.status_code == 400
+
+    response = client.post('/api/attendance/student/attendance/mark/batch', json={
+        'sent_at': datetime.utcnow().isoformat(),
+        'scans': [scan('leaked-token', opened + timedelta(minutes=2))]
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['marked'] == 0
+    assert body['results'][0]['status'] == 'expired'
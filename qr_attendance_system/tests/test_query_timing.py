@@ -0,0 +1,55 @@
+"""Metrics and SQL diagnostics share one statement timer"""
+
+import logging
+import pytest
+from sqlalchemy import text
+from app.models.models import db
+from app.utils import query_timing, sql_diagnostics
+from app.utils.metrics import metrics
+
+@pytest.fixture
+def instrumented_app(tmp_path, monkeypatch, request):
+    """The API app with /metrics, the slow-query log and the N+1 detector all on"""
+    from config.config import Config
+
+    # Leave the module-level switches as they were for the other tests
+    monkeypatch.setattr(query_timing, '_subscribers', list(query_timing._subscribers))
+    monkeypatch.setattr(metrics, 'enabled', metrics.enabled)
+    for key, value in sql_diagnostics._settings.items():
+        monkeypatch.setitem(sql_diagnostics._settings, key, value)
+    request.addfinalizer(metrics.reset)
+
+    monkeypatch.setattr(Config, 'METRICS_ENABLED', True)
+    monkeypatch.setattr(Config, 'SQL_SLOW_QUERY_MS', 0.000001)
+    monkeypatch.setattr(Config, 'SQL_N_PLUS_ONE_THRESHOLD', 1)
+    app = request.getfixturevalue('api_app')
+    metrics.reset()
+
+    @app.route('/sql-probe')
+    def sql_probe():
+        db.session.execute(text('SELECT 1'))
+        db.session.execute(text('SELECT 1'))
+        return {}
+
+    return app
+
+def test_each_statement_is_counted_once_everywhere(instrumented_app, caplog):
+    client = instrumented_app.test_client()
+
+    with caplog.at_level(logging.WARNING, logger=sql_diagnostics.__name__):
+        assert client.get('/sql-probe').status_code == 200
+
+    # Two statements in the request histogram
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'http_request_sql_statements_sum{method="GET",route="/sql-probe"} 2' in body
+    assert 'http_request_sql_statements_count{method="GET",route="/sql-probe"} 1' in body
+
+    # Two slow-query lines, both pointing at the view, not the timing hook
+    slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith('Slow query')]
+    assert len(slow) == 2
+    assert all('tests/test_query_timing.py' in message and 'in sql_probe' in message for message in slow)
+
+    # And one N+1 report that saw the statement twice
+    repeats = [record.getMessage() for record in caplog.records if record.getMessage().startswith('Possible N+1')]
+    assert len(repeats) == 1
+    assert 'ran 2 times' in repeats[0]
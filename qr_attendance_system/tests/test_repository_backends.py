@@ -0,0 +1,79 @@
+"""Auth and admin routes work on every local storage backend"""
+
+import pytest
+from app.models.models import hash_password
+
+@pytest.fixture(params=['sqlalchemy', 'memory'])
+def backend_app(request, monkeypatch):
+    from config.config import Config
+    monkeypatch.setattr(Config, 'STORAGE_BACKEND', request.param)
+    return request.getfixturevalue('api_app')
+
+def login(client, username, password):
+    response = client.post('/api/auth/login', json={'username': username, 'password': password})
+    assert response.status_code == 200
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+def test_registered_student_reaches_attendance_routes(backend_app):
+    client = backend_app.test_client()
+
+    response = client.post('/api/auth/register/student', json={
+        'username': 'student1',
+        'email': 'student1@example.com',
+        'password': 'secret',
+        'student_id': 'S001',
+        'full_name': 'Student One'
+    })
+    assert response.status_code == 201
+
+    response = client.post('/api/auth/register/student', json={
+        'username': 'student2',
+        'email': 'student1@example.com',
+        'password': 'secret',
+        'student_id': 'S002',
+        'full_name': 'Student Two'
+    })
+    assert response.status_code == 400
+
+    headers = login(client, 'student1', 'secret')
+    assert client.post('/api/auth/login', json={'username': 'student1', 'password': 'wrong'}).status_code == 401
+
+    response = client.get('/api/auth/profile', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['student_id'] == 'S001'
+
+    response = client.get('/api/attendance/student/attendance/history', headers=headers)
+    assert response.status_code == 200
+
+def test_admin_manages_users_courses_and_enrollments(backend_app):
+    with backend_app.app_context():
+        from app.repositories import get_repository
+        repository = get_repository()
+        repository.create_user('admin', 'admin@example.com', hash_password('secret'), 'admin')
+        user = repository.create_user('student1', 'student1@example.com', hash_password('secret'), 'student')
+        student = repository.create_student(user['id'], 'S001', 'Student One')
+
+    client = backend_app.test_client()
+    headers = login(client, 'admin', 'secret')
+
+    response = client.post('/api/admin/admin/course', headers=headers, json={'course_code': 'CS101', 'course_name': 'Programming'})
+    assert response.status_code == 201
+    course_id = response.get_json()['course_id']
+
+    enrollment = {'student_id': student['id'], 'course_id': course_id}
+    response = client.post('/api/admin/admin/enrollment', headers=headers, json=enrollment)
+    assert response.status_code == 201
+    assert response.get_json()['enrollment_id']
+    assert client.post('/api/admin/admin/enrollment', headers=headers, json=enrollment).status_code == 400
+
+    users = client.get('/api/admin/admin/users', headers=headers).get_json()['users']
+    assert {user['username']: user.get('student_id') for user in users} == {'admin': None, 'student1': 'S001'}
+
+    dashboard = client.get('/api/admin/admin/dashboard', headers=headers).get_json()
+    assert dashboard['statistics']['total_courses'] == 1
+    assert dashboard['recent_enrollments'][0]['student_name'] == 'Student One'
+
+    assert client.delete(f"/api/admin/admin/student/{student['id']}", headers=headers).status_code == 200
+    assert client.delete(f'/api/admin/admin/course/{course_id}', headers=headers).status_code == 200
+    users = client.get('/api/admin/admin/users', headers=headers).get_json()['users']
+    assert [user['username'] for user in users] == ['admin']
@@ -0,0 +1,47 @@
+"""Cached dashboard counters follow committed writes only"""
+
+from sqlalchemy.exc import IntegrityError
+from app.models.models import db, Course
+from app.utils.stats import get_stats
+
+def test_rolled_back_savepoint_is_not_counted(api_app):
+    with api_app.app_context():
+        stats = get_stats()
+        stats.reconcile()
+
+        db.session.add(Course(course_code='CS101', course_name='Programming'))
+        db.session.commit()
+
+        # A lost race inside a savepoint, as in mark_attendance_batch
+        db.session.add(Course(course_code='CS102', course_name='Algorithms'))
+        try:
+            with db.session.begin_nested():
+                db.session.add(Course(course_code='CS101', course_name='Duplicate'))
+        except IntegrityError:
+            pass
+        db.session.commit()
+
+        assert stats.snapshot()['total_courses'] == 2
+        assert stats.reconcile()['total_courses'] == 2
+
+def test_released_savepoint_is_counted(api_app):
+    with api_app.app_context():
+        stats = get_stats()
+        stats.reconcile()
+
+        with db.session.begin_nested():
+            db.session.add(Course(course_code='CS101', course_name='Programming'))
+        db.session.commit()
+
+        assert stats.snapshot()['total_courses'] == 1
+
+def test_rolled_back_transaction_is_not_counted(api_app):
+    with api_app.app_context():
+        stats = get_stats()
+        stats.reconcile()
+
+        db.session.add(Course(course_code='CS101', course_name='Programming'))
+        db.session.flush()
+        db.session.rollback()
+
+        assert stats.snapshot()['total_courses'] == 0
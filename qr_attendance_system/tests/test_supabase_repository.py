@@ -0,0 +1,130 @@
+"""SupabaseRepository against a stand-in PostgREST server on localhost"""
+
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+import pytest
+from app.repositories.base import RepositoryError
+from app.repositories.supabase import SupabaseRepository
+
+class StubPostgREST:
+    """HTTP/1.1 server that answers through `handle` and records every request"""
+    def __init__(self):
+        self.requests = []
+        self.connections = set()
+        self.handle = lambda request: (200, [])
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self):
+                stub.connections.add(self.client_address)
+                url = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                request = {
+                    'method': self.command,
+                    'table': url.path.rsplit('/', 1)[1],
+                    'params': dict(parse_qsl(url.query)),
+                    'json': json.loads(self.rfile.read(length)) if length else None,
+                    'prefer': self.headers.get('Prefer')
+                }
+                stub.requests.append(request)
+                status, body = stub.handle(request)
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_DELETE = _respond
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub():
+    with StubPostgREST() as stub:
+        yield stub
+
+@pytest.fixture
+def repository(stub):
+    repository = SupabaseRepository(stub.url, 'key', max_retries=2, backoff=0, page_size=2)
+    yield repository
+    repository.close()
+
+def test_reads_are_retried_on_gateway_errors(stub, repository):
+    statuses = iter([502, 200])
+    stub.handle = lambda request: (next(statuses), [{'id': 1, 'username': 'alice'}])
+
+    assert repository.get_user(1)['username'] == 'alice'
+    assert len(stub.requests) == 2
+
+def test_inserts_are_not_resent_after_a_gateway_error(stub, repository):
+    stub.handle = lambda request: (502, {'message': 'bad gateway'})
+
+    with pytest.raises(RepositoryError):
+        repository.create_user('alice', 'alice@example.com', 'hash', 'student')
+    assert len(stub.requests) == 1
+
+def test_inserts_are_retried_when_not_processed(stub, repository):
+    statuses = iter([503, 201])
+    stub.handle = lambda request: (next(statuses), [dict(request['json'], id=7)])
+
+    assert repository.create_user('alice', 'alice@example.com', 'hash', 'student')['id'] == 7
+    assert len(stub.requests) == 2
+
+def test_connections_are_kept_alive(stub, repository):
+    stub.handle = lambda request: (200, [{'id': 1}])
+
+    for _ in range(5):
+        repository.get_course(1)
+    assert len(stub.requests) == 5
+    assert len(stub.connections) == 1
+
+def test_lists_are_read_in_pages(stub, repository):
+    users = [{'id': index, 'username': f'user{index}'} for index in range(5)]
+
+    def handle(request):
+        offset, limit = int(request['params']['offset']), int(request['params']['limit'])
+        return 200, users[offset:offset + limit]
+    stub.handle = handle
+
+    assert [user['id'] for user in repository.list_users()] == [0, 1, 2, 3, 4]
+    assert [request['params']['offset'] for request in stub.requests] == ['0', '2', '4']
+    assert all(request['params']['order'] == 'id' for request in stub.requests)
+
+def test_attendance_batch_is_one_upsert(stub, repository):
+    session = {'id': 1, 'course_id': 1}
+    marked_at = datetime(2026, 10, 19, 9, 0)
+    # Student 11 was already marked, so the upsert skips that row
+    stub.handle = lambda request: (201, [row for row in request['json'] if row['student_id'] != 11])
+
+    results = repository.mark_attendance_batch([
+        (session, 10, marked_at),
+        (session, 11, marked_at),
+        (session, 10, marked_at),
+        (session, 12, marked_at)
+    ])
+
+    assert results == [True, False, False, True]
+    assert len(stub.requests) == 1
+    request = stub.requests[0]
+    assert request['method'] == 'POST'
+    assert [row['student_id'] for row in request['json']] == [10, 11, 12]
+    assert 'resolution=ignore-duplicates' in request['prefer']
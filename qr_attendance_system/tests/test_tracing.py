@@ -0,0 +1,37 @@
+"""Traces carry the status of the response the client received"""
+
+import json
+import pytest
+from app.utils.tracing import tracer
+
+@pytest.fixture
+def trace_file(api_app, tmp_path, monkeypatch):
+    path = tmp_path / 'trace.json'
+    for name in ('enabled', 'sample_rate', 'slow_seconds', 'writer'):
+        monkeypatch.setattr(tracer, name, getattr(tracer, name))
+    tracer.configure(1.0, 0, str(path), 1024 * 1024, 1)
+    return path
+
+def request_events(path):
+    # The trace file leaves its JSON array open while it is appended to
+    events = json.loads(path.read_text().rstrip(',\n') + ']')
+    return [event for event in events if event['cat'] == 'request']
+
+def test_missing_token_is_traced_as_401(api_app, trace_file):
+    response = api_app.test_client().post('/api/attendance/student/attendance/mark', json={'qr_token': 't'})
+    assert response.status_code == 401
+
+    events = request_events(trace_file)
+    assert [event['args']['status'] for event in events] == [401]
+    assert events[0]['name'] == 'mark_attendance'
+
+def test_malformed_token_is_traced_as_422(api_app, trace_file):
+    client = api_app.test_client()
+    response = client.post(
+        '/api/attendance/student/attendance/mark',
+        json={'qr_token': 't'},
+        headers={'Authorization': 'Bearer not-a-jwt'}
+    )
+    assert response.status_code == 422
+
+    assert [event['args']['status'] for event in request_events(trace_file)] == [422]